@@ -12,6 +12,18 @@ class PeriodicTaskStatus(ImplicitDict):
     period: Optional[StringBasedTimeDelta] = None
     executing: bool = False
 
+    executions: int = 0
+    """Number of times this task has completed execution"""
+
+    last_duration_s: Optional[float] = None
+    """Number of seconds the most recent execution of this task took to complete"""
+
+    last_lag_s: Optional[float] = None
+    """Number of seconds after its scheduled time that the most recent execution of this task started"""
+
+    max_lag_s: float = 0
+    """Largest number of seconds after its scheduled time that any execution of this task started"""
+
 
 class TaskError(ImplicitDict):
     trigger: str
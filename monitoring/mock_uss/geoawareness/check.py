@@ -1,18 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import json
 import logging
-from typing import List, Dict
+import multiprocessing
+import os
+import threading
+from typing import List, Dict, Optional, Set, Tuple
 from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
     GeozonesCheckResultGeozone,
     GeozonesCheckRequest,
+    GeozonesFilterSet,
     GeozoneHttpsSourceFormat,
     GeozoneSourceResponseResult,
 )
-from monitoring.mock_uss.geoawareness.ed269 import evaluate_source
+from monitoring.mock_uss.geoawareness.ed269 import (
+    CompiledED269Source,
+    compile_source,
+    forget_compiled_sources,
+)
 from monitoring.mock_uss.geoawareness.database import db, SourceRecord, Database
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+PARALLEL_EVALUATION_THRESHOLD = 2000
+"""Minimum number of (distinct filter set, source) evaluations in a check request for the evaluations to be
+distributed among worker processes."""
+
+MAX_EVALUATION_WORKERS = 4
+"""Maximum number of worker processes among which the evaluations of a check request are distributed."""
+
+
+_worker_pool_lock = threading.Lock()
+"""Serializes use of worker process pools so that _worker_compiled_sources is not changed while workers fork."""
+
 
 def combine_results(
     r1: GeozonesCheckResultGeozone, r2: GeozonesCheckResultGeozone
@@ -26,36 +48,159 @@ def combine_results(
     return GeozonesCheckResultGeozone.Absent
 
 
+def _key(obj) -> str:
+    return json.dumps(obj, sort_keys=True)
+
+
+def evaluate_filter_set_groups(
+    compiled_sources: List[CompiledED269Source], groups: List[List[GeozonesFilterSet]]
+) -> List[List[bool]]:
+    """Determine, for each filter set, whether it matches any feature of any of the compiled ED-269 sources.
+
+    Args:
+        compiled_sources: Compiled ED-269 sources.
+        groups: Filter sets grouped such that all filter sets in a group share the same position filter (so the
+            features near that position are only looked up once per source).
+
+    Returns: Whether each filter set matched, in the same structure as groups.
+    """
+    results = []
+    for group in groups:
+        position = group[0].get("position", None)
+        near: List[Optional[Set[int]]] = [
+            compiled.near(position) if position is not None else None
+            for compiled in compiled_sources
+        ]
+        results.append(
+            [
+                any(
+                    compiled.matching_features(filter_set, near[i])
+                    for i, compiled in enumerate(compiled_sources)
+                )
+                for filter_set in group
+            ]
+        )
+    return results
+
+
+_worker_compiled_sources: List[CompiledED269Source] = []
+"""Compiled sources to be evaluated by forked worker processes, which inherit this value from the parent process."""
+
+
+def _evaluate_filter_set_groups_in_worker(
+    groups: List[List[GeozonesFilterSet]],
+) -> List[List[bool]]:
+    return evaluate_filter_set_groups(_worker_compiled_sources, groups)
+
+
+def _evaluate_in_parallel(
+    compiled_sources: List[CompiledED269Source], groups: List[List[GeozonesFilterSet]]
+) -> List[List[bool]]:
+    global _worker_compiled_sources
+
+    n_workers = min(MAX_EVALUATION_WORKERS, os.cpu_count() or 1, len(groups))
+    if n_workers < 2:
+        return evaluate_filter_set_groups(compiled_sources, groups)
+
+    # Deal groups out in interleaved chunks to balance load.  Compiled sources are not sent to the workers; instead,
+    # forked workers inherit them (already compiled by this process) via _worker_compiled_sources.
+    chunks = [groups[w::n_workers] for w in range(n_workers)]
+    try:
+        with _worker_pool_lock:
+            _worker_compiled_sources = compiled_sources
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=n_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as executor:
+                    chunk_futures = [
+                        executor.submit(_evaluate_filter_set_groups_in_worker, chunk)
+                        for chunk in chunks
+                    ]
+                    chunk_results = [f.result() for f in chunk_futures]
+            finally:
+                _worker_compiled_sources = []
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(
+            f"Evaluating geozone checks serially after {type(e).__name__} in worker pool: {str(e)}"
+        )
+        return evaluate_filter_set_groups(compiled_sources, groups)
+
+    results: List[List[bool]] = [[]] * len(groups)
+    for w, chunk_result in enumerate(chunk_results):
+        results[w::n_workers] = chunk_result
+    return results
+
+
 def check_geozones(req: GeozonesCheckRequest) -> List[GeozonesCheckResultGeozone]:
     sources: Dict[str, SourceRecord] = Database.get_sources(db)
+    forget_compiled_sources(
+        {s.revision for s in sources.values() if s.get("revision", None)}
+    )
 
-    results: List[GeozonesCheckResultGeozone] = [
-        GeozonesCheckResultGeozone.Absent
-    ] * len(req.checks)
-
-    for i, check in enumerate(req.checks):
-        logger.info(f"  Evaluating check {i}: {check}")
+    ready_sources: List[CompiledED269Source] = []
+    for j, (source_id, source) in enumerate(sources.items()):
+        if source.state != GeozoneSourceResponseResult.Ready:
+            logger.debug(
+                f" {j+1}. Source {source_id} is not ready ({source.state}). Skip."
+            )
+            continue
 
-        result = GeozonesCheckResultGeozone.Absent
-        for j, (source_id, source) in enumerate(sources.items()):
-            if source.state != GeozoneSourceResponseResult.Ready:
+        fmt = source.definition.https_source.format
+        if fmt == GeozoneHttpsSourceFormat.ED_269:
+            try:
+                ready_sources.append(compile_source(source))
+            except FileNotFoundError:
+                # The source was deleted or replaced since it was read from the database
                 logger.debug(
-                    f" {j+1}. Source {source_id} is not ready ({source.state}). Skip."
+                    f" {j+1}. ED269 source {source_id} dataset is no longer available. Skip."
                 )
                 continue
+            logger.debug(f" {j+1}. ED269 source {source_id} ready.")
+        else:
+            logger.debug(
+                f" {j+1}. Source {source_id} not in supported format {fmt}. Skip."
+            )
 
-            fmt = source.definition.https_source.format
-            if fmt == GeozoneHttpsSourceFormat.ED_269:
-                logger.debug(f" {j+1}. ED269 source {source_id} ready.")
-                result = combine_results(
-                    result, evaluate_source(source, check.filterSets)
-                )
-            else:
-                logger.debug(
-                    f" {j+1}. Source {source_id} not in supported format {fmt}. Skip."
-                )
+    # Evaluate each distinct filter set only once, grouping filter sets which share a position filter
+    filter_set_keys: List[List[str]] = []
+    groups: Dict[str, Dict[str, GeozonesFilterSet]] = {}
+    for i, check in enumerate(req.checks):
+        logger.info(f"  Evaluating check {i}: {check}")
+        keys = []
+        for filter_set in check.filterSets:
+            key = _key(filter_set)
+            groups.setdefault(_key(filter_set.get("position", None)), {})[
+                key
+            ] = filter_set
+            keys.append(key)
+        filter_set_keys.append(keys)
+    group_keys: List[Tuple[str, ...]] = [tuple(group) for group in groups.values()]
+    group_filter_sets = [list(group.values()) for group in groups.values()]
+
+    n_evaluations = sum(len(g) for g in group_filter_sets) * len(ready_sources)
+    if not ready_sources:
+        group_results = [[False] * len(g) for g in group_filter_sets]
+    elif n_evaluations >= PARALLEL_EVALUATION_THRESHOLD:
+        logger.debug(
+            f"Distributing {n_evaluations} evaluations of {len(group_filter_sets)} positions among worker processes"
+        )
+        group_results = _evaluate_in_parallel(ready_sources, group_filter_sets)
+    else:
+        group_results = evaluate_filter_set_groups(ready_sources, group_filter_sets)
+    matched: Dict[str, bool] = {
+        key: result
+        for keys, results in zip(group_keys, group_results)
+        for key, result in zip(keys, results)
+    }
 
-        results[i] = result
+    results: List[GeozonesCheckResultGeozone] = []
+    for keys in filter_set_keys:
+        if ready_sources and (not keys or any(matched[key] for key in keys)):
+            # A check without filter sets matches any ready source
+            results.append(GeozonesCheckResultGeozone.Present)
+        else:
+            results.append(GeozonesCheckResultGeozone.Absent)
 
     if len(req.checks) != len(results):
         raise ValueError(
@@ -0,0 +1,141 @@
+import os
+
+from implicitdict import ImplicitDict
+from uas_standards.eurocae_ed269 import ED269Schema
+from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
+    CreateGeozoneSourceRequest,
+    GeozonesCheckRequest,
+    GeozonesCheckResultGeozone,
+    GeozoneSourceResponseResult,
+)
+
+from monitoring.mock_uss.geoawareness import check, ed269
+from monitoring.mock_uss.geoawareness.database import Database, db
+from monitoring.mock_uss.geoawareness.ed269 import (
+    evaluate_features,
+    forget_compiled_sources,
+)
+
+
+def _feature(identifier: str, lng: float, lat: float, restriction: str) -> dict:
+    return {
+        "identifier": identifier,
+        "country": "CHE",
+        "type": "COMMON",
+        "restriction": restriction,
+        "zoneAuthority": [],
+        "applicability": [{"permanent": "YES"}],
+        "geometry": [
+            {
+                "uomDimensions": "M",
+                "lowerLimit": 0,
+                "lowerVerticalReference": "AGL",
+                "upperLimit": 200,
+                "upperVerticalReference": "AGL",
+                "horizontalProjection": {
+                    "type": "Circle",
+                    "center": [lng, lat],
+                    "radius": 3000,
+                },
+            }
+        ],
+    }
+
+
+def _check(lng: float, lat: float, restrictions) -> dict:
+    filter_set = {
+        "position": {
+            "uomDimensions": "M",
+            "verticalReferenceType": "AGL",
+            "height": 100,
+            "longitude": lng,
+            "latitude": lat,
+        }
+    }
+    if restrictions is not None:
+        filter_set["ed269"] = {"acceptableRestrictions": restrictions}
+    return {"filterSets": [filter_set]}
+
+
+def _insert_source(source_id: str) -> None:
+    Database.insert_source(
+        db,
+        source_id,
+        ImplicitDict.parse(
+            {"https_source": {"url": "https://example.com", "format": "ED-269"}},
+            CreateGeozoneSourceRequest,
+        ),
+        GeozoneSourceResponseResult.Ready,
+    )
+
+
+def test_batched_checks(monkeypatch):
+    dataset = ED269Schema.from_dict(
+        {
+            "features": [
+                _feature("a", 6.14, 46.20, "PROHIBITED"),
+                _feature("b", 6.20, 46.20, "REQ_AUTHORISATION"),
+            ]
+        }
+    )
+    source_id = "check_test_source"
+    _insert_source(source_id)
+    try:
+        Database.update_source_geozone_ed269(db, source_id, dataset)
+
+        checks = [
+            _check(6.10 + 0.01 * i, 46.20, restrictions)
+            for i in range(15)
+            for restrictions in (None, ["PROHIBITED"], ["NO_RESTRICTION"])
+        ]
+        # Checks repeated and without filter sets must also be answered in order
+        checks += checks[0:3] + [{"filterSets": []}]
+        req = ImplicitDict.parse({"checks": checks}, GeozonesCheckRequest)
+        expected = [
+            evaluate_features(dataset.features, c.filterSets[0])
+            if c.filterSets
+            else GeozonesCheckResultGeozone.Present
+            for c in req.checks
+        ]
+        assert GeozonesCheckResultGeozone.Present in expected
+        assert GeozonesCheckResultGeozone.Absent in expected
+
+        assert check.check_geozones(req) == expected
+        monkeypatch.setattr(check, "PARALLEL_EVALUATION_THRESHOLD", 1)
+        monkeypatch.setattr(check.os, "cpu_count", lambda: 2)
+
+        # Sources are compiled by this process only; workers must not load datasets themselves
+        forget_compiled_sources(set())
+        parent_pid = os.getpid()
+        load_ed269_dataset = ed269.load_ed269_dataset
+
+        def load_in_parent_only(source):
+            if os.getpid() != parent_pid:
+                raise RuntimeError("Dataset loaded by worker process")
+            return load_ed269_dataset(source)
+
+        monkeypatch.setattr(ed269, "load_ed269_dataset", load_in_parent_only)
+        assert check.check_geozones(req) == expected
+    finally:
+        Database.delete_source(db, source_id)
+
+
+def test_removed_dataset_not_ready():
+    dataset = ED269Schema.from_dict(
+        {"features": [_feature("a", 6.14, 46.20, "PROHIBITED")]}
+    )
+    source_id = "check_test_removed_source"
+    _insert_source(source_id)
+    try:
+        Database.update_source_geozone_ed269(db, source_id, dataset)
+
+        # Simulate a concurrent DELETE removing the dataset before this process compiles it
+        forget_compiled_sources(set())
+        os.remove(Database.get_source(db, source_id).dataset_path)
+
+        req = ImplicitDict.parse(
+            {"checks": [_check(6.14, 46.20, None)]}, GeozonesCheckRequest
+        )
+        assert check.check_geozones(req) == [GeozonesCheckResultGeozone.Absent]
+    finally:
+        Database.delete_source(db, source_id)
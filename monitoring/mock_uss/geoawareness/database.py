@@ -1,4 +1,7 @@
 import json
+import os
+import tempfile
+import uuid
 from typing import Dict, Optional
 from implicitdict import ImplicitDict
 from monitoring.monitorlib.multiprocessing import SynchronizedValue
@@ -9,6 +12,10 @@ from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
 )
 
 
+DATASET_FOLDER = os.path.join(tempfile.gettempdir(), "mock_uss_geoawareness")
+"""Folder in which loaded geozone datasets are stored, outside the shared database."""
+
+
 class ExistingRecordException(ValueError):
     pass
 
@@ -17,7 +24,11 @@ class SourceRecord(ImplicitDict):
     definition: CreateGeozoneSourceRequest
     state: GeozoneSourceResponseResult
     message: Optional[str]
-    geozone_ed269: Optional[ED269Schema]
+    revision: Optional[str]
+    """Identifier of the currently-loaded geozone dataset; changes each time a dataset is loaded."""
+
+    dataset_path: Optional[str]
+    """Path to the file containing the currently-loaded ED-269 geozone dataset (see load_ed269_dataset)."""
 
 
 class Database(ImplicitDict):
@@ -56,8 +67,11 @@ class Database(ImplicitDict):
         id: str,
         state: GeozoneSourceResponseResult,
         message: Optional[str] = None,
-    ):
+    ) -> Optional[SourceRecord]:
         with db as tx:
+            if id not in tx.sources:
+                # Source was deleted
+                return None
             tx.sources[id]["state"] = state
             tx.sources[id]["message"] = message
             result = tx.sources[id]
@@ -66,16 +80,47 @@ class Database(ImplicitDict):
     @staticmethod
     def update_source_geozone_ed269(
         db: SynchronizedValue, id: str, geozone: ED269Schema
-    ):
+    ) -> Optional[SourceRecord]:
+        # The dataset is stored outside the database so that database access does not scale with dataset size
+        revision = uuid.uuid4().hex
+        os.makedirs(DATASET_FOLDER, exist_ok=True)
+        dataset_path = os.path.join(DATASET_FOLDER, f"{revision}.json")
+        with open(dataset_path, "w") as f:
+            json.dump(geozone, f)
         with db as tx:
-            tx.sources[id]["geozone_ed269"] = geozone
-            result = tx.sources[id]
+            if id in tx.sources:
+                old_dataset_path = tx.sources[id].get("dataset_path", None)
+                tx.sources[id]["revision"] = revision
+                tx.sources[id]["dataset_path"] = dataset_path
+                result = tx.sources[id]
+            else:
+                # Source was deleted while its dataset was being loaded
+                old_dataset_path = dataset_path
+                result = None
+        _remove_dataset(old_dataset_path)
         return result
 
     @staticmethod
     def delete_source(db: SynchronizedValue, id: str):
         with db as tx:
-            return tx.sources.pop(id, None)
+            source = tx.sources.pop(id, None)
+        if source is not None:
+            _remove_dataset(source.get("dataset_path", None))
+        return source
+
+
+def load_ed269_dataset(source: SourceRecord) -> ED269Schema:
+    """Load the ED-269 geozone dataset of the specified source from its dataset file."""
+    with open(source.dataset_path, "r") as f:
+        return ED269Schema.from_dict(json.load(f))
+
+
+def _remove_dataset(dataset_path: Optional[str]) -> None:
+    if dataset_path:
+        try:
+            os.remove(dataset_path)
+        except FileNotFoundError:
+            pass
 
 
 db = SynchronizedValue(
@@ -1,16 +1,23 @@
 import ast
+import bisect
 import json
 import logging
-from datetime import datetime
-from typing import List, Optional, Union
+import math
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from datetime import datetime, UTC
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import s2sphere
 from s2sphere import LatLng
-from shapely.geometry import Point, Polygon
+from shapely.geometry import Point, Polygon, box
+from shapely.prepared import PreparedGeometry, prep
+from shapely.strtree import STRtree
 
 from implicitdict import StringBasedDateTime
-from monitoring.mock_uss.geoawareness.database import SourceRecord
-from monitoring.monitorlib.geo import flatten
+from monitoring.mock_uss.geoawareness.database import SourceRecord, load_ed269_dataset
+from monitoring.monitorlib.geo import EARTH_CIRCUMFERENCE_KM, flatten
 from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
     GeozonesFilterSet,
     Position,
@@ -19,6 +26,8 @@ from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
     GeozoneSourceResponseResult,
 )
 from uas_standards.eurocae_ed269 import (
+    ED269Schema,
+    UASZoneAirspaceVolume,
     UASZoneVersion,
     HorizontalProjectionType,
     UomDimensions,
@@ -97,6 +106,312 @@ def evaluate_position(feature: UASZoneVersion, position: Optional[Position]) ->
     return False
 
 
+@dataclass
+class CompiledGeometry(object):
+    """Horizontal projection of an ED-269 geometry, flattened around a reference point and prepared for evaluation."""
+
+    reference: LatLng
+    """Reference point around which shape was flattened."""
+
+    shape: PreparedGeometry
+    """Flattened (in meters from reference) and prepared shape."""
+
+    def contains(self, position: Position) -> bool:
+        return self.shape.contains(
+            Point(
+                flatten(
+                    self.reference,
+                    LatLng.from_degrees(position.latitude, position.longitude),
+                )
+            )
+        )
+
+
+def _meters_to_degrees_lat(distance: float) -> float:
+    return distance * 360 / (EARTH_CIRCUMFERENCE_KM * 1000)
+
+
+def _compile_geometry(
+    g: UASZoneAirspaceVolume,
+) -> List[Tuple[CompiledGeometry, Tuple[float, float, float, float]]]:
+    """Compile an ED-269 geometry into shapes along with the lng/lat bounds of each shape.
+
+    Evaluation of the compiled shapes is equivalent to evaluate_position.
+    """
+    result = []
+    if g.horizontalProjection.type == HorizontalProjectionType.Circle:
+        center = g.horizontalProjection.center  # Lng / Lat
+        ref = LatLng.from_degrees(center[1], center[0])
+        radius = convert_distance(
+            g.horizontalProjection.radius, g.uomDimensions, UomDimensions.M
+        )
+        d_lat = _meters_to_degrees_lat(radius)
+        cos_lat = math.cos(ref.lat().radians)
+        d_lng = d_lat / cos_lat if cos_lat > 1e-9 else 360
+        result.append(
+            (
+                CompiledGeometry(reference=ref, shape=prep(Point(0, 0).buffer(radius))),
+                (
+                    center[0] - d_lng,
+                    center[1] - d_lat,
+                    center[0] + d_lng,
+                    center[1] + d_lat,
+                ),
+            )
+        )
+    else:
+        for coord in g.horizontalProjection.coordinates:  # Lng / Lat
+            ref = s2sphere.LatLng.from_degrees(
+                coord[0][1], coord[0][0]
+            )  # TODO: Use barycenter as reference instead of first point.
+            polygon_2d = Polygon(
+                [
+                    flatten(ref, s2sphere.LatLng.from_degrees(p[1], p[0]))
+                    for p in coord  # Lng / Lat
+                ]
+            )
+            # Flattening is affine in lng and lat, so the lng/lat bounds of the points bound the flattened polygon
+            result.append(
+                (
+                    CompiledGeometry(reference=ref, shape=prep(polygon_2d)),
+                    (
+                        min(p[0] for p in coord),
+                        min(p[1] for p in coord),
+                        max(p[0] for p in coord),
+                        max(p[1] for p in coord),
+                    ),
+                )
+            )
+    return result
+
+
+_EARLIEST = datetime.min.replace(tzinfo=UTC)
+_LATEST = datetime.max.replace(tzinfo=UTC)
+
+
+@dataclass
+class CompiledFeature(object):
+    feature: UASZoneVersion
+    geometries: List[CompiledGeometry]
+
+    permanent: bool
+    """True if any applicability of this feature is permanent."""
+
+    intervals: List[Tuple[datetime, datetime]]
+    """(start, end) of each non-permanent applicability of this feature."""
+
+    uspace_classes: Optional[List[str]]
+    """Normalized uSpaceClass values of this feature."""
+
+    restriction: Optional[str]
+
+    def evaluate_position(self, position: Optional[Position]) -> bool:
+        if position is None:
+            return True
+        return any(g.contains(position) for g in self.geometries)
+
+
+def _enum_value(v):
+    # Enum members do not hash like their values, so use plain values as index keys
+    return v.value if isinstance(v, Enum) else v
+
+
+def _compile_feature(
+    feature: UASZoneVersion,
+) -> Tuple[CompiledFeature, List[Tuple[float, float, float, float]]]:
+    """Compile an ED-269 feature, also returning the lng/lat bounds of each of its compiled geometries."""
+    geometries = []
+    bounds = []
+    for g in feature.geometry:
+        for compiled, compiled_bounds in _compile_geometry(g):
+            geometries.append(compiled)
+            bounds.append(compiled_bounds)
+    permanent = False
+    intervals = []
+    for a in feature.applicability:
+        if a.permanent == YESNO.YES:
+            permanent = True
+            continue
+        start = a.get("startDateTime", None)
+        end = a.get("endDateTime", None)
+        intervals.append(
+            (
+                start.datetime if start is not None else _EARLIEST,
+                end.datetime if end is not None else _LATEST,
+            )
+        )
+    compiled = CompiledFeature(
+        feature=feature,
+        geometries=geometries,
+        permanent=permanent,
+        intervals=intervals,
+        uspace_classes=_adjust_uspace_class(feature.get("uSpaceClass", None)),
+        restriction=_enum_value(feature.get("restriction", None)),
+    )
+    return compiled, bounds
+
+
+class CompiledED269Source(object):
+    """ED-269 features compiled for efficient evaluation.
+
+    Feature geometries are flattened and prepared once, and their lng/lat bounds are indexed in an STRtree so that
+    only features near a position need to be evaluated precisely.  Applicability intervals, uSpaceClasses and
+    restrictions are normalized once and indexed so that the features matching a filter set are found by intersecting
+    index lookups.
+    """
+
+    features: List[CompiledFeature]
+
+    def __init__(self, features: List[UASZoneVersion]):
+        self.features = []
+        bounds: List[Polygon] = []
+        self._feature_of_bounds: List[int] = []
+        self._applicable: Set[int] = set()
+        self._permanent: Set[int] = set()
+        intervals: List[Tuple[datetime, datetime, int]] = []
+        self._by_uspace_class: Dict[str, Set[int]] = {}
+        self._by_restriction: Dict[Optional[str], Set[int]] = {}
+        for i, feature in enumerate(features):
+            compiled, feature_bounds = _compile_feature(feature)
+            self.features.append(compiled)
+
+            for min_lng, min_lat, max_lng, max_lat in feature_bounds:
+                bounds.append(box(min_lng, min_lat, max_lng, max_lat))
+                self._feature_of_bounds.append(i)
+
+            if compiled.permanent:
+                self._permanent.add(i)
+            if compiled.permanent or compiled.intervals:
+                self._applicable.add(i)
+            intervals.extend((start, end, i) for start, end in compiled.intervals)
+            for uspace_class in compiled.uspace_classes or []:
+                self._by_uspace_class.setdefault(uspace_class, set()).add(i)
+            self._by_restriction.setdefault(compiled.restriction, set()).add(i)
+
+        self._bounds_index = {id(b): i for i, b in enumerate(bounds)}
+        self._tree = STRtree(bounds) if bounds else None
+        intervals.sort(key=lambda interval: interval[0])
+        self._intervals = intervals
+        self._interval_starts = [interval[0] for interval in intervals]
+
+    def near(self, position: Position) -> Set[int]:
+        """Indices of features whose bounds contain position."""
+        if self._tree is None:
+            return set()
+        hits = self._tree.query(Point(position.longitude, position.latitude))
+        feature_indices: Set[int] = set()
+        for hit in hits:
+            # Shapely 1.x returns the indexed geometries while Shapely 2.x returns their indices
+            i = self._bounds_index[id(hit)] if hasattr(hit, "bounds") else int(hit)
+            feature_indices.add(self._feature_of_bounds[i])
+        return feature_indices
+
+    def _applicable_during(
+        self,
+        after: Optional[StringBasedDateTime],
+        before: Optional[StringBasedDateTime],
+    ) -> Set[int]:
+        """Indices of features which evaluate_timing would accept."""
+        if after is None and before is None:
+            return self._applicable
+        n = (
+            bisect.bisect_left(self._interval_starts, before.datetime)
+            if before is not None
+            else len(self._intervals)
+        )
+        t_after = after.datetime if after is not None else None
+        result = set(self._permanent)
+        for start, end, i in self._intervals[0:n]:
+            if t_after is None or end > t_after:
+                result.add(i)
+        return result
+
+    def _matching_non_spacetime(
+        self, ed269: Optional[ED269Filters]
+    ) -> Optional[Set[int]]:
+        """Indices of features which evaluate_non_spacetime would accept, or None if all features would be accepted."""
+        if ed269 is None:
+            return None
+        result = None
+        uspace_class_filter = ed269.get("uSpaceClass", None)
+        if uspace_class_filter is not None:
+            result = self._by_uspace_class.get(_enum_value(uspace_class_filter), set())
+        acceptable_restrictions_filter = ed269.get("acceptableRestrictions", None)
+        if acceptable_restrictions_filter is not None:
+            acceptable = set()
+            for restriction in acceptable_restrictions_filter:
+                acceptable |= self._by_restriction.get(_enum_value(restriction), set())
+            result = acceptable if result is None else result & acceptable
+        return result
+
+    def candidates(self, position: Optional[Position]) -> List[CompiledFeature]:
+        """Features (in their original order) which may contain position, or all features if position is None."""
+        if position is None:
+            return self.features
+        return [self.features[i] for i in sorted(self.near(position))]
+
+    def matching_features(
+        self, filter_set: GeozonesFilterSet, near: Optional[Set[int]] = None
+    ) -> List[CompiledFeature]:
+        """Features (in their original order) matching filter_set, as evaluate_feature would determine.
+
+        Args:
+            filter_set: Filters to apply.
+            near: Result of near() for filter_set's position, if already determined.
+        """
+        matches = self._applicable_during(
+            filter_set.get("after", None), filter_set.get("before", None)
+        )
+        non_spacetime_matches = self._matching_non_spacetime(
+            filter_set.get("ed269", None)
+        )
+        if non_spacetime_matches is not None:
+            matches = matches & non_spacetime_matches
+        position = filter_set.get("position", None)
+        if position is not None:
+            matches = matches & (near if near is not None else self.near(position))
+        return [
+            self.features[i]
+            for i in sorted(matches)
+            if self.features[i].evaluate_position(position)
+        ]
+
+
+_compiled_sources: Dict[str, CompiledED269Source] = {}
+"""Compiled ED-269 sources (in this process) by source revision."""
+
+_compiled_sources_lock = threading.Lock()
+
+
+def compile_source(
+    source: SourceRecord, dataset: Optional[ED269Schema] = None
+) -> CompiledED269Source:
+    """Get the compiled form of a loaded ED-269 source, compiling it if this process has not already done so.
+
+    Args:
+        source: Loaded ED-269 source.
+        dataset: Content of the source's dataset, if already available (otherwise, it is loaded from the dataset file).
+    """
+    if not source.get("dataset_path", None):
+        raise ValueError("Source not loaded correctly. dataset_path field missing.")
+    with _compiled_sources_lock:
+        compiled = _compiled_sources.get(source.revision, None)
+        if compiled is None:
+            # Each process loads and compiles the dataset only once per revision
+            if dataset is None:
+                dataset = load_ed269_dataset(source)
+            compiled = CompiledED269Source(dataset.features)
+            _compiled_sources[source.revision] = compiled
+    return compiled
+
+
+def forget_compiled_sources(except_revisions: Set[str]) -> None:
+    """Discard compiled sources (in this process) other than those with the specified revisions."""
+    with _compiled_sources_lock:
+        for revision in set(_compiled_sources) - except_revisions:
+            del _compiled_sources[revision]
+
+
 def _is_in_date_range(
     start: StringBasedDateTime,
     end: StringBasedDateTime,
@@ -249,19 +564,3 @@ def evaluate_features(
 
     logger.info(f" => No match - Absent")
     return GeozonesCheckResultGeozone.Absent
-
-
-def evaluate_source(source: SourceRecord, filter_sets: List[GeozonesFilterSet]):
-    if not (
-        source.state == GeozoneSourceResponseResult.Ready and "geozone_ed269" in source
-    ):
-        raise ValueError("Source not loaded correctly. geozone_ed269 field missing.")
-
-    if len(filter_sets) == 0:
-        return GeozonesCheckResultGeozone.Present
-
-    features = source["geozone_ed269"]["features"]
-    for f in filter_sets:
-        if evaluate_features(features, f) == GeozonesCheckResultGeozone.Present:
-            return GeozonesCheckResultGeozone.Present
-    return GeozonesCheckResultGeozone.Absent
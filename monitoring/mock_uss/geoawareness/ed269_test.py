@@ -3,9 +3,12 @@ from s2sphere import LatLng
 from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
     Position,
     ED269Filters,
+    GeozonesFilterSet,
 )
 from implicitdict import StringBasedDateTime
 from monitoring.mock_uss.geoawareness.ed269 import (
+    CompiledED269Source,
+    evaluate_feature,
     evaluate_non_spacetime,
     evaluate_position,
     convert_distance,
@@ -243,6 +246,45 @@ def test_evaluate_position_multigeometry():
     )
 
 
+def test_compiled_source_matches_evaluate_position():
+    other_fields = {
+        "country": "CHE",
+        "type": "COMMON",
+        "zoneAuthority": [],
+        "applicability": [],
+        "restriction": "PROHIBITED",
+    }
+    features = [
+        UASZoneVersion(identifier="circle", geometry=[circle1], **other_fields),
+        UASZoneVersion(identifier="polygon", geometry=[polygon1], **other_fields),
+        UASZoneVersion(identifier="both", geometry=[polygon1, circle1], **other_fields),
+    ]
+    compiled = CompiledED269Source(features)
+
+    ref = LatLng.from_degrees(46.204391, 6.143158)
+    for dx in range(-6000, 6001, 500):
+        for dy in range(-6000, 6001, 500):
+            p = unflatten(ref, (dx, dy))
+            position = Position(
+                uomDimensions=UomDimensions.M,
+                verticalReferenceType=VerticalReferenceType.AGL,
+                height=100,
+                longitude=p.lng().degrees,
+                latitude=p.lat().degrees,
+            )
+            expected = [
+                f.identifier for f in features if evaluate_position(f, position)
+            ]
+            actual = [
+                c.feature.identifier
+                for c in compiled.candidates(position)
+                if c.evaluate_position(position)
+            ]
+            assert actual == expected
+
+    assert len(compiled.candidates(None)) == len(features)
+
+
 def test_evaluate_timing():
     other_fields = {
         "country": "CHE",
@@ -449,3 +491,83 @@ def test_evaluate_non_spacetime():
         )
         is False
     )
+
+
+def test_compiled_source_matches_evaluate_feature():
+    d = [StringBasedDateTime(f"2024-01-0{day}T00:00:00Z") for day in range(1, 6)]
+    applicabilities = [
+        [],
+        [ApplicableTimePeriod(permanent=YESNO.YES)],
+        [
+            ApplicableTimePeriod(
+                permanent=YESNO.NO, startDateTime=d[1], endDateTime=d[2]
+            )
+        ],
+        [
+            ApplicableTimePeriod(
+                permanent=YESNO.NO, startDateTime=d[0], endDateTime=d[1]
+            ),
+            ApplicableTimePeriod(
+                permanent=YESNO.NO, startDateTime=d[3], endDateTime=d[4]
+            ),
+        ],
+    ]
+    features = []
+    for i, applicability in enumerate(applicabilities):
+        for j, uspace_class in enumerate([None, "C1", '["C1", "C2"]']):
+            for restriction in ["PROHIBITED", "NO_RESTRICTION"]:
+                fields = {"uSpaceClass": uspace_class} if uspace_class else {}
+                features.append(
+                    UASZoneVersion(
+                        identifier=f"F{len(features)}",
+                        country="CHE",
+                        type="COMMON",
+                        zoneAuthority=[],
+                        applicability=applicability,
+                        restriction=restriction,
+                        geometry=[circle1] if (i + j) % 2 else [polygon1],
+                        **fields,
+                    )
+                )
+    compiled = CompiledED269Source(features)
+
+    positions = [None] + [
+        Position(
+            uomDimensions=UomDimensions.M,
+            verticalReferenceType=VerticalReferenceType.AGL,
+            height=100,
+            longitude=lng,
+            latitude=46.204391,
+        )
+        for lng in (6.143158, 6.17, 6.3)
+    ]
+    times = [None] + d
+    ed269_filters = [
+        None,
+        ED269Filters(),
+        ED269Filters(uSpaceClass="C2"),
+        ED269Filters(uSpaceClass="C1", acceptableRestrictions=["PROHIBITED"]),
+    ]
+    for position in positions:
+        for after in times:
+            for before in times:
+                for ed269 in ed269_filters:
+                    filter_set = GeozonesFilterSet()
+                    if position is not None:
+                        filter_set.position = position
+                    if after is not None:
+                        filter_set.after = after
+                    if before is not None:
+                        filter_set.before = before
+                    if ed269 is not None:
+                        filter_set.ed269 = ed269
+                    expected = [
+                        f.identifier
+                        for f in features
+                        if evaluate_feature(f, filter_set)
+                    ]
+                    actual = [
+                        c.feature.identifier
+                        for c in compiled.matching_features(filter_set)
+                    ]
+                    assert actual == expected
@@ -1,12 +1,10 @@
-import flask
-import requests
-from uas_standards.eurocae_ed269 import ED269Schema
 from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
     GeozoneSourceResponseResult,
     CreateGeozoneSourceRequest,
     GeozoneHttpsSourceFormat,
     GeozoneSourceResponse,
 )
+from monitoring.mock_uss.geoawareness import ingestion
 from monitoring.mock_uss.geoawareness.database import (
     db,
     ExistingRecordException,
@@ -21,7 +19,7 @@ def get_geozone_source(geozone_source_id: str):
     if source is None:
         return f"source {geozone_source_id} not found or deleted", 404
     return (
-        GeozoneSourceResponse(result=GeozoneSourceResponseResult.Ready),
+        GeozoneSourceResponse(result=source.state, message=source.get("message", None)),
         200,
     )
 
@@ -37,20 +35,19 @@ def create_geozone_source(id, source_definition: CreateGeozoneSourceRequest):
         return f"source {id} already exists in database", 409
 
     if "https_source" in source.definition:
-        try:
-            raw_data = requests.get(source.definition.https_source.url).json()
-            if source.definition.https_source.format == GeozoneHttpsSourceFormat.ED_269:
-                geozones = ED269Schema.from_dict(raw_data)
-                Database.update_source_geozone_ed269(db, id, geozones)
-                source = Database.update_source_state(
-                    db, id, GeozoneSourceResponseResult.Ready
-                )
-        except ValueError as e:
+        if source.definition.https_source.format == GeozoneHttpsSourceFormat.ED_269:
+            # The source remains Activating until loaded in the background
+            ingestion.start_ed269_ingestion(id, source.definition.https_source.url)
+        else:
             source = Database.update_source_state(
                 db,
                 id,
                 GeozoneSourceResponseResult.Error,
-                f"Unable to download and parse {source.definition.https_source.url}: {str(e)}",
+                f"Unsupported format {source.definition.https_source.format}",
+            )
+            return (
+                GeozoneSourceResponse(result=source.state, message=source.message),
+                400,
             )
 
     else:
@@ -0,0 +1,197 @@
+import codecs
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List
+
+import requests
+from implicitdict import ImplicitDict
+from loguru import logger
+from uas_standards.eurocae_ed269 import ED269Schema, UASZoneVersion
+from uas_standards.interuss.automated_testing.geo_awareness.v1.api import (
+    GeozoneSourceResponseResult,
+)
+
+from monitoring.mock_uss.geoawareness import ed269
+from monitoring.mock_uss.geoawareness.database import Database, db
+from monitoring.monitorlib.errors import stacktrace_string
+
+MAX_CONCURRENT_INGESTIONS = 2
+"""Maximum number of geozone sources (per process) to download and load concurrently."""
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+"""Size of the chunks in which geozone source data is downloaded and parsed."""
+
+DOWNLOAD_TIMEOUT_S = (10, 60)
+"""Connect and read timeouts when downloading geozone source data."""
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CONTINUATION = re.compile(r"[0-9.eE+-]*\Z")
+_decoder = json.JSONDecoder()
+
+_ingestion_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_INGESTIONS, thread_name_prefix="GeozoneIngestion"
+)
+
+
+class _JSONStream(object):
+    """Sequential reader of JSON values from text arriving in chunks."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks: Iterator[str] = iter(chunks)
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            return False
+        # Discard text that has already been consumed
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it, or empty string at end of stream."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._read_more():
+                return self._buffer[self._pos : self._pos + 1]
+
+    def next_char(self) -> str:
+        c = self.peek()
+        self._pos += len(c)
+        return c
+
+    def expect(self, expected: str) -> None:
+        c = self.next_char()
+        if c != expected:
+            raise ValueError(f"Expected '{expected}' but found '{c or 'end of data'}'")
+
+    def value(self):
+        """Read a complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._read_more():
+                    continue
+                raise ValueError(f"Invalid JSON: {e}")
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and _NUMBER_CONTINUATION.match(self._buffer, end)
+                and self._read_more()
+            ):
+                # A number followed only by what could be more of the number (e.g., "12." of "12.5") may continue in
+                # the next chunk
+                continue
+            self._pos = end
+            return value
+
+
+def parse_ed269(chunks: Iterable[str]) -> ED269Schema:
+    """Parse an ED-269 dataset from text arriving in chunks.
+
+    Each feature is validated as soon as it has been received, so invalid data is detected without waiting for the
+    rest of the dataset, and the raw JSON of the complete dataset is never held in memory.
+    """
+    stream = _JSONStream(chunks)
+    content = {}
+    features: List[UASZoneVersion] = []
+    stream.expect("{")
+    if stream.peek() == "}":
+        stream.next_char()
+    else:
+        while True:
+            key = stream.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected object key but found {key}")
+            stream.expect(":")
+            if key == "features":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.next_char()
+                else:
+                    while True:
+                        try:
+                            features.append(
+                                ImplicitDict.parse(stream.value(), UASZoneVersion)
+                            )
+                        except (KeyError, TypeError, ValueError) as e:
+                            raise ValueError(f"Invalid feature {len(features)}: {e}")
+                        c = stream.next_char()
+                        if c == "]":
+                            break
+                        elif c != ",":
+                            raise ValueError(
+                                f"Expected ',' or ']' after feature {len(features) - 1} but found '{c or 'end of data'}'"
+                            )
+                content[key] = features
+            else:
+                content[key] = stream.value()
+            c = stream.next_char()
+            if c == "}":
+                break
+            elif c != ",":
+                raise ValueError(
+                    f"Expected ',' or '}}' but found '{c or 'end of data'}'"
+                )
+    if stream.peek():
+        raise ValueError("Unexpected data after end of ED-269 dataset")
+    if "features" not in content:
+        raise ValueError("ED-269 dataset did not contain features")
+    return ED269Schema(**content)
+
+
+def _download_text(url: str) -> Iterator[str]:
+    with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT_S) as resp:
+        resp.raise_for_status()
+        # JSON exchanged between systems must be encoded as UTF-8 (RFC 8259)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+
+def _ingest_ed269(source_id: str, url: str) -> None:
+    try:
+        geozones = parse_ed269(_download_text(url))
+        source = Database.update_source_geozone_ed269(db, source_id, geozones)
+        if source is None:
+            logger.info(f"Geozone source {source_id} was deleted while loading")
+            return
+        # Build indexes before indicating the source is ready
+        ed269.compile_source(source, geozones)
+        Database.update_source_state(db, source_id, GeozoneSourceResponseResult.Ready)
+    except (ValueError, requests.RequestException) as e:
+        Database.update_source_state(
+            db,
+            source_id,
+            GeozoneSourceResponseResult.Error,
+            f"Unable to download and parse {url}: {str(e)}",
+        )
+    except Exception as e:
+        logger.error(
+            f"{type(e).__name__} while loading geozone source {source_id}: {str(e)}\n{stacktrace_string(e)}"
+        )
+        Database.update_source_state(
+            db,
+            source_id,
+            GeozoneSourceResponseResult.Error,
+            f"{type(e).__name__} while loading {url}: {str(e)}",
+        )
+
+
+def start_ed269_ingestion(source_id: str, url: str) -> None:
+    """Download and load the ED-269 geozone source at url in the background.
+
+    The source's state is changed to Ready once loaded and indexed, or to Error if it could not be loaded.
+    """
+    _ingestion_executor.submit(_ingest_ed269, source_id, url)
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from uas_standards.eurocae_ed269 import ED269Schema
+
+from monitoring.mock_uss.geoawareness.ingestion import _JSONStream, parse_ed269
+
+
+def _feature(identifier: str) -> dict:
+    return {
+        "identifier": identifier,
+        "country": "CHE",
+        "name": "Zone é✈",
+        "type": "COMMON",
+        "restriction": "PROHIBITED",
+        "zoneAuthority": [],
+        "applicability": [{"permanent": "YES"}],
+        "geometry": [
+            {
+                "uomDimensions": "M",
+                "lowerLimit": 0,
+                "lowerVerticalReference": "AGL",
+                "upperLimit": 120,
+                "upperVerticalReference": "AGL",
+                "horizontalProjection": {
+                    "type": "Circle",
+                    "center": [6.125, -46.25],
+                    "radius": 2.5e3,
+                },
+            }
+        ],
+    }
+
+
+DATASET = json.dumps(
+    {"title": "Test dataset", "features": [_feature("a"), _feature("b")]}, indent=1
+)
+
+
+def _splits(text: str):
+    """Every way of splitting text into two chunks, and text split into single characters."""
+    for i in range(len(text) + 1):
+        yield [text[0:i], text[i:]]
+    yield list(text)
+
+
+def test_parse_at_every_chunk_boundary():
+    expected = ED269Schema.from_dict(json.loads(DATASET))
+    for chunks in _splits(DATASET):
+        assert parse_ed269(chunks) == expected
+
+
+def test_number_at_every_chunk_boundary():
+    text = '[-12.5e2, 0.125, 3]  "end"'
+    for chunks in _splits(text):
+        stream = _JSONStream(chunks)
+        stream.expect("[")
+        values = [stream.value()]
+        while stream.next_char() == ",":
+            values.append(stream.value())
+        assert values == [-1250, 0.125, 3]
+        assert stream.value() == "end"
+        assert stream.peek() == ""
+
+
+def test_empty_features():
+    assert parse_ed269(['{"features"', ": [ ]}"]).features == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Trailing comma after last feature
+        DATASET[0 : DATASET.rindex("]")] + ",]}",
+        # Trailing comma after last member
+        '{"features": [],}',
+        # Garbage after end of dataset
+        DATASET + " {}",
+        DATASET + "x",
+        # Missing features
+        '{"title": "Test dataset"}',
+        "{}",
+        # Truncated dataset
+        DATASET[0 : len(DATASET) // 2],
+        DATASET[0:-1],
+        # Invalid feature
+        '{"features": [{"identifier": "a"}]}',
+        # Not an object
+        "[]",
+        "",
+    ],
+)
+def test_malformed_dataset(text: str):
+    for chunks in ([text], list(text)):
+        with pytest.raises(ValueError):
+            parse_ed269(chunks)
@@ -1,3 +1,4 @@
+import time
 import uuid
 
 import pytest
@@ -29,6 +30,16 @@ def client_options(app):
     return {"headers": {"Authorization": f"Bearer {token}"}}
 
 
+def _wait_for_source(client, client_options, id, timeout_s: float = 30):
+    """Wait for a geozone source to finish activating and return the final GET response."""
+    t_end = time.monotonic() + timeout_s
+    while True:
+        response = client.get(f"/geoawareness/geozone_sources/{id}", **client_options)
+        if response.json["result"] != "Activating" or time.monotonic() > t_end:
+            return response
+        time.sleep(0.1)
+
+
 def test_status_unauthenticated(client):
     response = client.get("/geoawareness/status")
     assert response.status_code == 401
@@ -55,13 +66,14 @@ def test_geosource(client, client_options):
         **client_options,
     )
     assert response.status_code == 200
-    assert response.json["result"] == "Ready"
+    assert response.json["result"] == "Activating"
     assert "message" not in response.json.keys()
 
     # Status
-    response = client.get(f"/geoawareness/geozone_sources/{id}", **client_options)
+    response = _wait_for_source(client, client_options, id)
     assert response.status_code == 200
     assert response.json["result"] == "Ready"
+    assert "message" not in response.json.keys()
 
     # Delete
     response = client.delete(f"/geoawareness/geozone_sources/{id}", **client_options)
@@ -125,6 +137,9 @@ def test_geosource_bad_url(client, client_options):
         **client_options,
     )
     assert response.status_code == 200
+    assert response.json["result"] == "Activating"
+
+    response = _wait_for_source(client, client_options, id)
     assert response.json["result"] == "Error"
     assert response.json["message"].startswith(
         "Unable to download and parse /not_found"
@@ -146,8 +161,8 @@ def test_geozone_simple_check(client, client_options):
         **client_options,
     )
     assert response.status_code == 200
-    assert response.json["result"] == "Ready"  # Synchronous load
-    assert "message" not in response.json.keys()
+    assert response.json["result"] == "Activating"  # Asynchronous load
+    assert _wait_for_source(client, client_options, id).json["result"] == "Ready"
 
     test_positions = {
         "montreux": {
@@ -1,10 +1,59 @@
 import os.path
 
 from monitoring.mock_uss import import_environment_variable, webapp
+from monitoring.mock_uss.interaction_logging.selection import (
+    parse_flag,
+    parse_max_body_bytes,
+    parse_query_types,
+    parse_sample_rate,
+    parse_url_patterns,
+)
+from monitoring.monitorlib.fetch import QueryType
 
 KEY_INTERACTIONS_LOG_DIR = "MOCK_USS_INTERACTIONS_LOG_DIR"
 
+KEY_INTERACTIONS_LOG_QUERY_TYPES = "MOCK_USS_INTERACTIONS_LOG_QUERY_TYPES"
+"""Environment variable containing comma-separated query types of outgoing queries to log, or * to log all outgoing
+queries."""
+
+KEY_INTERACTIONS_LOG_URL_PATTERNS = "MOCK_USS_INTERACTIONS_LOG_URL_PATTERNS"
+"""Environment variable containing comma-separated regular expressions; incoming requests with a URL matching any of
+these expressions are logged."""
+
+KEY_INTERACTIONS_LOG_SAMPLE_RATE = "MOCK_USS_INTERACTIONS_LOG_SAMPLE_RATE"
+"""Environment variable containing the fraction (0 to 1) of eligible interactions to log."""
+
+KEY_INTERACTIONS_LOG_MAX_BODY_BYTES = "MOCK_USS_INTERACTIONS_LOG_MAX_BODY_BYTES"
+"""Environment variable containing the maximum size of a logged request or response body; larger bodies are truncated.
+0 means bodies are never truncated."""
+
+KEY_INTERACTIONS_LOG_ASYNC = "MOCK_USS_INTERACTIONS_LOG_ASYNC"
+"""Environment variable indicating whether interactions are serialized and written by a background writer (true) or
+on the thread handling the interaction (false)."""
+
 import_environment_variable(KEY_INTERACTIONS_LOG_DIR)
+import_environment_variable(
+    KEY_INTERACTIONS_LOG_QUERY_TYPES,
+    default=",".join(
+        [
+            QueryType.F3548v21USSGetOperationalIntentDetails,
+            QueryType.F3548v21USSNotifyOperationalIntentDetailsChanged,
+        ]
+    ),
+    mutator=parse_query_types,
+)
+import_environment_variable(
+    KEY_INTERACTIONS_LOG_URL_PATTERNS, default="/uss/v1/", mutator=parse_url_patterns
+)
+import_environment_variable(
+    KEY_INTERACTIONS_LOG_SAMPLE_RATE, default="1", mutator=parse_sample_rate
+)
+import_environment_variable(
+    KEY_INTERACTIONS_LOG_MAX_BODY_BYTES, default="0", mutator=parse_max_body_bytes
+)
+import_environment_variable(
+    KEY_INTERACTIONS_LOG_ASYNC, default="true", mutator=parse_flag
+)
 
 _full_path = os.path.abspath(webapp.config[KEY_INTERACTIONS_LOG_DIR])
 if not os.path.exists(_full_path):
@@ -0,0 +1,50 @@
+import json
+from typing import List
+
+from implicitdict import ImplicitDict, StringBasedDateTime
+
+from monitoring.monitorlib.multiprocessing import SynchronizedValue
+
+
+class SegmentInfo(ImplicitDict):
+    """Index entry for one append-only segment file of the interaction log."""
+
+    filename: str
+    """Name of the segment file within the interactions log directory."""
+
+    first_sequence: int
+    """Sequence number of the first interaction in this segment."""
+
+    last_sequence: int
+    """Sequence number of the last interaction in this segment."""
+
+    earliest_time: StringBasedDateTime
+    """Earliest interaction time of any interaction in this segment."""
+
+    latest_time: StringBasedDateTime
+    """Latest interaction time of any interaction in this segment."""
+
+    size_bytes: int
+    """Size of the segment file."""
+
+
+class Database(ImplicitDict):
+    """Simple in-memory pseudo-database tracking the state of the interaction log"""
+
+    initialized: bool = False
+    """True once the index has been loaded from any segments already present in the log directory"""
+
+    next_sequence: int = 0
+    """Sequence number to assign to the next logged interaction"""
+
+    segments: List[SegmentInfo]
+    """Index of segment files in the log directory, in sequence order; new interactions are appended to the last one"""
+
+    pending_writes: int = 0
+    """Number of interactions submitted to a BackgroundWriter (in any worker process) but not yet appended to the log"""
+
+
+db = SynchronizedValue(
+    Database(segments=[]),
+    decoder=lambda b: ImplicitDict.parse(json.loads(b.decode("utf-8")), Database),
+)
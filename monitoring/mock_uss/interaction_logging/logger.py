@@ -1,24 +1,40 @@
+import atexit
+import copy
 import datetime
-import json
-import os
+from typing import Optional
 
 import flask
 import arrow
+from loguru import logger
 
 from monitoring.mock_uss import webapp, require_config_value
-from monitoring.mock_uss.interaction_logging.config import KEY_INTERACTIONS_LOG_DIR
+from monitoring.mock_uss.interaction_logging.config import (
+    KEY_INTERACTIONS_LOG_ASYNC,
+    KEY_INTERACTIONS_LOG_DIR,
+    KEY_INTERACTIONS_LOG_MAX_BODY_BYTES,
+    KEY_INTERACTIONS_LOG_QUERY_TYPES,
+    KEY_INTERACTIONS_LOG_SAMPLE_RATE,
+    KEY_INTERACTIONS_LOG_URL_PATTERNS,
+)
+from monitoring.mock_uss.interaction_logging.selection import (
+    limit_body_size,
+    should_sample,
+)
+from monitoring.mock_uss.interaction_logging.store import (
+    BackgroundWriter,
+    append_interaction,
+    wait_for_pending_writes,
+)
 from monitoring.monitorlib.clients import QueryHook, query_hooks
 from monitoring.monitorlib.clients.mock_uss.interactions import (
     Interaction,
     QueryDirection,
 )
-from monitoring.monitorlib.fetch import Query, describe_flask_query, QueryType
+from monitoring.monitorlib.fetch import Query, describe_flask_query
 
 require_config_value(KEY_INTERACTIONS_LOG_DIR)
 
-# We use dashes between hours, minutes and seconds, because colons might be problematic for Windows,
-# and the CI is unhappy about them in filenames.
-LOGGED_INTERACTION_FILENAME_TIMESTAMP_FORMAT = "%Y-%m-%dT%H-%M-%S.%fZ"
+_writer = BackgroundWriter(webapp.config[KEY_INTERACTIONS_LOG_DIR])
 
 
 def log_interaction(direction: QueryDirection, query: Query) -> None:
@@ -27,35 +43,43 @@ def log_interaction(direction: QueryDirection, query: Query) -> None:
         direction: Whether this interaction was initiated or handled by this system.
         query: Full description of the interaction to log.
     """
-    log_file(
-        code=f"{direction.value}_{query.request.method}",
-        content=Interaction(query=query, direction=direction),
-    )
-
-
-def log_file(code: str, content: Interaction) -> None:
-    log_path = webapp.config[KEY_INTERACTIONS_LOG_DIR]
-    n = len(os.listdir(log_path))
-    basename = "{:06d}_{}_{}.json".format(
-        n,
-        code,
-        content.interaction_time().strftime(
-            LOGGED_INTERACTION_FILENAME_TIMESTAMP_FORMAT
-        ),
-    )
-    with open(os.path.join(log_path, basename), "w") as f:
-        json.dump(content, f)
+    max_bytes = webapp.config[KEY_INTERACTIONS_LOG_MAX_BODY_BYTES]
+    request = limit_body_size(query.request, max_bytes)
+    response = limit_body_size(query.response, max_bytes)
+    if request is not query.request or response is not query.response:
+        query = copy.copy(query)
+        query.request = request
+        query.response = response
+    interaction = Interaction(query=query, direction=direction)
+    if webapp.config[KEY_INTERACTIONS_LOG_ASYNC]:
+        _writer.submit(interaction)
+    else:
+        append_interaction(webapp.config[KEY_INTERACTIONS_LOG_DIR], interaction)
+
+
+def flush_interaction_log(timeout_s: Optional[float] = None) -> bool:
+    """Wait until interactions logged by any worker process have been written to the log.
+
+    Returns:
+        True if all interactions were written, False if timeout_s elapsed first.
+    """
+    return wait_for_pending_writes(timeout_s)
 
 
 class InteractionLoggingHook(QueryHook):
-    def on_query(self, query: Query) -> None:
-        # TODO: Make this configurable instead of hardcoding exactly these query types
-        if "query_type" in query and query.query_type in {
-            QueryType.F3548v21USSGetOperationalIntentDetails,
-            QueryType.F3548v21USSNotifyOperationalIntentDetailsChanged,
-        }:
+    def on_query_submitted(self, query: Query) -> None:
+        # The interaction is submitted for logging before the thread that performed the query continues so that a
+        # later read of the log (from any worker process) includes it
+        query_types = webapp.config[KEY_INTERACTIONS_LOG_QUERY_TYPES]
+        if (
+            "*" in query_types
+            or ("query_type" in query and query.query_type in query_types)
+        ) and should_sample(webapp.config[KEY_INTERACTIONS_LOG_SAMPLE_RATE]):
             log_interaction(QueryDirection.Outgoing, query)
 
+    def on_query(self, query: Query) -> None:
+        pass
+
 
 query_hooks.append(InteractionLoggingHook())
 
@@ -71,8 +95,18 @@ def interaction_log_after_request(response):
     elapsed_s = (
         datetime.datetime.now(datetime.UTC) - flask.current_app.custom_profiler["start"]
     ).total_seconds()
-    # TODO: Make this configurable instead of hardcoding exactly these query types
-    if "/uss/v1/" in flask.request.url:
+    if any(
+        p.search(flask.request.url)
+        for p in webapp.config[KEY_INTERACTIONS_LOG_URL_PATTERNS]
+    ) and should_sample(webapp.config[KEY_INTERACTIONS_LOG_SAMPLE_RATE]):
         query = describe_flask_query(flask.request, response, elapsed_s)
         log_interaction(QueryDirection.Incoming, query)
     return response
+
+
+@atexit.register
+def _flush_interaction_log() -> None:
+    if _writer.pending and not _writer.flush(timeout_s=5):
+        logger.warning(
+            f"{_writer.pending} interactions were not written to the interactions log before exit"
+        )
@@ -1,75 +1,96 @@
-import json
 import os
-from datetime import datetime
-from typing import Tuple, List
+from typing import Tuple, Union
 
 from flask import request, jsonify, Response
-from implicitdict import ImplicitDict, StringBasedDateTime
-from loguru import logger
+from implicitdict import StringBasedDateTime
 
 from monitoring.mock_uss import webapp
 from monitoring.mock_uss.auth import requires_scope
 from monitoring.mock_uss.interaction_logging.config import KEY_INTERACTIONS_LOG_DIR
-from monitoring.mock_uss.interaction_logging.logger import (
-    LOGGED_INTERACTION_FILENAME_TIMESTAMP_FORMAT,
-)
-from monitoring.monitorlib.clients.mock_uss.interactions import (
-    Interaction,
-    ListLogsResponse,
+from monitoring.mock_uss.interaction_logging.logger import flush_interaction_log
+from monitoring.mock_uss.interaction_logging.store import (
+    clear,
+    read_interactions,
+    wait_for_interactions,
 )
+from monitoring.monitorlib.clients.mock_uss.interactions import ListLogsResponse
 from monitoring.monitorlib.scd_automated_testing.scd_injection_api import (
     SCOPE_SCD_QUALIFIER_INJECT,
 )
 
+MAX_FLUSH_WAIT_S = 1
+"""Maximum number of seconds to wait for pending interactions to be written before reading or clearing the log."""
+
 
 @webapp.route("/mock_uss/interuss_logging/logs", methods=["GET"])
 @requires_scope(SCOPE_SCD_QUALIFIER_INJECT)
-def interaction_logs() -> Tuple[Response, int]:
+def interaction_logs() -> Tuple[Union[Response, str], int]:
     """
     Returns all the interaction logs with requests that were
     received or initiated between 'from_time' and now
     Eg - http:/.../mock_uss/interuss_logging/logs?from_time=2023-08-30T20:48:21.900000Z
+
+    Optional query parameters:
+      * after_sequence: only return interactions logged after the one with this sequence number (use the
+        `last_sequence` of a previous response to retrieve only new interactions)
+      * query_type: only return interactions with this query type (may be specified multiple times)
+      * url_contains: only return interactions whose request URL contains this string
+      * wait_s: if no interactions match, wait up to this many seconds for a matching interaction to be logged before
+        responding (long poll)
     """
     from_time_param = request.args.get("from_time", "1900-01-01T00:00:00Z")
     from_time = StringBasedDateTime(from_time_param)
+    after_sequence = None
+    if "after_sequence" in request.args:
+        try:
+            after_sequence = int(request.args["after_sequence"])
+        except ValueError:
+            return (
+                f"Invalid after_sequence '{request.args['after_sequence']}'; expected an integer",
+                400,
+            )
+    wait_s = None
+    if "wait_s" in request.args:
+        try:
+            wait_s = float(request.args["wait_s"])
+        except ValueError:
+            return (
+                f"Invalid wait_s '{request.args['wait_s']}'; expected a number of seconds",
+                400,
+            )
+    query_types = request.args.getlist("query_type") or None
+    url_contains = request.args.get("url_contains", None)
     log_path = webapp.config[KEY_INTERACTIONS_LOG_DIR]
 
     if not os.path.exists(log_path):
         raise ValueError(f"Configured log path {log_path} does not exist")
 
-    # individual interactions are logged to a file of the form <index>_<direction>_<method>_<timestamp>.json, eg
-    # 000001_Incoming_GET_2023-08-30T20-48-21.900000Z.json
-    interactions: List[Interaction] = []
+    # Make sure interactions handled by this worker are visible
+    flush_interaction_log(timeout_s=MAX_FLUSH_WAIT_S)
 
-    for fname in os.listdir(log_path):
-        # Parse the interaction time from the file name:
-        fname_parts = fname.split("_")
-        if len(fname_parts) != 4:
-            logger.warning(
-                f"Skipping file {fname} as it does not match the expected format"
-            )
-            continue
-        interaction_time = StringBasedDateTime(
-            datetime.strptime(
-                fname_parts[3].removesuffix(".json"),
-                LOGGED_INTERACTION_FILENAME_TIMESTAMP_FORMAT,
-            )
+    if wait_s:
+        interactions, last_sequence = wait_for_interactions(
+            log_path,
+            from_time.datetime,
+            wait_s,
+            after_sequence=after_sequence,
+            query_types=query_types,
+            url_contains=url_contains,
         )
-        if interaction_time.datetime < from_time.datetime:
-            continue
-        with open(os.path.join(log_path, fname), "r") as f:
-            try:
-                obj = json.load(f)
-                interaction = ImplicitDict.parse(obj, Interaction)
-                if interaction.interaction_time() >= from_time.datetime:
-                    interactions.append(interaction)
-            except (KeyError, ValueError) as e:
-                msg = f"Error occurred in reading interaction from file {fname}: {e}"
-                raise type(e)(msg)
-
-    # Sort by interaction time
-    interactions.sort(key=lambda i: i.interaction_time())
-    return jsonify(ListLogsResponse(interactions=interactions)), 200
+    else:
+        interactions, last_sequence = read_interactions(
+            log_path,
+            from_time.datetime,
+            after_sequence=after_sequence,
+            query_types=query_types,
+            url_contains=url_contains,
+        )
+    return (
+        jsonify(
+            ListLogsResponse(interactions=interactions, last_sequence=last_sequence)
+        ),
+        200,
+    )
 
 
 @webapp.route("/mock_uss/interuss_logging/logs", methods=["DELETE"])
@@ -81,13 +102,7 @@ def delete_interaction_logs() -> Tuple[str, int]:
     if not os.path.exists(log_path):
         raise ValueError(f"Configured log path {log_path} does not exist")
 
-    logger.debug(f"Number of files in {log_path}: {len(os.listdir(log_path))}")
-
-    num_removed = 0
-    for file in os.listdir(log_path):
-        file_path = os.path.join(log_path, file)
-        os.remove(file_path)
-        logger.debug(f"Removed log file - {file_path}")
-        num_removed = num_removed + 1
+    flush_interaction_log(timeout_s=MAX_FLUSH_WAIT_S)
+    num_removed = clear(log_path)
 
     return f"Removed {num_removed} files", 200
@@ -0,0 +1,69 @@
+"""Selection of the interactions to log, and limits on what is logged for each.
+
+These functions do not depend on the mock_uss configuration so that they can be used (and tested) independently of it.
+"""
+
+import copy
+import json
+import random
+import re
+from typing import Callable, List, Pattern, Set, Union
+
+from monitoring.monitorlib.fetch import RequestDescription, ResponseDescription
+
+TRUNCATED_BODY_SUFFIX = "...<truncated>"
+
+
+def parse_query_types(value: str) -> Set[str]:
+    """Parse a comma-separated list of query types (or * for all query types)."""
+    return set(qt.strip() for qt in value.split(",") if qt.strip())
+
+
+def parse_url_patterns(value: str) -> List[Pattern]:
+    """Parse a comma-separated list of regular expressions."""
+    return [re.compile(p.strip()) for p in value.split(",") if p.strip()]
+
+
+def parse_sample_rate(value: str) -> float:
+    """Parse the fraction of eligible interactions to log."""
+    rate = float(value)
+    if not 0 <= rate <= 1:
+        raise ValueError(f"Sample rate must be between 0 and 1; found {value}")
+    return rate
+
+
+def parse_max_body_bytes(value: str) -> int:
+    """Parse the maximum size of a logged body (0 for no limit)."""
+    max_bytes = int(value)
+    if max_bytes < 0:
+        raise ValueError(f"Maximum body size must not be negative; found {value}")
+    return max_bytes
+
+
+def parse_flag(value: str) -> bool:
+    return value.strip().lower() == "true"
+
+
+def should_sample(rate: float, rng: Callable[[], float] = random.random) -> bool:
+    """Determine whether an eligible interaction should be logged given the fraction of interactions to log."""
+    return rate >= 1 or rng() < rate
+
+
+def limit_body_size(
+    description: Union[RequestDescription, ResponseDescription], max_bytes: int
+) -> Union[RequestDescription, ResponseDescription]:
+    """Returns the description, or a copy of it with its body truncated if the body is larger than max_bytes.
+
+    The original description is never modified as it may still be in use by the code that performed the query.
+    """
+    if max_bytes <= 0:
+        return description
+    body = description.get("body", None)
+    if body is None and description.get("json", None) is not None:
+        body = json.dumps(description.json)
+    if body is None or len(body) <= max_bytes:
+        return description
+    truncated = copy.copy(description)
+    truncated.json = None
+    truncated.body = body[0:max_bytes] + TRUNCATED_BODY_SUFFIX
+    return truncated
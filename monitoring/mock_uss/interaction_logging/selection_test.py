@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, UTC
+
+import pytest
+from implicitdict import StringBasedDateTime
+
+from monitoring.mock_uss.interaction_logging import selection
+from monitoring.monitorlib.fetch import RequestDescription, ResponseDescription
+
+
+def test_parse_config():
+    assert selection.parse_query_types(" a, b ,,*") == {"a", "b", "*"}
+    patterns = selection.parse_url_patterns("/uss/v1/, ^https://dss")
+    assert [p.pattern for p in patterns] == ["/uss/v1/", "^https://dss"]
+    assert selection.parse_url_patterns("") == []
+    assert selection.parse_sample_rate("0.25") == 0.25
+    assert selection.parse_max_body_bytes("0") == 0
+    assert selection.parse_flag(" True ") is True
+    assert selection.parse_flag("false") is False
+    assert selection.parse_flag("yes") is False
+    for parse, value in (
+        (selection.parse_sample_rate, "1.5"),
+        (selection.parse_sample_rate, "-0.1"),
+        (selection.parse_sample_rate, "all"),
+        (selection.parse_max_body_bytes, "-1"),
+        (selection.parse_max_body_bytes, "1.5"),
+    ):
+        with pytest.raises(ValueError):
+            parse(value)
+
+
+def test_should_sample():
+    assert selection.should_sample(1, rng=lambda: 0.999)
+    assert not selection.should_sample(0, rng=lambda: 0)
+    assert selection.should_sample(0.5, rng=lambda: 0.49)
+    assert not selection.should_sample(0.5, rng=lambda: 0.5)
+
+
+def test_limit_body_size():
+    t = StringBasedDateTime(datetime(2024, 1, 1, tzinfo=UTC))
+    content = {"values": list(range(100))}
+    response = ResponseDescription(code=200, json=content, elapsed_s=0, reported=t)
+
+    assert selection.limit_body_size(response, 0) is response
+    assert selection.limit_body_size(response, 10000) is response
+
+    truncated = selection.limit_body_size(response, 20)
+    assert truncated.json is None
+    assert truncated.body == json.dumps(content)[0:20] + selection.TRUNCATED_BODY_SUFFIX
+    # The original description, which may still be in use, is unchanged
+    assert response.json == content
+    assert "body" not in response or response.body is None
+
+    request = RequestDescription(
+        method="PUT", url="https://uss", initiated_at=t, body="x" * 30
+    )
+    truncated = selection.limit_body_size(request, 10)
+    assert truncated.body == "x" * 10 + selection.TRUNCATED_BODY_SUFFIX
+    assert request.body == "x" * 30
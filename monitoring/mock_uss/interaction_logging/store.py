@@ -0,0 +1,383 @@
+"""Append-only segmented storage for logged interactions.
+
+Interactions are appended as JSON Lines to segment files named
+interactions_<first sequence number>.jsonl in the interactions log directory.
+Each line has the form {"sequence": <n>, "interaction": <Interaction>}.  A new
+segment is started once the current one reaches MAX_SEGMENT_SIZE_BYTES.
+
+An index of segments (sequence range, time range, and size of each) is kept in
+a SynchronizedValue shared by all mock_uss worker processes, so sequence numbers
+are assigned atomically across workers and readers only open the segments that
+may contain interactions in the requested time range.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from implicitdict import ImplicitDict, StringBasedDateTime
+from loguru import logger
+
+from monitoring.mock_uss.interaction_logging.database import (
+    Database,
+    SegmentInfo,
+    db,
+)
+from monitoring.monitorlib.clients.mock_uss.interactions import Interaction
+
+MAX_SEGMENT_SIZE_BYTES = 4_000_000
+"""A new segment is started when appending to the current segment would exceed this size."""
+
+MAX_WAIT_S = 30
+"""Maximum number of seconds a request may wait for matching interactions to be logged."""
+
+WAIT_POLL_INTERVAL_S = 0.1
+"""Number of seconds between checks for newly-logged interactions while waiting."""
+
+FLUSH_POLL_INTERVAL_S = 0.01
+"""Number of seconds between checks for completion while waiting for pending interactions to be written."""
+
+SEGMENT_PREFIX = "interactions_"
+SEGMENT_SUFFIX = ".jsonl"
+
+_LINE_PREFIX = b'{"sequence": '
+
+
+def _segment_filename(first_sequence: int) -> str:
+    return f"{SEGMENT_PREFIX}{first_sequence:09d}{SEGMENT_SUFFIX}"
+
+
+def _is_segment_filename(filename: str) -> bool:
+    return filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX)
+
+
+def _line_sequence(line: bytes) -> int:
+    # Lines are written by append_interaction, so the sequence number can be read without decoding the whole line
+    return int(line[len(_LINE_PREFIX) : line.index(b",", len(_LINE_PREFIX))])
+
+
+def _read_entries(
+    path: str, size_bytes: Optional[int] = None, after_sequence: Optional[int] = None
+) -> List[Tuple[int, dict]]:
+    """Read the (sequence number, interaction dict) entries of the segment at path.
+
+    Only the first size_bytes of the segment are read (when specified), and a
+    trailing line still being written (not yet terminated by a newline) is
+    ignored.  When after_sequence is specified, only entries with a greater
+    sequence number are decoded and returned.
+    """
+    with open(path, "rb") as f:
+        content = f.read() if size_bytes is None else f.read(size_bytes)
+    lines = content.split(b"\n")
+    entries = []
+    for line in lines[:-1]:
+        if not line:
+            continue
+        if after_sequence is not None and _line_sequence(line) <= after_sequence:
+            continue
+        entry = json.loads(line)
+        entries.append((entry["sequence"], entry["interaction"]))
+    return entries
+
+
+def _load_index(log_path: str, tx: Database) -> None:
+    """Rebuild the segment index from the segment files already present in log_path."""
+    segments = []
+    for filename in sorted(os.listdir(log_path)):
+        if not _is_segment_filename(filename):
+            continue
+        path = os.path.join(log_path, filename)
+        entries = _read_entries(path)
+        if not entries:
+            continue
+        times = [
+            ImplicitDict.parse(interaction, Interaction).interaction_time()
+            for _, interaction in entries
+        ]
+        segments.append(
+            SegmentInfo(
+                filename=filename,
+                first_sequence=entries[0][0],
+                last_sequence=entries[-1][0],
+                earliest_time=StringBasedDateTime(min(times)),
+                latest_time=StringBasedDateTime(max(times)),
+                size_bytes=os.path.getsize(path),
+            )
+        )
+    segments.sort(key=lambda s: s.first_sequence)
+    tx.segments = segments
+    tx.next_sequence = max([tx.next_sequence] + [s.last_sequence + 1 for s in segments])
+    tx.initialized = True
+    if segments:
+        logger.info(
+            f"Loaded interaction log index of {len(segments)} segments from {log_path}"
+        )
+
+
+def _database(log_path: str) -> Database:
+    value = db.value
+    if not value.initialized:
+        with db as tx:
+            if not tx.initialized:
+                _load_index(log_path, tx)
+            value = tx
+    return value
+
+
+def append_interaction(
+    log_path: str, interaction: Interaction, completes_pending_write: bool = False
+) -> int:
+    """Append the interaction to the log in log_path.
+
+    Args:
+        log_path: Interactions log directory.
+        interaction: Interaction to append.
+        completes_pending_write: True if this append completes a write counted in Database.pending_writes.
+
+    Returns:
+        Sequence number assigned to the interaction.
+    """
+    # Serialize before acquiring the lock so concurrent writers only contend for the append itself
+    content = json.dumps(interaction)
+    interaction_time = interaction.interaction_time()
+
+    with db as tx:
+        if not tx.initialized:
+            _load_index(log_path, tx)
+        sequence = tx.next_sequence
+        line = _LINE_PREFIX + f'{sequence}, "interaction": {content}}}\n'.encode(
+            "utf-8"
+        )
+
+        segment = tx.segments[-1] if tx.segments else None
+        if (
+            segment is None
+            or segment.size_bytes + len(line) > MAX_SEGMENT_SIZE_BYTES
+            or not os.path.exists(os.path.join(log_path, segment.filename))
+        ):
+            segment = SegmentInfo(
+                filename=_segment_filename(sequence),
+                first_sequence=sequence,
+                last_sequence=sequence,
+                earliest_time=StringBasedDateTime(interaction_time),
+                latest_time=StringBasedDateTime(interaction_time),
+                size_bytes=0,
+            )
+            tx.segments.append(segment)
+
+        with open(os.path.join(log_path, segment.filename), "ab") as f:
+            f.write(line)
+
+        segment.last_sequence = sequence
+        segment.size_bytes += len(line)
+        if interaction_time < segment.earliest_time.datetime:
+            segment.earliest_time = StringBasedDateTime(interaction_time)
+        if interaction_time > segment.latest_time.datetime:
+            segment.latest_time = StringBasedDateTime(interaction_time)
+        tx.next_sequence = sequence + 1
+        if completes_pending_write:
+            tx.pending_writes -= 1
+    return sequence
+
+
+def read_interactions(
+    log_path: str,
+    from_time: datetime,
+    after_sequence: Optional[int] = None,
+    query_types: Optional[List[str]] = None,
+    url_contains: Optional[str] = None,
+) -> Tuple[List[Interaction], Optional[int]]:
+    """Read logged interactions from the log in log_path.
+
+    Args:
+        log_path: Interactions log directory.
+        from_time: Only return interactions which occurred at or after this time.
+        after_sequence: If specified, only return interactions logged after the interaction with this sequence number.
+        query_types: If specified, only return interactions whose query has one of these query types.
+        url_contains: If specified, only return interactions whose request URL contains this string.
+
+    Returns:
+        * Matching interactions, sorted by interaction time.
+        * Sequence number of the most recent interaction in the log when it was read (None if no interactions have
+          been logged).  Passing this value as after_sequence on a later read will return only interactions logged
+          since this read.
+    """
+    value = _database(log_path)
+    last_sequence = value.next_sequence - 1 if value.next_sequence > 0 else None
+    interactions: List[Interaction] = []
+    for segment in value.segments:
+        if segment.latest_time.datetime < from_time:
+            continue
+        if after_sequence is not None and segment.last_sequence <= after_sequence:
+            continue
+        path = os.path.join(log_path, segment.filename)
+        try:
+            entries = _read_entries(path, segment.size_bytes, after_sequence)
+        except FileNotFoundError:
+            # Segment was deleted after we obtained the index
+            continue
+        for _, obj in entries:
+            query = obj.get("query", {})
+            if query_types is not None and query.get("query_type") not in query_types:
+                continue
+            if url_contains is not None and url_contains not in query.get(
+                "request", {}
+            ).get("url", ""):
+                continue
+            try:
+                interaction = ImplicitDict.parse(obj, Interaction)
+            except (KeyError, ValueError) as e:
+                msg = f"Error occurred in reading interaction from segment {segment.filename}: {e}"
+                raise type(e)(msg)
+            if interaction.interaction_time() >= from_time:
+                interactions.append(interaction)
+
+    interactions.sort(key=lambda i: i.interaction_time())
+    return interactions, last_sequence
+
+
+def wait_for_interactions(
+    log_path: str,
+    from_time: datetime,
+    timeout_s: float,
+    after_sequence: Optional[int] = None,
+    query_types: Optional[List[str]] = None,
+    url_contains: Optional[str] = None,
+) -> Tuple[List[Interaction], Optional[int]]:
+    """Like read_interactions, but when no interactions match, wait up to timeout_s for a matching interaction to be
+    logged (by any worker) before returning.
+    """
+    deadline = time.monotonic() + min(timeout_s, MAX_WAIT_S)
+    interactions, last_sequence = read_interactions(
+        log_path, from_time, after_sequence, query_types, url_contains
+    )
+    while not interactions and time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_INTERVAL_S)
+        newest_sequence = db.value.next_sequence - 1
+        if newest_sequence < 0 or (
+            last_sequence is not None and newest_sequence <= last_sequence
+        ):
+            continue
+        # Nothing up through last_sequence matched, so only newly-logged interactions need to be read
+        interactions, new_last_sequence = read_interactions(
+            log_path,
+            from_time,
+            last_sequence if last_sequence is not None else after_sequence,
+            query_types,
+            url_contains,
+        )
+        if new_last_sequence is not None:
+            last_sequence = new_last_sequence
+    return interactions, last_sequence
+
+
+class BackgroundWriter(object):
+    """Serializes and appends interactions to the log from a background worker so the submitting thread does not wait.
+
+    When the queue is full, submitting threads wait for space rather than
+    discarding interactions.  Submitted interactions are counted in
+    Database.pending_writes until they are appended, so any worker process can
+    wait for the log to include them (see wait_for_pending_writes).
+    """
+
+    def __init__(self, log_path: str, max_queue_size: int = 10000):
+        self._log_path = log_path
+        self._queue: queue.Queue[Interaction] = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        # The worker must be (re)started in each process, as threads do not survive a fork
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(
+                    target=self._process_queue,
+                    name="InteractionLogWriter",
+                    daemon=True,
+                )
+                self._worker.start()
+
+    def _process_queue(self) -> None:
+        while True:
+            interaction = self._queue.get()
+            try:
+                append_interaction(
+                    self._log_path, interaction, completes_pending_write=True
+                )
+            except Exception as e:
+                # The failed append did not complete the pending write
+                with db as tx:
+                    tx.pending_writes -= 1
+                logger.error(
+                    f"Failed to log interaction with {interaction.query.request.url}: {type(e).__name__}: {e}"
+                )
+            finally:
+                self._queue.task_done()
+
+    def submit(self, interaction: Interaction) -> None:
+        """Queue the interaction to be appended to the log."""
+        self._ensure_worker()
+        with db as tx:
+            tx.pending_writes += 1
+        self._queue.put(interaction)
+
+    @property
+    def pending(self) -> int:
+        """Number of interactions waiting to be appended to the log."""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout_s: Optional[float] = None) -> bool:
+        """Wait until all submitted interactions have been appended to the log.
+
+        Returns:
+            True if all interactions were appended, False if timeout_s elapsed first.
+        """
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(FLUSH_POLL_INTERVAL_S)
+        return True
+
+
+def wait_for_pending_writes(timeout_s: Optional[float] = None) -> bool:
+    """Wait until all interactions submitted to a BackgroundWriter by any worker process have been appended to the log.
+
+    Returns:
+        True if all pending interactions were appended, False if timeout_s elapsed first.
+    """
+    deadline = None if timeout_s is None else time.monotonic() + timeout_s
+    while db.value.pending_writes > 0:
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(FLUSH_POLL_INTERVAL_S)
+    return True
+
+
+def clear(log_path: str) -> int:
+    """Delete all logged interactions (and any other files) in log_path.
+
+    Sequence numbers continue from where they left off so they are never reused.
+
+    Returns:
+        Number of files removed.
+    """
+    num_removed = 0
+    with db as tx:
+        if not tx.initialized:
+            _load_index(log_path, tx)
+        for filename in os.listdir(log_path):
+            file_path = os.path.join(log_path, filename)
+            os.remove(file_path)
+            logger.debug(f"Removed log file - {file_path}")
+            num_removed += 1
+        tx.segments = []
+    return num_removed
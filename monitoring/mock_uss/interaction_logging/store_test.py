@@ -0,0 +1,204 @@
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+
+from implicitdict import StringBasedDateTime
+
+from monitoring.mock_uss.interaction_logging import store
+from monitoring.mock_uss.interaction_logging.database import Database, db
+from monitoring.monitorlib.clients.mock_uss.interactions import (
+    Interaction,
+    QueryDirection,
+)
+from monitoring.monitorlib.fetch import Query, RequestDescription, ResponseDescription
+
+T0 = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _reset_index():
+    with db as tx:
+        tx.clear()
+        tx.update(Database(segments=[]))
+
+
+def _interaction(i: int) -> Interaction:
+    t = T0 + timedelta(seconds=i)
+    return Interaction(
+        query=Query(
+            request=RequestDescription(
+                method="GET",
+                url=f"https://uss.example.com/{i}",
+                initiated_at=StringBasedDateTime(t),
+            ),
+            response=ResponseDescription(
+                code=200, elapsed_s=0, reported=StringBasedDateTime(t)
+            ),
+        ),
+        direction=QueryDirection.Outgoing,
+    )
+
+
+def test_append_and_read(tmp_path, monkeypatch):
+    _reset_index()
+    monkeypatch.setattr(store, "MAX_SEGMENT_SIZE_BYTES", 2000)
+    log_path = str(tmp_path)
+
+    sequences = [store.append_interaction(log_path, _interaction(i)) for i in range(20)]
+    assert sequences == list(range(20))
+    assert len(os.listdir(log_path)) > 1
+
+    interactions, last_sequence = store.read_interactions(
+        log_path, T0 + timedelta(seconds=15)
+    )
+    assert [i.query.request.url for i in interactions] == [
+        f"https://uss.example.com/{i}" for i in range(15, 20)
+    ]
+    assert last_sequence == 19
+
+    # Index is rebuilt from the segment files (e.g., after a restart)
+    _reset_index()
+    assert len(store.read_interactions(log_path, T0)[0]) == 20
+    assert store.append_interaction(log_path, _interaction(20)) == 20
+
+    # A partially-written trailing line is ignored
+    last_segment = sorted(os.listdir(log_path))[-1]
+    with open(os.path.join(log_path, last_segment), "a") as f:
+        f.write('{"sequence": 21, "interac')
+    _reset_index()
+    assert len(store.read_interactions(log_path, T0)[0]) == 21
+
+
+def test_clear_keeps_sequence(tmp_path):
+    _reset_index()
+    log_path = str(tmp_path)
+
+    for i in range(3):
+        store.append_interaction(log_path, _interaction(i))
+    assert store.clear(log_path) == 1
+    assert os.listdir(log_path) == []
+    assert store.read_interactions(log_path, T0) == ([], 2)
+    assert store.append_interaction(log_path, _interaction(3)) == 3
+
+
+def test_cursor_and_filters(tmp_path):
+    _reset_index()
+    log_path = str(tmp_path)
+
+    for i in range(5):
+        store.append_interaction(log_path, _interaction(i))
+    interactions, cursor = store.read_interactions(log_path, T0)
+    assert len(interactions) == 5
+
+    for i in range(5, 15):
+        store.append_interaction(log_path, _interaction(i))
+    interactions, cursor = store.read_interactions(
+        log_path, T0, after_sequence=cursor, url_contains="example.com/1"
+    )
+    assert [i.query.request.url for i in interactions] == [
+        f"https://uss.example.com/{i}" for i in range(10, 15)
+    ]
+    assert cursor == 14
+
+    assert store.read_interactions(log_path, T0, after_sequence=cursor) == ([], 14)
+    assert store.read_interactions(log_path, T0, query_types=["Other"]) == ([], 14)
+
+
+def test_wait_for_interactions(tmp_path):
+    _reset_index()
+    log_path = str(tmp_path)
+    store.append_interaction(log_path, _interaction(0))
+
+    def log_later():
+        time.sleep(0.2)
+        store.append_interaction(log_path, _interaction(1))
+        time.sleep(0.2)
+        store.append_interaction(log_path, _interaction(12))
+
+    threading.Thread(target=log_later).start()
+    t0 = time.monotonic()
+    interactions, cursor = store.wait_for_interactions(
+        log_path, T0, timeout_s=5, url_contains="example.com/12"
+    )
+    assert 0.3 < time.monotonic() - t0 < 5
+    assert [i.query.request.url for i in interactions] == ["https://uss.example.com/12"]
+    assert cursor == 2
+
+    t0 = time.monotonic()
+    assert store.wait_for_interactions(
+        log_path, T0, timeout_s=0.3, after_sequence=cursor
+    ) == ([], 2)
+    assert time.monotonic() - t0 >= 0.3
+
+
+def test_background_writer(tmp_path, monkeypatch):
+    _reset_index()
+    log_path = str(tmp_path)
+    writer = store.BackgroundWriter(log_path)
+
+    release = threading.Event()
+    append_interaction = store.append_interaction
+
+    def append_when_released(*args, **kwargs):
+        release.wait(timeout=5)
+        if kwargs.get("completes_pending_write") and args[1].query.request.url.endswith(
+            "/fail"
+        ):
+            raise OSError("disk full")
+        return append_interaction(*args, **kwargs)
+
+    monkeypatch.setattr(store, "append_interaction", append_when_released)
+
+    t0 = time.monotonic()
+    for i in range(3):
+        writer.submit(_interaction(i))
+    failing = _interaction(3)
+    failing.query.request.url = "https://uss.example.com/fail"
+    writer.submit(failing)
+    assert time.monotonic() - t0 < 1
+
+    # Pending writes are visible through the shared database until they are appended
+    assert db.value.pending_writes == 4
+    assert not store.wait_for_pending_writes(timeout_s=0.1)
+    assert store.read_interactions(log_path, T0) == ([], None)
+
+    release.set()
+    assert store.wait_for_pending_writes(timeout_s=5)
+    assert writer.flush(timeout_s=5)
+    assert writer.pending == 0
+    assert db.value.pending_writes == 0
+    interactions, last_sequence = store.read_interactions(log_path, T0)
+    assert [i.query.request.url for i in interactions] == [
+        f"https://uss.example.com/{i}" for i in range(3)
+    ]
+    assert last_sequence == 2
+
+
+def test_pending_writes_of_other_processes(tmp_path, monkeypatch):
+    _reset_index()
+    log_path = str(tmp_path)
+    append_interaction = store.append_interaction
+
+    def slow_append(*args, **kwargs):
+        time.sleep(0.3)
+        return append_interaction(*args, **kwargs)
+
+    # The forked process inherits the slow append
+    monkeypatch.setattr(store, "append_interaction", slow_append)
+    submitted = multiprocessing.get_context("fork").Event()
+
+    def log_from_other_process():
+        writer = store.BackgroundWriter(log_path)
+        writer.submit(_interaction(0))
+        submitted.set()
+        writer.flush(timeout_s=5)
+
+    process = multiprocessing.get_context("fork").Process(target=log_from_other_process)
+    process.start()
+    try:
+        assert submitted.wait(timeout=5)
+        assert store.wait_for_pending_writes(timeout_s=5)
+        assert len(store.read_interactions(log_path, T0)[0]) == 1
+    finally:
+        process.join(timeout=5)
@@ -49,6 +49,7 @@ for log_folder in "${log_folders[@]}"; do
       # Prevent logs from building up too much by default
       find "$log_folder" -name "*.yaml" -exec rm {} \;
       find "$log_folder" -name "*.json" -exec rm {} \;
+      find "$log_folder" -name "*.jsonl" -exec rm {} \;
     fi
   fi
 done
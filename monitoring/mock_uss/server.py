@@ -1,11 +1,13 @@
 from enum import Enum
 from dataclasses import dataclass
 from datetime import datetime, timedelta, UTC
+import heapq
 from multiprocessing import Process
 import os
+import select
 import signal
-import time
-from typing import Callable, Dict, Optional, Tuple
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
 import arrow
 import flask
@@ -33,6 +35,9 @@ class OneTimeServerTask(object):
 @dataclass
 class PeriodicServerTask(object):
     run: Callable[[], None]
+    concurrent: bool = False
+    """If true, this task is independent of other tasks and is run in its own thread so that other tasks may run while
+    it is executing."""
 
 
 class MockUSS(flask.Flask):
@@ -52,6 +57,10 @@ class MockUSS(flask.Flask):
         logger.info(f"Initializing MockUSS from process {self._pid}")
         self._one_time_tasks = {}
         self._periodic_tasks = {}
+        # Pipe used to wake the periodic task daemon (in its own process) when the task schedule changes
+        self._schedule_changed_r, self._schedule_changed_w = os.pipe()
+        os.set_blocking(self._schedule_changed_r, False)
+        os.set_blocking(self._schedule_changed_w, False)
         super(MockUSS, self).__init__(*args, **kwargs)
 
     def add_one_time_task(
@@ -127,18 +136,22 @@ class MockUSS(flask.Flask):
     def setup(self):
         self._run_one_time_tasks(TaskTrigger.Setup)
 
-    def declare_periodic_task(self, task: Callable[[], None], name: str):
-        self._periodic_tasks[name] = PeriodicServerTask(run=task)
+    def declare_periodic_task(
+        self, task: Callable[[], None], name: str, concurrent: bool = False
+    ):
+        self._periodic_tasks[name] = PeriodicServerTask(run=task, concurrent=concurrent)
 
-    def periodic_task(self, task_name: str):
+    def periodic_task(self, task_name: str, concurrent: bool = False):
         """Decorator that causes the decorated function to be executed repeatedly in the background.
 
         Args:
             task_name: Unique name of this periodic task (for logs, etc)
+            concurrent: If true, this task does not depend on other periodic tasks and may be executed concurrently
+                with them.
         """
 
         def periodic_task_decorator(func):
-            self.declare_periodic_task(func, task_name)
+            self.declare_periodic_task(func, task_name, concurrent)
             return func
 
         return periodic_task_decorator
@@ -155,6 +168,26 @@ class MockUSS(flask.Flask):
             tx.periodic_tasks[task_name].period = (
                 StringBasedTimeDelta(period) if period is not None else None
             )
+        self._notify_schedule_changed()
+
+    def _notify_schedule_changed(self):
+        try:
+            os.write(self._schedule_changed_w, b"\0")
+        except BlockingIOError:
+            # The pipe is full, so the daemon already has pending notifications
+            pass
+
+    def _wait_for_schedule_change(self, timeout: timedelta):
+        """Wait until the task schedule changes or timeout elapses, whichever is first."""
+        # Note that select is cooperative when gevent has patched the select module (as in mock_uss)
+        select.select(
+            [self._schedule_changed_r], [], [], max(0.0, timeout.total_seconds())
+        )
+        try:
+            while os.read(self._schedule_changed_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
 
     def start_periodic_tasks_daemon(self):
         if not self._periodic_tasks:
@@ -167,25 +200,22 @@ class MockUSS(flask.Flask):
             p.start()
 
     def _periodic_tasks_daemon_loop(self):
+        task_to_execute = None
+        concurrent_tasks: List[threading.Thread] = []
         try:
             while True:
-                # Determine what to do on this loop (execute task or wait)
-                task_to_execute = None
-                next_check = None
+                # Determine which tasks are due, and when the next one will be due
+                now = arrow.utcnow().datetime
+                due_tasks: List[Tuple[str, datetime]] = []
+                schedule: List[Tuple[datetime, str]] = []
                 with db as tx:
                     assert isinstance(tx, Database)
-                    tx.most_recent_periodic_check = StringBasedDateTime(
-                        datetime.now(UTC)
-                    )
+                    tx.most_recent_periodic_check = StringBasedDateTime(now)
 
                     # Cancel the loop if we're stopping
                     if tx.stopping:
                         break
 
-                    # Find the earliest scheduled task
-                    earliest_task: Optional[
-                        Tuple[str, datetime, PeriodicTaskStatus]
-                    ] = None
                     for task_name, task in tx.periodic_tasks.items():
                         if task.executing:
                             # Don't consider executing tasks that are already executing
@@ -195,67 +225,49 @@ class MockUSS(flask.Flask):
                                 "Periodic task '{}' was not defined at application start and therefore cannot be run periodically",
                                 task_name,
                             )
-                            task.last_execution_time = StringBasedDateTime(
-                                arrow.utcnow()
-                            )
+                            task.last_execution_time = StringBasedDateTime(now)
                             continue
                         if task.period is None:
                             # Skip periodic tasks without periods
                             continue
                         if task.last_execution_time is None:
-                            # This is the first time this task has been run; pick it immediately
-                            earliest_task = (task_name, arrow.utcnow().datetime, task)
-                            break
-                        t_next = (
-                            task.last_execution_time.datetime + task.period.timedelta
-                        )
-                        if not earliest_task or t_next < earliest_task[1]:
-                            # This task is more urgent than the one we were looking at before
-                            earliest_task = (task_name, t_next, task)
-                    if earliest_task:
-                        task_name, t_execute, task = earliest_task
-                        if t_execute <= arrow.utcnow().datetime:
-                            # We should execute this task immediately
-                            tx.periodic_tasks[task_name] = PeriodicTaskStatus(
-                                last_execution_time=StringBasedDateTime(
-                                    arrow.utcnow().datetime
-                                ),
-                                period=task.period,
-                                executing=True,
-                            )
-                            task_to_execute = task_name
+                            # This is the first time this task has been run; schedule it immediately
+                            t_next = now
                         else:
-                            # We need to wait some time before executing this task
-                            next_check = t_execute
+                            t_next = (
+                                task.last_execution_time.datetime
+                                + task.period.timedelta
+                            )
+                        heapq.heappush(schedule, (t_next, task_name))
+
+                    while schedule and schedule[0][0] <= now:
+                        t_scheduled, task_name = heapq.heappop(schedule)
+                        task = tx.periodic_tasks[task_name]
+                        task.last_execution_time = StringBasedDateTime(now)
+                        task.executing = True
+                        due_tasks.append((task_name, t_scheduled))
                 # </with db as tx>
 
-                if task_to_execute:
-                    # Execute the selected task right now
-                    logger.debug(
-                        f"Executing '{task_to_execute}' periodic task from process {os.getpid()}"
-                    )
-                    self._periodic_tasks[task_to_execute].run()
-                    with db as tx:
-                        periodic_task = tx.periodic_tasks[task_to_execute]
-                        periodic_task.executing = False
-                        if (
-                            "period" in periodic_task
-                            and periodic_task.period
-                            and periodic_task.period.timedelta.total_seconds() == 0
-                        ):
-                            periodic_task.last_execution_time = StringBasedDateTime(
-                                arrow.utcnow().datetime
-                            )
-                else:
-                    # Wait until another task may be ready to execute
-                    if next_check:
-                        dt = min(
-                            MAX_PERIODIC_LATENCY, next_check - arrow.utcnow().datetime
+                concurrent_tasks = [t for t in concurrent_tasks if t.is_alive()]
+                for task_to_execute, t_scheduled in due_tasks:
+                    if self._periodic_tasks[task_to_execute].concurrent:
+                        thread = threading.Thread(
+                            target=self._run_concurrent_periodic_task,
+                            args=(task_to_execute, t_scheduled),
+                            daemon=True,
                         )
+                        thread.start()
+                        concurrent_tasks.append(thread)
                     else:
-                        dt = MAX_PERIODIC_LATENCY
-                    if dt.total_seconds() > 0:
-                        time.sleep(dt.total_seconds())
+                        self._run_periodic_task(task_to_execute, t_scheduled)
+                task_to_execute = None
+
+                if not due_tasks:
+                    # Wait until the next task is scheduled to execute or the schedule changes
+                    dt = MAX_PERIODIC_LATENCY
+                    if schedule:
+                        dt = min(dt, schedule[0][0] - arrow.utcnow().datetime)
+                    self._wait_for_schedule_change(dt)
         except Exception as e:
             logger.error(
                 f"Shutting down mock_uss due to {type(e).__name__} error while executing '{task_to_execute}' periodic task: {str(e)}\n{stacktrace_string(e)}"
@@ -264,8 +276,50 @@ class MockUSS(flask.Flask):
                 tx.task_errors.append(TaskError.from_exception(TaskTrigger.Setup, e))
             self.stop()
         finally:
+            # Concurrent tasks update their status upon completion, so they must not outlive the daemon
+            for thread in concurrent_tasks:
+                thread.join()
             logger.info(f"Periodic task daemon for process {os.getpid()} exited")
 
+    def _run_periodic_task(self, task_name: str, t_scheduled: datetime):
+        t_start = arrow.utcnow().datetime
+        logger.debug(
+            f"Executing '{task_name}' periodic task from process {os.getpid()}"
+        )
+        try:
+            self._periodic_tasks[task_name].run()
+        finally:
+            t_end = arrow.utcnow().datetime
+            with db as tx:
+                periodic_task = tx.periodic_tasks[task_name]
+                periodic_task.executing = False
+                periodic_task.executions += 1
+                periodic_task.last_duration_s = (t_end - t_start).total_seconds()
+                periodic_task.last_lag_s = max(
+                    0.0, (t_start - t_scheduled).total_seconds()
+                )
+                periodic_task.max_lag_s = max(
+                    periodic_task.max_lag_s, periodic_task.last_lag_s
+                )
+                if (
+                    "period" in periodic_task
+                    and periodic_task.period
+                    and periodic_task.period.timedelta.total_seconds() == 0
+                ):
+                    periodic_task.last_execution_time = StringBasedDateTime(t_end)
+            self._notify_schedule_changed()
+
+    def _run_concurrent_periodic_task(self, task_name: str, t_scheduled: datetime):
+        try:
+            self._run_periodic_task(task_name, t_scheduled)
+        except Exception as e:
+            logger.error(
+                f"Shutting down mock_uss due to {type(e).__name__} error while executing '{task_name}' periodic task: {str(e)}\n{stacktrace_string(e)}"
+            )
+            with db as tx:
+                tx.task_errors.append(TaskError.from_exception(TaskTrigger.Setup, e))
+            self.stop()
+
     def is_stopping(self) -> bool:
         return db.value.stopping
 
@@ -276,6 +330,7 @@ class MockUSS(flask.Flask):
                 send_signal = True
                 tx.stopping = True
         if send_signal:
+            self._notify_schedule_changed()
             logger.info(
                 f"Initiating shutdown of MockUSS process {self._pid} from process {os.getpid()}"
             )
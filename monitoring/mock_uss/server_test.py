@@ -0,0 +1,61 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+from implicitdict import ImplicitDict
+
+from monitoring.mock_uss import server
+from monitoring.mock_uss.database import Database
+from monitoring.mock_uss.server import MockUSS
+from monitoring.monitorlib.multiprocessing import SynchronizedValue
+
+
+def test_periodic_tasks_run_on_schedule(monkeypatch):
+    db = SynchronizedValue(
+        Database(one_time_tasks=[], task_errors=[], periodic_tasks={}),
+        capacity_bytes=100e3,
+        decoder=lambda b: ImplicitDict.parse(json.loads(b.decode("utf-8")), Database),
+    )
+    monkeypatch.setattr(server, "db", db)
+
+    app = MockUSS(__name__)
+    runs = {"slow": 0, "fast": 0}
+    slow_task_finished = threading.Event()
+
+    @app.periodic_task("slow", concurrent=True)
+    def slow_task():
+        runs["slow"] += 1
+        time.sleep(0.5)
+        slow_task_finished.set()
+
+    @app.periodic_task("fast")
+    def fast_task():
+        runs["fast"] += 1
+
+    daemon = threading.Thread(target=app._periodic_tasks_daemon_loop)
+    daemon.start()
+    try:
+        # Setting a period wakes the daemon rather than waiting for its next check
+        t0 = time.monotonic()
+        app.set_task_period("slow", timedelta(seconds=0.1))
+        app.set_task_period("fast", timedelta(seconds=0.05))
+        time.sleep(0.4)
+        assert runs["slow"] == 1
+        assert runs["fast"] >= 4
+        assert time.monotonic() - t0 < 1
+
+        status = db.value.periodic_tasks["fast"]
+        assert status.executions >= 3
+        assert status.last_duration_s is not None
+        assert status.max_lag_s < 0.25
+
+        assert slow_task_finished.wait(timeout=5)
+    finally:
+        with db as tx:
+            tx.stopping = True
+        app._notify_schedule_changed()
+        daemon.join(timeout=5)
+    assert not daemon.is_alive()
+    assert not db.value.task_errors
+    assert db.value.periodic_tasks["slow"].executions >= 1
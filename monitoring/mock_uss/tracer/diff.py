@@ -1,39 +1,49 @@
 from typing import Optional
 
+from implicitdict import ImplicitDict
+
 from monitoring.monitorlib.fetch import rid, scd, summarize
 from monitoring.monitorlib import formatting
 
 
-def isa_diff_text(a: Optional[rid.FetchedISAs], b: Optional[rid.FetchedISAs]) -> str:
-    """Create text to display to a real-time user describing a change in ISAs."""
-    a_summary = summarize.isas(a) if a else {}
-    a_summary = summarize.limit_long_arrays(a_summary, 6)
-    b_summary = summarize.isas(b) if b else {}
-    b_summary = summarize.limit_long_arrays(b_summary, 6)
-    if b is not None and b.success and a is not None and not a.success:
-        a_summary = {}
-    if a is not None and a.success and b is not None and not b.success:
-        a_summary = {}
-    values, changes, _ = formatting.dict_changes(a_summary, b_summary)
-    return "\n".join(formatting.diff_lines(values, changes))
+class PollSummary(ImplicitDict):
+    """Minimal representation of a poll result needed to detect and describe changes in later poll results."""
+
+    digest: str
+    """Content digest of the poll result."""
+
+    success: bool
+    """True if the poll was successful."""
+
+    summary: dict
+    """Summary of the poll result, with long arrays limited, as displayed to a real-time user."""
 
 
-def entity_diff_text(
-    a: Optional[scd.FetchedEntities], b: Optional[scd.FetchedEntities]
-) -> str:
-    """Create text to display to a real-time user describing a change in Entities."""
-    entity_type = (
-        b.dss_query.entity_type if b else (a.dss_query.entity_type if a else None)
+def summarize_isas(fetched: rid.FetchedISAs) -> PollSummary:
+    return PollSummary(
+        digest=fetched.content_digest,
+        success=fetched.success,
+        summary=summarize.limit_long_arrays(summarize.isas(fetched), 6),
     )
+
+
+def summarize_entities(fetched: scd.FetchedEntities) -> PollSummary:
+    entity_type = fetched.dss_query.entity_type
     if entity_type and "_" in entity_type:
         entity_type = entity_type[0 : entity_type.index("_")]
-    a_summary = summarize.entities(a, entity_type) if a else {}
-    a_summary = summarize.limit_long_arrays(a_summary, 6)
-    b_summary = summarize.entities(b, entity_type) if b else {}
-    b_summary = summarize.limit_long_arrays(b_summary, 6)
-    if b is not None and b.success and a is not None and not a.success:
-        a_summary = {}
-    if a is not None and a.success and b is not None and not b.success:
+    return PollSummary(
+        digest=fetched.content_digest,
+        success=fetched.success,
+        summary=summarize.limit_long_arrays(
+            summarize.entities(fetched, entity_type), 6
+        ),
+    )
+
+
+def summary_diff_text(a: Optional[PollSummary], b: PollSummary) -> str:
+    """Create text to display to a real-time user describing a change between summarized poll results."""
+    a_summary = a.summary if a else {}
+    if a is not None and a.success != b.success:
         a_summary = {}
-    values, changes, _ = formatting.dict_changes(a_summary, b_summary)
+    values, changes, _ = formatting.dict_changes(a_summary, b.summary)
     return "\n".join(formatting.diff_lines(values, changes))
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, UTC
-import glob
+import json
 import os
-import re
+import threading
 from enum import Enum
-from typing import Protocol, Dict, Type, List, Optional
+from typing import Protocol, Dict, Type, List, Optional, Set, Tuple
 
 from loguru import logger
 from lxml import etree
@@ -20,6 +20,7 @@ from monitoring.mock_uss.tracer.log_types import (
     OperationalIntentNotification,
     PollOperationalIntents,
 )
+from monitoring.mock_uss.tracer.tracerlog import LOG_ENTRY_FILENAME_REGEX, is_log_file
 from monitoring.monitorlib.geotemporal import Volume4DCollection, Volume4D
 from monitoring.monitorlib.infrastructure import get_token_claims
 from monitoring.monitorlib.kml.f3548v21 import f3548v21_styles
@@ -309,29 +310,89 @@ def _get_style(type: VolumeType, state: str, future: bool) -> str:
         raise NotImplementedError()
 
 
+@dataclass
+class HistoricalKMLState(object):
+    """Materialized state of historical KML rendering for a tracer log folder."""
+
+    processed_log_files: Set[str] = field(default_factory=set)
+    """Names of the log files already incorporated into volume_collections."""
+
+    max_log_index: int = 0
+    """Highest index of the log entries incorporated into volume_collections."""
+
+    volume_collections: List[HistoricalVolumesCollection] = field(default_factory=list)
+    """Historical volume collections rendered from all processed_log_files."""
+
+    rendered: Optional[str] = None
+    """Historical KML rendered from volume_collections, or None if it has not yet been rendered."""
+
+
+_historical_kml_states: Dict[str, HistoricalKMLState] = {}
+"""Historical KML rendering state (in this process) for each log folder."""
+
+_historical_kml_lock = threading.Lock()
+
+
 def render_historical_kml(log_folder: str) -> str:
-    logger.debug("Rendering historical KML...")
+    """Render KML of historical volumes described by the log entries in log_folder.
+
+    Only log entries added since the previous call for the same log folder are processed; if nothing new has been
+    logged, the previously-rendered KML is returned.
+    """
+    log_folder = os.path.abspath(log_folder)
+    with _historical_kml_lock:
+        log_files = {f for f in os.listdir(log_folder) if is_log_file(f)}
+        state = _historical_kml_states.get(log_folder, None)
+        if state is None or not state.processed_log_files <= log_files:
+            # Nothing has been rendered yet or the logs have been cleared, so start from scratch
+            state = HistoricalKMLState()
+            _historical_kml_states[log_folder] = state
+        log_entries = _load_log_entries(
+            log_folder, sorted(log_files - state.processed_log_files), state
+        )
+        if log_entries and log_entries[0][0] < state.max_log_index:
+            # A log entry was completed after entries with higher indices were processed.  Historical volume
+            # collections depend on the collections from earlier log entries, so replay all log entries in index order.
+            state = HistoricalKMLState()
+            _historical_kml_states[log_folder] = state
+            log_entries = _load_log_entries(log_folder, sorted(log_files), state)
+        if _update_historical_kml_state(log_entries, state) or state.rendered is None:
+            state.rendered = _render_historical_volume_collections(
+                state.volume_collections
+            )
+        return state.rendered
+
+
+def _load_log_entries(
+    log_folder: str, log_files: List[str], state: HistoricalKMLState
+) -> List[Tuple[int, TracerLogEntry]]:
+    """Load the log entries that can be rendered from the specified log files (not yet processed) in index order.
+
+    Log files are identified by name rather than by position relative to the most recent processed log file since
+    concurrent writers may complete log files out of index order.  Log files are marked as processed in state, except
+    for log files that cannot be parsed (e.g., because they are still being written) so that they are retried later.
+
+    Returns: Index and content of each log entry loaded.
+    """
+    logger.debug("Loading new log entries...")
 
     # Performance metrics
     loading_time = Stopwatch()
     parsing_time = Stopwatch()
-    processing_time = Stopwatch()
-    generation_time = Stopwatch()
-    rendering_time = Stopwatch()
 
-    historical_volume_collections: List[HistoricalVolumesCollection] = []
-    log_files = glob.glob(os.path.join(log_folder, "*.yaml"))
-    log_files.sort()
-    for log_file in log_files:
-        if "nochange_queries" in log_file:
+    log_entries: List[Tuple[int, TracerLogEntry]] = []
+    for filename in sorted(log_files):
+        if "nochange_queries" in filename:
+            state.processed_log_files.add(filename)
             continue  # This is a known case where we don't want to print a warning
 
         # See if this is actually a log entry
-        filename = os.path.split(log_file)[-1]
-        m = re.match(r"^(\d{6})_(\d\d)(\d\d)(\d\d)_(\d{6})_([^.]+)\.yaml$", filename)
+        log_file = os.path.join(log_folder, filename)
+        m = LOG_ENTRY_FILENAME_REGEX.match(filename)
         if not m:
             # File name does not match log entry format
             logger.warning(f"File name {filename} does not match log entry format")
+            state.processed_log_files.add(filename)
             continue
 
         # Determine type of log entry
@@ -342,6 +403,7 @@ def render_historical_kml(log_folder: str) -> str:
             logger.warning(
                 f"Cannot determine log entry type from prefix_code `{prefix_code}`"
             )
+            state.processed_log_files.add(filename)
             continue
 
         # See if we can render volumes of log entry
@@ -350,26 +412,69 @@ def render_historical_kml(log_folder: str) -> str:
             logger.warning(
                 f"No historical volume renderer for {log_entry_type.__name__} in {log_file}"
             )
+            state.processed_log_files.add(filename)
             continue
 
-        # Render log entry into historical volume collections
+        # Load log entry
         with open(log_file, "r") as f:
             try:
                 with loading_time:
-                    content = yaml.load(f, Loader=yaml.CLoader)
+                    if m.group(7) == "json":
+                        content = json.load(f)
+                    else:
+                        content = yaml.load(f, Loader=yaml.CLoader)
                 with parsing_time:
                     log_entry = ImplicitDict.parse(content, log_entry_type)
             except ValueError as e:
-                logger.warning(f"Skipping {filename} because of parse error: {str(e)}")
+                logger.warning(
+                    f"Deferring {filename} because of parse error (it may not be completely written yet): {str(e)}"
+                )
                 continue
+        state.processed_log_files.add(filename)
+        log_entries.append((int(m.group(1)), log_entry))
+
+    logger.debug(
+        f"Completed loading {len(log_entries)} log entries from {len(log_files)} new log files with {loading_time.elapsed_time.total_seconds():.2f}s load, {parsing_time.elapsed_time.total_seconds():.2f}s parse"
+    )
+    return log_entries
+
+
+def _update_historical_kml_state(
+    log_entries: List[Tuple[int, TracerLogEntry]], state: HistoricalKMLState
+) -> bool:
+    """Add historical volume collections from the specified log entries (in index order) to state.
+
+    Returns: True if any new historical volume collections were added.
+    """
+    # Performance metrics
+    processing_time = Stopwatch()
+
+    n_collections = len(state.volume_collections)
+    for index, log_entry in log_entries:
         with processing_time:
-            historical_volume_collections.extend(
-                _historical_volumes_renderers[log_entry_type].renderer(
-                    log_entry, historical_volume_collections
+            state.volume_collections.extend(
+                _historical_volumes_renderers[type(log_entry)].renderer(
+                    log_entry, state.volume_collections
                 )
             )
+        state.max_log_index = max(state.max_log_index, index)
+
+    logger.debug(
+        f"Completed historical KML state update from {len(log_entries)} new log entries with {processing_time.elapsed_time.total_seconds():.2f}s process"
+    )
+    return len(state.volume_collections) > n_collections
+
 
-    historical_volume_collections.sort(key=lambda hv: hv.active_at)
+def _render_historical_volume_collections(
+    volume_collections: List[HistoricalVolumesCollection],
+) -> str:
+    # Performance metrics
+    generation_time = Stopwatch()
+    rendering_time = Stopwatch()
+
+    historical_volume_collections = sorted(
+        volume_collections, key=lambda hv: hv.active_at
+    )
 
     # Render historical volume collections into a folder structure
     with generation_time:
@@ -408,6 +513,8 @@ def render_historical_kml(log_folder: str) -> str:
             version_folder.children.append(future_folder)
 
             for i, v in enumerate(hvc.volumes):
+                # Volumes are adjusted below, so copy them to leave the historical volume collections unchanged
+                v = Volume4D(v)
                 if v.time_end.datetime <= hvc.active_at:
                     # This volume ended before the collection was declared, so it never actually existed
                     continue
@@ -436,6 +543,6 @@ def render_historical_kml(log_folder: str) -> str:
         )
 
     logger.debug(
-        f"Completed render_historical_kml with {loading_time.elapsed_time.total_seconds():.2f}s load, {parsing_time.elapsed_time.total_seconds():.2f}s parse, {processing_time.elapsed_time.total_seconds():.2f}s process, {generation_time.elapsed_time.total_seconds():.2f}s generate, {rendering_time.elapsed_time.total_seconds():.2f}s render"
+        f"Completed historical KML rendering with {generation_time.elapsed_time.total_seconds():.2f}s generate, {rendering_time.elapsed_time.total_seconds():.2f}s render"
     )
     return result
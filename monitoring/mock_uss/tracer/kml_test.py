@@ -0,0 +1,167 @@
+import os
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+
+from implicitdict import StringBasedDateTime
+
+from monitoring.mock_uss.tracer import kml
+from monitoring.mock_uss.tracer.log_types import PollOperationalIntents
+from monitoring.mock_uss.tracer.tracerlog import Logger
+from monitoring.monitorlib.fetch import Query, RequestDescription, ResponseDescription
+from monitoring.monitorlib.fetch.scd import (
+    FetchedEntities,
+    FetchedEntity,
+    FetchedEntityReferences,
+)
+
+T0 = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _query(json: dict) -> Query:
+    t = StringBasedDateTime(T0)
+    return Query(
+        request=RequestDescription(method="GET", url="https://uss", initiated_at=t),
+        response=ResponseDescription(code=200, json=json, elapsed_s=0, reported=t),
+    )
+
+
+def _time(t: datetime) -> dict:
+    return {"value": StringBasedDateTime(t), "format": "RFC3339"}
+
+
+def _poll(version: Optional[int], recorded_at: datetime) -> PollOperationalIntents:
+    """Poll finding version `version` of operational intent op1, or no operational intents if version is None."""
+    altitude = {"reference": "W84", "units": "M"}
+    volume = {
+        "volume": {
+            "outline_polygon": {
+                "vertices": [
+                    {"lat": 0, "lng": 0},
+                    {"lat": 0, "lng": 0.01},
+                    {"lat": 0.01, "lng": 0},
+                ]
+            },
+            "altitude_lower": dict(altitude, value=0),
+            "altitude_upper": dict(altitude, value=100),
+        },
+        "time_start": _time(T0),
+        "time_end": _time(T0 + timedelta(hours=1)),
+    }
+    op_intent = {
+        "reference": {
+            "id": "op1",
+            "manager": "uss1",
+            "uss_availability": "Normal",
+            "version": version,
+            "state": "Accepted",
+            "ovn": f"ovn{version}",
+            "time_start": _time(T0),
+            "time_end": _time(T0 + timedelta(hours=1)),
+            "uss_base_url": "https://uss1",
+            "subscription_id": "sub1",
+        },
+        "details": {"volumes": [volume], "off_nominal_volumes": [], "priority": 0},
+    }
+    entity = FetchedEntity(_query({"operational_intent": op_intent}))
+    entity.id_requested = "op1"
+    entity.entity_type = "operational_intent"
+    refs = FetchedEntityReferences(_query({"operational_intent_references": []}))
+    refs.entity_type = "operational_intent_references"
+    return PollOperationalIntents(
+        poll=FetchedEntities(
+            dss_query=refs,
+            uss_queries={"op1": entity} if version is not None else {},
+            cached_uss_queries={},
+        ),
+        recorded_at=StringBasedDateTime(recorded_at),
+    )
+
+
+def _render_from_scratch(log_path) -> str:
+    kml._historical_kml_states.clear()
+    return kml.render_historical_kml(str(log_path))
+
+
+def test_incremental_rendering(tmp_path):
+    log_path = str(tmp_path)
+    logger = Logger(log_path)
+
+    logger.log_new(_poll(1, T0 + timedelta(minutes=1)))
+    first = kml.render_historical_kml(log_path)
+    assert "v1 (ovn1)" in first and "v2 (ovn2)" not in first
+    assert kml.render_historical_kml(log_path) is first
+
+    logger.log_new(_poll(2, T0 + timedelta(minutes=2)))
+    second = kml.render_historical_kml(log_path)
+    assert "v1 (ovn1)" in second and "v2 (ovn2)" in second
+
+    # Rendering incrementally produces the same result as rendering from scratch
+    assert _render_from_scratch(log_path) == second
+
+
+def test_log_files_completed_out_of_order(tmp_path):
+    log_path = tmp_path / "logs"
+    log_path.mkdir()
+    logger = Logger(str(log_path))
+    first_log = logger.log_new(_poll(1, T0 + timedelta(minutes=1)))
+    logger.log_new(_poll(2, T0 + timedelta(minutes=2)))
+
+    # The log file with the lower index appears only after the one with the higher index has been rendered
+    os.rename(log_path / first_log, tmp_path / first_log)
+    rendered = kml.render_historical_kml(str(log_path))
+    assert "v1 (ovn1)" not in rendered and "v2 (ovn2)" in rendered
+    os.rename(tmp_path / first_log, log_path / first_log)
+    rendered = kml.render_historical_kml(str(log_path))
+    assert "v1 (ovn1)" in rendered and "v2 (ovn2)" in rendered
+    assert rendered == _render_from_scratch(log_path)
+
+
+def test_deletion_completed_out_of_order(tmp_path):
+    log_path = tmp_path / "logs"
+    log_path.mkdir()
+    logger = Logger(str(log_path))
+    first_log = logger.log_new(_poll(1, T0 + timedelta(minutes=1)))
+    logger.log_new(_poll(None, T0 + timedelta(minutes=2)))
+
+    # The operational intent's volumes only end at its deletion if the poll that found it is processed first
+    os.rename(log_path / first_log, tmp_path / first_log)
+    kml.render_historical_kml(str(log_path))
+    os.rename(tmp_path / first_log, log_path / first_log)
+    rendered = kml.render_historical_kml(str(log_path))
+    assert "v1 (ovn1)" in rendered
+    assert "<end>2024-01-01T00:02:00+00:00</end>" in rendered
+    assert rendered == _render_from_scratch(log_path)
+
+
+def test_partially_written_log_file(tmp_path):
+    log_path = tmp_path / "logs"
+    log_path.mkdir()
+    logger = Logger(str(log_path))
+    first_log = logger.log_new(_poll(1, T0 + timedelta(minutes=1)))
+    second_log = logger.log_new(_poll(2, T0 + timedelta(minutes=2)))
+    with open(log_path / second_log, "r") as f:
+        content = f.read()
+
+    # A log file is not processed until it has been completely written
+    with open(log_path / second_log, "w") as f:
+        f.write(content[0 : len(content) // 2])
+    rendered = kml.render_historical_kml(str(log_path))
+    assert "v1 (ovn1)" in rendered and "v2 (ovn2)" not in rendered
+    with open(log_path / second_log, "w") as f:
+        f.write(content)
+    rendered = kml.render_historical_kml(str(log_path))
+    assert "v1 (ovn1)" in rendered and "v2 (ovn2)" in rendered
+    assert rendered == _render_from_scratch(log_path)
+
+    # An earlier log file that is completed late is processed in order
+    with open(log_path / first_log, "r") as f:
+        content = f.read()
+    with open(log_path / first_log, "w") as f:
+        f.write(content[0 : len(content) // 2])
+    kml._historical_kml_states.clear()
+    rendered = kml.render_historical_kml(str(log_path))
+    assert "v1 (ovn1)" not in rendered and "v2 (ovn2)" in rendered
+    with open(log_path / first_log, "w") as f:
+        f.write(content)
+    rendered = kml.render_historical_kml(str(log_path))
+    assert rendered == _render_from_scratch(log_path)
@@ -0,0 +1,200 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import datetime
+from typing import Callable, Dict, List, Optional
+
+import arrow
+import loguru
+from implicitdict import ImplicitDict, StringBasedDateTime
+
+from monitoring.mock_uss.tracer.observation_areas import (
+    ObservationAreaID,
+    ObservationArea,
+)
+from monitoring.monitorlib.multiprocessing import SynchronizedValue
+
+
+MAX_CONCURRENT_POLLS = 16
+"""Maximum number of DSS polls (across all observation areas) to perform concurrently."""
+
+
+class PollingStatus(ImplicitDict):
+    started: bool = False
+
+    last_scheduled: Optional[StringBasedDateTime] = None
+    """Time at which the most recent round of polling was scheduled to start."""
+
+
+class AreaPollTiming(ImplicitDict):
+    """Timing of polls of an observation area relative to the polling schedule."""
+
+    polls: int = 0
+    """Number of rounds of polling completed for this area."""
+
+    deadline_misses: int = 0
+    """Number of rounds of polling that were not complete by the time the next round was scheduled to start."""
+
+    skipped: int = 0
+    """Number of rounds of polling skipped because the previous round for this area was still in progress."""
+
+    last_scheduled: Optional[StringBasedDateTime] = None
+    """Time at which the most recent round of polling for this area was scheduled to start."""
+
+    last_latency_s: Optional[float] = None
+    """Number of seconds between the scheduled start and the completion of the most recent completed round."""
+
+    max_latency_s: float = 0
+    """Largest value of last_latency_s observed."""
+
+
+def _timed(poll: Callable[[], None]) -> datetime.datetime:
+    poll()
+    return arrow.utcnow().datetime
+
+
+def _record_latency(
+    timing: AreaPollTiming, futures: List[Future], scheduled: datetime.datetime
+) -> None:
+    latency_s = (max(f.result() for f in futures) - scheduled).total_seconds()
+    timing.polls += 1
+    timing.last_latency_s = latency_s
+    timing.max_latency_s = max(timing.max_latency_s, latency_s)
+
+
+class PollScheduler(object):
+    """Performs rounds of concurrent polls of observation areas according to a polling interval.
+
+    Each round of polls must complete before the next round is scheduled to start.  When an area's polls do not, the
+    area's deadline miss is recorded, its next round is skipped if its polls are still in progress, and the latency of
+    the late round is recorded once it eventually completes.
+    """
+
+    _polling_status: SynchronizedValue
+    """PollingStatus shared between processes."""
+
+    _poll_timing: SynchronizedValue
+    """AreaPollTiming for each observation area polled, keyed by ObservationAreaID, shared between processes."""
+
+    _executor: ThreadPoolExecutor
+
+    _pending_polls: Dict[ObservationAreaID, List[Future]]
+    """Polls (for this process) of each observation area from the most recent round of polling for that area."""
+
+    def __init__(
+        self,
+        polling_status: SynchronizedValue,
+        poll_timing: SynchronizedValue,
+        max_concurrent_polls: int = MAX_CONCURRENT_POLLS,
+    ):
+        self._polling_status = polling_status
+        self._poll_timing = poll_timing
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_polls, thread_name_prefix="TracerPoll"
+        )
+        self._pending_polls = {}
+
+    def pending_polls(self, area_id: ObservationAreaID) -> List[Future]:
+        """Polls of the specified area from the most recent round of polling for that area in this process."""
+        return list(self._pending_polls.get(area_id, []))
+
+    def _schedule_round(self, interval: datetime.timedelta) -> datetime.datetime:
+        """Determine the time at which the current round of polling should have started, given the polling interval."""
+        now = arrow.utcnow().datetime
+        with self._polling_status as tx:
+            if tx.last_scheduled is not None:
+                scheduled = tx.last_scheduled.datetime + interval
+                if scheduled > now or now - scheduled >= interval:
+                    # Polling is either early or more than an entire interval behind, so restart the schedule from now
+                    scheduled = now
+            else:
+                scheduled = now
+            tx.last_scheduled = StringBasedDateTime(scheduled)
+        return scheduled
+
+    def _on_late_poll_done(
+        self,
+        area_id: ObservationAreaID,
+        futures: List[Future],
+        scheduled: datetime.datetime,
+        recorded: List[bool],
+        future: Future,
+    ) -> None:
+        e = future.exception()
+        if e is not None:
+            loguru.logger.error(
+                f"Poll of observation area {area_id} completed after its deadline with {type(e).__name__}: {e}"
+            )
+            return
+        if recorded or not all(f.done() for f in futures):
+            return
+        recorded.append(True)
+        if not any(f.exception() for f in futures):
+            with self._poll_timing as tx:
+                _record_latency(
+                    tx.setdefault(area_id, AreaPollTiming()), futures, scheduled
+                )
+
+    def poll(
+        self,
+        observation_areas: Dict[ObservationAreaID, ObservationArea],
+        area_polls: Callable[[ObservationArea], List[Callable[[], None]]],
+        interval: datetime.timedelta,
+    ) -> None:
+        """Perform a round of polling of all observation areas, returning once the polls complete or are late.
+
+        Args:
+            observation_areas: Observation areas to poll.
+            area_polls: Function producing the polls to perform for an observation area (only called for areas that
+                are polled in this round).
+            interval: Interval between the scheduled starts of consecutive rounds of polling.
+        """
+        scheduled = self._schedule_round(interval)
+        deadline = scheduled + interval
+
+        # Poll all areas (and all DSS entity types within each area) concurrently
+        started: Dict[ObservationAreaID, List[Future]] = {}
+        skipped: List[ObservationAreaID] = []
+        for area_id in list(self._pending_polls):
+            if area_id not in observation_areas:
+                del self._pending_polls[area_id]
+        for area_id, observation_area in observation_areas.items():
+            if any(not f.done() for f in self._pending_polls.get(area_id, [])):
+                # The previous round of polling for this area has not yet completed
+                skipped.append(area_id)
+                continue
+            polls = area_polls(observation_area)
+            if polls:
+                started[area_id] = [self._executor.submit(_timed, p) for p in polls]
+        self._pending_polls.update(started)
+
+        all_futures = [f for futures in started.values() for f in futures]
+        wait(
+            all_futures,
+            timeout=max(0.0, (deadline - arrow.utcnow().datetime).total_seconds()),
+        )
+
+        late_areas = []
+        with self._poll_timing as tx:
+            for area_id in skipped:
+                tx.setdefault(area_id, AreaPollTiming()).skipped += 1
+            for area_id, futures in started.items():
+                timing = tx.setdefault(area_id, AreaPollTiming())
+                timing.last_scheduled = StringBasedDateTime(scheduled)
+                if all(f.done() for f in futures):
+                    _record_latency(timing, futures, scheduled)
+                else:
+                    timing.deadline_misses += 1
+                    late_areas.append(area_id)
+        for area_id in late_areas:
+            # Record the latency of this round of polling once all its polls eventually complete
+            futures = started[area_id]
+            recorded = []
+            for f in futures:
+                f.add_done_callback(
+                    lambda f, area_id=area_id, futures=futures, recorded=recorded: self._on_late_poll_done(
+                        area_id, futures, scheduled, recorded, f
+                    )
+                )
+        if late_areas:
+            loguru.logger.warning(
+                f"Polling of observation areas {', '.join(late_areas)} did not complete within the polling interval of {interval.total_seconds()} seconds"
+            )
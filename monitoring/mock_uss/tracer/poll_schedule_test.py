@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+from implicitdict import ImplicitDict
+
+from monitoring.mock_uss.tracer.poll_schedule import (
+    AreaPollTiming,
+    PollingStatus,
+    PollScheduler,
+)
+from monitoring.monitorlib.multiprocessing import SynchronizedValue
+
+
+def _make_scheduler() -> PollScheduler:
+    polling_status = SynchronizedValue(
+        PollingStatus(),
+        capacity_bytes=1000,
+        decoder=lambda b: ImplicitDict.parse(
+            json.loads(b.decode("utf-8")), PollingStatus
+        ),
+    )
+    poll_timing = SynchronizedValue(
+        {},
+        capacity_bytes=10000,
+        decoder=lambda b: {
+            k: ImplicitDict.parse(v, AreaPollTiming)
+            for k, v in json.loads(b.decode("utf-8")).items()
+        },
+    )
+    return PollScheduler(polling_status, poll_timing)
+
+
+def _timing(scheduler: PollScheduler):
+    return scheduler._poll_timing.value
+
+
+def test_areas_polled_concurrently():
+    # Every poll waits for all the others to start, so this only completes if they are all performed concurrently
+    area_ids = ["area1", "area2", "area3"]
+    all_started = threading.Barrier(2 * len(area_ids))
+    scheduler = _make_scheduler()
+
+    scheduler.poll(
+        {area_id: area_id for area_id in area_ids},
+        lambda area: [lambda: all_started.wait(timeout=5)] * 2,
+        timedelta(seconds=10),
+    )
+
+    assert not all_started.broken
+    timing = _timing(scheduler)
+    for area_id in area_ids:
+        assert timing[area_id].polls == 1
+        assert timing[area_id].deadline_misses == 0
+        assert timing[area_id].skipped == 0
+        assert timing[area_id].last_latency_s < 5
+
+
+def test_late_polls_miss_deadline_and_skip_next_round():
+    release = threading.Event()
+    area_polls = {
+        "slow": [lambda: release.wait(timeout=5)],
+        "fast": [lambda: None],
+    }
+    areas = {area_id: area_id for area_id in area_polls}
+    interval = timedelta(seconds=0.2)
+    scheduler = _make_scheduler()
+    try:
+        # Polling returns at the deadline even though the slow area's poll is still in progress
+        t0 = time.monotonic()
+        scheduler.poll(areas, lambda area: area_polls[area], interval)
+        assert time.monotonic() - t0 < 1
+        timing = _timing(scheduler)
+        assert timing["slow"].deadline_misses == 1
+        assert timing["slow"].polls == 0
+        assert timing["fast"].polls == 1
+        assert timing["fast"].deadline_misses == 0
+
+        # The slow area is not polled again while its previous round is pending
+        scheduler.poll(areas, lambda area: area_polls[area], interval)
+        timing = _timing(scheduler)
+        assert timing["slow"].skipped == 1
+        assert timing["fast"].polls == 2
+        assert timing["fast"].skipped == 0
+    finally:
+        release.set()
+
+    # The latency of the late round is recorded once it completes
+    for f in scheduler.pending_polls("slow"):
+        f.result(timeout=5)
+    t_end = time.monotonic() + 5
+    while _timing(scheduler)["slow"].polls == 0 and time.monotonic() < t_end:
+        time.sleep(0.01)
+    timing = _timing(scheduler)
+    assert timing["slow"].polls == 1
+    assert timing["slow"].last_latency_s >= interval.total_seconds()
+
+    # Timing is shared between processes as JSON (e.g., for the tracer polling status endpoint)
+    assert (
+        ImplicitDict.parse(json.loads(json.dumps(timing["slow"])), AreaPollTiming)
+        == timing["slow"]
+    )
+
+
+def test_removed_areas_not_polled():
+    polled = []
+    scheduler = _make_scheduler()
+    get_polls = lambda area: [lambda: polled.append(area)]
+
+    scheduler.poll({"a": "a", "b": "b"}, get_polls, timedelta(seconds=5))
+    scheduler.poll({"b": "b"}, get_polls, timedelta(seconds=5))
+
+    assert sorted(polled) == ["a", "b", "b"]
+    assert scheduler.pending_polls("a") == []
@@ -8,7 +8,7 @@ from termcolor import colored
 
 from implicitdict import StringBasedDateTime
 from monitoring.mock_uss import webapp
-from monitoring.mock_uss.tracer import context
+from monitoring.mock_uss.tracer import context, tracer_poll
 from monitoring.mock_uss.tracer.log_types import BadRoute
 from monitoring.monitorlib import fetch, versioning
 
@@ -19,6 +19,12 @@ def tracer_status():
     return "Tracer ok {}".format(versioning.get_code_version())
 
 
+@webapp.route("/tracer/status/polling")
+def tracer_polling_status() -> flask.Response:
+    """Timing of the polling of each observation area relative to the polling schedule."""
+    return flask.jsonify({"observation_areas": tracer_poll.poll_timing.value})
+
+
 from monitoring.mock_uss.tracer.routes import ui
 from monitoring.mock_uss.tracer.routes import scd
 from monitoring.mock_uss.tracer.routes import rid
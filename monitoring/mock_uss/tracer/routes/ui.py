@@ -9,10 +9,9 @@ import flask
 import flask_login
 from implicitdict import ImplicitDict, StringBasedDateTime
 from loguru import logger
-import yaml
 
 from monitoring.mock_uss import webapp
-from monitoring.mock_uss.tracer import context
+from monitoring.mock_uss.tracer import context, tracerlog
 from monitoring.mock_uss.tracer.database import db
 from monitoring.mock_uss.tracer.kml import render_historical_kml
 from monitoring.mock_uss.tracer.log_types import PollFlights, TracerLogEntry
@@ -26,14 +25,10 @@ import monitoring.monitorlib.fetch.rid
 @ui_auth.login_required
 def tracer_list_logs():
     logger.debug(f"Handling tracer_list_logs from {os.getpid()}")
-    logs = [
-        log
-        for log in reversed(sorted(os.listdir(context.tracer_logger.log_path)))
-        if log.endswith(".yaml")
-    ]
+    logs = context.tracer_logger.list_logs()
     kmls = {}
     for log in logs:
-        kml = os.path.join("kml", log[0:-5] + ".kml")
+        kml = os.path.join("kml", tracerlog.log_basename(log) + ".kml")
         if os.path.exists(os.path.join(context.tracer_logger.log_path, kml)):
             kmls[log] = kml
     response = flask.make_response(
@@ -52,16 +47,16 @@ def tracer_list_logs():
 @webapp.route("/tracer/logs.zip")
 @ui_auth.login_required(role="admin")
 def tracer_download_logs():
-    logs = [
-        log
-        for log in reversed(sorted(os.listdir(context.tracer_logger.log_path)))
-        if log.endswith(".yaml")
-    ]
+    logs = context.tracer_logger.list_logs()
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "a", zipfile.ZIP_DEFLATED, False) as zip_file:
         for log in logs:
-            with open(os.path.join(context.tracer_logger.log_path, log), "r") as f:
-                zip_file.writestr(log, f.read())
+            zip_file.writestr(
+                tracerlog.log_basename(log) + ".yaml",
+                tracerlog.export_log_yaml(
+                    os.path.join(context.tracer_logger.log_path, log)
+                ),
+            )
     zip_name = (
         f"logs_{datetime.datetime.now(datetime.UTC).isoformat().split('.')[0]}.zip"
     )
@@ -81,10 +76,11 @@ def tracer_clear_logs():
     files = [
         f
         for f in reversed(sorted(os.listdir(context.tracer_logger.log_path)))
-        if f.endswith(".yaml") or f.endswith(".kml")
+        if tracerlog.is_log_file(f) or f.endswith(".kml")
     ]
     for f in files:
         os.remove(os.path.join(context.tracer_logger.log_path, f))
+    context.tracer_logger.reset_index()
     return f"{len(files)} log files cleared successfully", 200
 
 
@@ -115,12 +111,7 @@ def tracer_logs(log):
     logfile = os.path.join(context.tracer_logger.log_path, log)
     if not os.path.exists(logfile):
         flask.abort(404)
-    with open(logfile, "r") as f:
-        objs = [obj for obj in yaml.full_load_all(f)]
-    if len(objs) == 1:
-        obj = objs[0]
-    else:
-        obj = {"entries": objs}
+    obj = tracerlog.load_log(logfile)
 
     object_type_name = obj.get("object_type", None)
     object_type = TracerLogEntry.entry_type(object_type_name)
@@ -171,11 +162,15 @@ def tracer_kmls(kml):
 @ui_auth.login_required
 def tracer_kml_historical():
     kml_name = f"historical_{datetime.datetime.now(datetime.UTC).isoformat().split('.')[0]}.kml"
-    return flask.Response(
+    response = flask.Response(
         render_historical_kml(context.tracer_logger.log_path),
         mimetype="application/vnd.google-earth.kml+xml",
         headers={"Content-Disposition": f"attachment;filename={kml_name}"},
     )
+    # Allow clients to avoid re-downloading the KML when nothing new has been logged
+    response.add_etag()
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(flask.request)
 
 
 def _get_validated_obs_area(observation_area_id: str) -> ObservationArea:
@@ -1,7 +1,7 @@
 import datetime
 import json
 import sys
-from typing import Optional, Dict
+from typing import Callable, Dict, List, Optional
 
 import arrow
 from implicitdict import ImplicitDict, StringBasedDateTime
@@ -16,18 +16,22 @@ from monitoring.mock_uss.tracer.log_types import (
     PollConstraints,
     PollISAs,
     PollStart,
+    TracerLogEntry,
 )
 from monitoring.mock_uss.tracer.observation_areas import (
     ObservationAreaID,
     ObservationArea,
 )
+from monitoring.mock_uss.tracer.poll_schedule import (
+    AreaPollTiming,
+    PollingStatus,
+    PollScheduler,
+)
 from monitoring.monitorlib import versioning, fetch
 from monitoring.mock_uss import webapp
 from monitoring.mock_uss.tracer import diff, tracerlog
 from monitoring.mock_uss.tracer.database import db
 from monitoring.mock_uss.tracer import context
-from monitoring.monitorlib.fetch.rid import FetchedISAs
-from monitoring.monitorlib.fetch.scd import FetchedEntities
 from monitoring.monitorlib.geo import make_latlng_rect, get_latlngrect_vertices
 from monitoring.monitorlib.infrastructure import UTMClientSession
 from monitoring.monitorlib.multiprocessing import SynchronizedValue
@@ -36,10 +40,6 @@ from monitoring.monitorlib.multiprocessing import SynchronizedValue
 TASK_POLL_OBSERVATION_AREAS = "tracer poll observation areas"
 
 
-class PollingStatus(ImplicitDict):
-    started: bool = False
-
-
 polling_status = SynchronizedValue(
     PollingStatus(),
     capacity_bytes=1000,
@@ -49,17 +49,31 @@ polling_status = SynchronizedValue(
 
 class PollingValues(ImplicitDict):
     need_line_break: bool = False
-    last_isa_result: Optional[FetchedISAs] = None
-    last_ops_result: Optional[FetchedEntities] = None
-    last_constraints_result: Optional[FetchedEntities] = None
+    last_isa_results: Dict[ObservationAreaID, diff.PollSummary]
+    last_ops_results: Dict[ObservationAreaID, diff.PollSummary]
+    last_constraints_results: Dict[ObservationAreaID, diff.PollSummary]
 
 
 polling_values = SynchronizedValue(
-    PollingValues(),
+    PollingValues(
+        last_isa_results={}, last_ops_results={}, last_constraints_results={}
+    ),
     decoder=lambda b: ImplicitDict.parse(json.loads(b.decode("utf-8")), PollingValues),
 )
 
 
+poll_timing = SynchronizedValue(
+    {},
+    decoder=lambda b: {
+        k: ImplicitDict.parse(v, AreaPollTiming)
+        for k, v in json.loads(b.decode("utf-8")).items()
+    },
+)
+"""AreaPollTiming for each observation area polled, keyed by ObservationAreaID."""
+
+_poll_scheduler = PollScheduler(polling_status, poll_timing)
+
+
 def print_no_newline(s):
     sys.stdout.write(s)
     sys.stdout.flush()
@@ -83,67 +97,110 @@ def _log_poll_start(logger):
         )
 
 
-@webapp.periodic_task(TASK_POLL_OBSERVATION_AREAS)
+def _area_polls(
+    area: ObservationArea, logger: tracerlog.Logger
+) -> List[Callable[[], None]]:
+    polls = []
+    if area.f3411 is not None and area.f3411.poll:
+        polls.append(lambda: poll_isas(area, logger))
+    if area.f3548 is not None and area.f3548.poll:
+        scd_client = context.get_client(
+            area.f3548.auth_spec,
+            area.f3548.dss_base_url,
+        )
+        if area.f3548.monitor_op_intents:
+            polls.append(lambda: poll_ops(area, scd_client, logger))
+        if area.f3548.monitor_constraints:
+            polls.append(lambda: poll_constraints(area, scd_client, logger))
+    return polls
+
+
+@webapp.periodic_task(TASK_POLL_OBSERVATION_AREAS, concurrent=True)
 def poll_observation_areas() -> None:
     logger = context.tracer_logger
     _log_poll_start(logger)
+    tracer_db = db.value
     observation_areas: Dict[
         ObservationAreaID, ObservationArea
-    ] = db.value.observation_areas
-    for observation_area in observation_areas.values():
-        if observation_area.f3411 is not None and observation_area.f3411.poll:
-            poll_isas(observation_area, logger)
-        if observation_area.f3548 is not None and observation_area.f3548.poll:
-            scd_client = context.get_client(
-                observation_area.f3548.auth_spec,
-                observation_area.f3548.dss_base_url,
-            )
-            if observation_area.f3548.monitor_op_intents:
-                poll_ops(observation_area, scd_client, logger)
-            if observation_area.f3548.monitor_constraints:
-                poll_constraints(observation_area, scd_client, logger)
+    ] = tracer_db.observation_areas
+    _poll_scheduler.poll(
+        observation_areas,
+        lambda area: _area_polls(area, logger),
+        tracer_db.polling_interval.timedelta,
+    )
 
 
-def poll_isas(area: ObservationArea, logger: tracerlog.Logger) -> None:
-    rid_client = context.get_client(area.f3411.auth_spec, area.f3411.dss_base_url)
-    box = get_latlngrect_vertices(make_latlng_rect(area.area.volume))
-
-    t0 = datetime.datetime.now(datetime.UTC)
-    result = fetch.rid.isas(
-        box,
-        area.area.time_start.datetime,
-        area.area.time_end.datetime,
-        area.f3411.rid_version,
-        rid_client,
-    )
-    t1 = datetime.datetime.now(datetime.UTC)
+def _log_poll_result(
+    area_id: ObservationAreaID,
+    results_field: str,
+    digest: str,
+    summarize: Callable[[], diff.PollSummary],
+    log_entry: TracerLogEntry,
+    t0: datetime.datetime,
+    t1: datetime.datetime,
+    logger: tracerlog.Logger,
+) -> None:
+    """Log a poll result, in full if its content differs from the previous result for the area and briefly otherwise.
 
-    log_new = False
-    last_result = None
+    Args:
+        area_id: Observation area that was polled.
+        results_field: Field of PollingValues holding the previous results of this kind of poll.
+        digest: Content digest of the poll result.
+        summarize: Function to summarize the poll result (only called when the content of the result has changed).
+        log_entry: Log entry for the poll result.
+        t0: Time at which the poll started.
+        t1: Time at which the poll completed.
+        logger: Tracer logger to which the result should be logged.
+    """
     with polling_values as tx:
         assert isinstance(tx, PollingValues)
-        if tx.last_isa_result is None or result.has_different_content_than(
-            tx.last_isa_result
-        ):
-            last_result = tx.last_isa_result
+        last_result: Optional[diff.PollSummary] = tx[results_field].get(area_id, None)
+        if last_result is None or last_result.digest != digest:
+            summary = summarize()
+            tx[results_field][area_id] = summary
             log_new = True
             tx.need_line_break = False
-            tx.last_isa_result = result
         else:
+            log_new = False
             tx.need_line_break = True
         need_line_break = tx.need_line_break
 
-    log_entry = PollISAs(poll=result, recorded_at=StringBasedDateTime(arrow.utcnow()))
     if log_new:
         logger.log_new(log_entry)
         if need_line_break:
             print()
-        print(diff.isa_diff_text(last_result, result))
+        print(diff.summary_diff_text(last_result, summary))
     else:
         logger.log_same(t0, t1, log_entry.prefix_code())
         print_no_newline(".")
 
 
+def poll_isas(area: ObservationArea, logger: tracerlog.Logger) -> None:
+    rid_client = context.get_client(area.f3411.auth_spec, area.f3411.dss_base_url)
+    box = get_latlngrect_vertices(make_latlng_rect(area.area.volume))
+
+    t0 = datetime.datetime.now(datetime.UTC)
+    result = fetch.rid.isas(
+        box,
+        area.area.time_start.datetime,
+        area.area.time_end.datetime,
+        area.f3411.rid_version,
+        rid_client,
+    )
+    t1 = datetime.datetime.now(datetime.UTC)
+
+    _log_poll_result(
+        area.id,
+        "last_isa_results",
+        result.content_digest,
+        lambda: diff.summarize_isas(result),
+        PollISAs(poll=result, recorded_at=StringBasedDateTime(arrow.utcnow())),
+        t0,
+        t1,
+        logger,
+    )
+
+
 def poll_ops(
     area: ObservationArea, scd_client: UTMClientSession, logger: tracerlog.Logger
 ) -> None:
@@ -162,31 +219,18 @@ def poll_ops(
     )
     t1 = datetime.datetime.now(datetime.UTC)
 
-    log_new = False
-    last_result = None
-    with polling_values as tx:
-        if tx.last_ops_result is None or result.has_different_content_than(
-            tx.last_ops_result
-        ):
-            last_result = tx.last_ops_result
-            log_new = True
-            tx.need_line_break = False
-            tx.last_ops_result = result
-        else:
-            tx.need_line_break = True
-        need_line_break = tx.need_line_break
-
-    log_entry = PollOperationalIntents(
-        poll=result, recorded_at=StringBasedDateTime(arrow.utcnow())
+    _log_poll_result(
+        area.id,
+        "last_ops_results",
+        result.content_digest,
+        lambda: diff.summarize_entities(result),
+        PollOperationalIntents(
+            poll=result, recorded_at=StringBasedDateTime(arrow.utcnow())
+        ),
+        t0,
+        t1,
+        logger,
     )
-    if log_new:
-        logger.log_new(log_entry)
-        if need_line_break:
-            print()
-        print(diff.entity_diff_text(last_result, result))
-    else:
-        logger.log_same(t0, t1, log_entry.prefix_code())
-        print_no_newline(".")
 
 
 def poll_constraints(
@@ -205,26 +249,13 @@ def poll_constraints(
     )
     t1 = datetime.datetime.now(datetime.UTC)
 
-    log_new = False
-    last_result = None
-    with polling_values as tx:
-        if result.has_different_content_than(tx.last_constraints_result):
-            last_result = tx.last_constraints_result
-            log_new = True
-            tx.need_line_break = False
-            tx.last_constraints_result = result
-        else:
-            tx.need_line_break = True
-        need_line_break = tx.need_line_break
-
-    log_entry = PollConstraints(
-        poll=result, recorded_at=StringBasedDateTime(arrow.utcnow())
+    _log_poll_result(
+        area.id,
+        "last_constraints_results",
+        result.content_digest,
+        lambda: diff.summarize_entities(result),
+        PollConstraints(poll=result, recorded_at=StringBasedDateTime(arrow.utcnow())),
+        t0,
+        t1,
+        logger,
     )
-    if log_new:
-        logger.log_new(log_entry)
-        if need_line_break:
-            print()
-        print(diff.entity_diff_text(last_result, result))
-    else:
-        logger.log_same(t0, t1, log_entry.prefix_code())
-        print_no_newline(".")
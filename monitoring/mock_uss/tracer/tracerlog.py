@@ -1,58 +1,183 @@
 import datetime
 import json
 import os
+import queue
+import re
+import threading
+from typing import List, Optional, Tuple
 
+from loguru import logger
 import yaml
 
 from monitoring.mock_uss.tracer.log_types import TracerLogEntry
 from monitoring.monitorlib import infrastructure
+from monitoring.monitorlib.multiprocessing import SynchronizedValue
+
+NOCHANGE_QUERIES_LOG = "000000_nochange_queries.jsonl"
+"""Name of the log to which an entry is appended each time a poll yields no changes."""
+
+LOG_FILE_EXTENSIONS = (".json", ".jsonl", ".yaml")
+"""Extensions of tracer log files; new logs are written as JSON, but older tracer sessions wrote YAML."""
+
+LOG_ENTRY_FILENAME_REGEX = re.compile(
+    r"^(\d{6})_(\d\d)(\d\d)(\d\d)_(\d{6})_([^.]+)\.(json|yaml)$"
+)
+"""Pattern matching the name of a log entry file, capturing index, hour, minute, second, microsecond, prefix code, and
+extension."""
+
+
+def is_log_file(filename: str) -> bool:
+    return filename.endswith(LOG_FILE_EXTENSIONS)
+
+
+def log_basename(filename: str) -> str:
+    """Name of the log file without its extension (also the base name of its KML, if any)."""
+    return os.path.splitext(filename)[0]
+
+
+def load_log(path: str):
+    """Load the content of the log entry (or nochange queries log) at the specified path."""
+    with open(path, "r") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        elif path.endswith(".jsonl"):
+            return {"entries": [json.loads(line) for line in f if line.strip()]}
+        else:
+            objs = [obj for obj in yaml.full_load_all(f)]
+            return objs[0] if len(objs) == 1 else {"entries": objs}
+
+
+def _plain(content: dict) -> dict:
+    # Convert to builtin types so that YAML does not tag custom classes
+    return json.loads(json.dumps(content))
+
+
+def export_log_yaml(path: str) -> str:
+    """Render the log entry (or nochange queries log) at the specified path as YAML."""
+    if path.endswith(".yaml"):
+        with open(path, "r") as f:
+            return f.read()
+    content = load_log(path)
+    if path.endswith(".jsonl"):
+        return yaml.dump_all(content["entries"], explicit_start=True)
+    return yaml.dump(content, indent=2)
 
 
 class Logger(object):
+    """Writes tracer log entries to a folder.
+
+    Each new entry is written as a compact JSON file named with an index from a
+    counter shared across processes (so the folder does not need to be listed
+    for each entry).  When a KML server is configured, entries are sent to it
+    from a background worker so that logging does not wait on the KML server.
+    """
+
     def __init__(
         self, log_path: str, kml_session: infrastructure.KMLGenerationSession = None
     ):
         self.log_path = log_path
         os.makedirs(self.log_path, exist_ok=True)
         self.kml_session = kml_session
+        self._next_index = SynchronizedValue({"next_index": None}, capacity_bytes=100)
+        self._kml_queue: queue.Queue[Tuple[str, TracerLogEntry]] = queue.Queue()
+        self._kml_worker: Optional[threading.Thread] = None
+        self._kml_worker_pid: Optional[int] = None
+        self._kml_worker_lock = threading.Lock()
+
+    def _claim_index(self) -> int:
+        with self._next_index as tx:
+            if tx["next_index"] is None:
+                # Continue numbering from any entries already in the folder
+                indices = [
+                    int(m.group(1))
+                    for m in (
+                        LOG_ENTRY_FILENAME_REGEX.match(f)
+                        for f in os.listdir(self.log_path)
+                    )
+                    if m
+                ]
+                tx["next_index"] = max(indices) + 1 if indices else 1
+            n = tx["next_index"]
+            tx["next_index"] = n + 1
+        return n
+
+    def reset_index(self) -> None:
+        """Restart log entry numbering (e.g., after all log entries have been removed)."""
+        with self._next_index as tx:
+            tx["next_index"] = None
 
     def log_same(self, t0: datetime.datetime, t1: datetime.datetime, code: str) -> None:
-        with open(
-            os.path.join(self.log_path, "000000_nochange_queries.yaml"), "a"
-        ) as f:
+        with open(os.path.join(self.log_path, NOCHANGE_QUERIES_LOG), "a") as f:
             body = {"t0": t0.isoformat(), "t1": t1.isoformat(), "code": code}
-            f.write(yaml.dump(body, explicit_start=True))
+            f.write(json.dumps(body) + "\n")
 
     def log_new(self, content: TracerLogEntry) -> str:
-        n = len(os.listdir(self.log_path))
         basename = "{:06d}_{}_{}".format(
-            n, datetime.datetime.now().strftime("%H%M%S_%f"), content.prefix_code()
+            self._claim_index(),
+            datetime.datetime.now().strftime("%H%M%S_%f"),
+            content.prefix_code(),
         )
-        logname = "{}.yaml".format(basename)
-        fullname = os.path.join(self.log_path, logname)
-
-        dump = json.loads(json.dumps(content))
-        dump["object_type"] = type(content).__name__
-        with open(fullname, "w") as f:
-            f.write(yaml.dump(dump, indent=2))
+        logname = "{}.json".format(basename)
+        with open(os.path.join(self.log_path, logname), "w") as f:
+            json.dump(content, f)
 
         if self.kml_session:
-            kml_server_filename = os.path.join(self.kml_session.kml_folder, logname)
+            self._ensure_kml_worker()
+            self._kml_queue.put((basename, content))
+
+        return logname
+
+    def _ensure_kml_worker(self) -> None:
+        # The worker must be (re)started in each process, as threads do not survive a fork
+        if self._kml_worker is not None and self._kml_worker_pid == os.getpid():
+            return
+        with self._kml_worker_lock:
+            if self._kml_worker is None or self._kml_worker_pid != os.getpid():
+                self._kml_worker_pid = os.getpid()
+                self._kml_worker = threading.Thread(
+                    target=self._upload_kmls, name="TracerKMLUpload", daemon=True
+                )
+                self._kml_worker.start()
+
+    def _upload_kmls(self) -> None:
+        while True:
+            basename, content = self._kml_queue.get()
             try:
-                with open(fullname, "r") as f:
-                    resp = self.kml_session.post(
-                        "/realtime_kml",
-                        data={"path": self.kml_session.kml_folder},
-                        files=[("files[]", f)],
-                    )
-                resp.raise_for_status()
-                kml_path = os.path.join(self.log_path, "kml")
-                os.makedirs(kml_path, exist_ok=True)
-                with open(os.path.join(kml_path, "{}.kml".format(basename)), "w") as f:
-                    f.write(resp.content.decode("utf-8"))
-            except IOError as e:
-                print(
-                    "Error posting {} to KML server: {}".format(kml_server_filename, e)
+                self._upload_kml(basename, content)
+            except Exception as e:
+                logger.error(
+                    f"{type(e).__name__} while generating KML for {basename}: {e}"
                 )
+            finally:
+                self._kml_queue.task_done()
 
-        return logname
+    def _upload_kml(self, basename: str, content: TracerLogEntry) -> None:
+        # The KML server consumes YAML log files
+        logname = "{}.yaml".format(basename)
+        kml_server_filename = os.path.join(self.kml_session.kml_folder, logname)
+        try:
+            resp = self.kml_session.post(
+                "/realtime_kml",
+                data={"path": self.kml_session.kml_folder},
+                files=[("files[]", (logname, yaml.dump(_plain(content), indent=2)))],
+            )
+            resp.raise_for_status()
+            kml_path = os.path.join(self.log_path, "kml")
+            os.makedirs(kml_path, exist_ok=True)
+            with open(os.path.join(kml_path, "{}.kml".format(basename)), "w") as f:
+                f.write(resp.content.decode("utf-8"))
+        except IOError as e:
+            print("Error posting {} to KML server: {}".format(kml_server_filename, e))
+
+    @property
+    def pending_kml_uploads(self) -> int:
+        """Number of log entries waiting to be sent to the KML server."""
+        return self._kml_queue.unfinished_tasks
+
+    def list_logs(self) -> List[str]:
+        """Names of all log files, most recent first."""
+        return [
+            log
+            for log in reversed(sorted(os.listdir(self.log_path)))
+            if is_log_file(log)
+        ]
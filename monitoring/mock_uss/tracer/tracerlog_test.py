@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+
+import yaml
+from implicitdict import StringBasedDateTime
+
+from monitoring.mock_uss.tracer import tracerlog
+from monitoring.mock_uss.tracer.log_types import PollStart
+from monitoring.mock_uss.tracer.tracerlog import Logger
+
+T0 = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _entry(n: int, **config) -> PollStart:
+    return PollStart(config=dict(config, n=n), recorded_at=StringBasedDateTime(T0))
+
+
+def _index(logname: str) -> int:
+    return int(tracerlog.LOG_ENTRY_FILENAME_REGEX.match(logname).group(1))
+
+
+def _log_new_in_child(logger: Logger, entry: PollStart) -> None:
+    logger.log_new(entry)
+    # Exit without cleaning up threads inherited from the parent process
+    os._exit(0)
+
+
+def test_log_index(tmp_path):
+    logger = Logger(str(tmp_path))
+    logger.log_same(T0, T0, "poll_ops")
+    assert [_index(logger.log_new(_entry(n))) for n in range(3)] == [1, 2, 3]
+
+    # Numbering is shared with processes forked from the logger's process
+    child = multiprocessing.get_context("fork").Process(
+        target=_log_new_in_child, args=(logger, _entry(3))
+    )
+    child.start()
+    child.join(timeout=10)
+    assert child.exitcode == 0
+    assert _index(logger.log_new(_entry(4))) == 5
+
+    # A new logger continues numbering from the entries already in the folder
+    other = Logger(str(tmp_path))
+    assert _index(other.log_new(_entry(5))) == 6
+
+    # Numbering restarts once the entries are removed and the index is reset
+    for log in other.list_logs():
+        os.remove(os.path.join(str(tmp_path), log))
+    other.reset_index()
+    assert _index(other.log_new(_entry(6))) == 1
+
+
+def test_log_same(tmp_path):
+    logger = Logger(str(tmp_path))
+    t1 = T0 + timedelta(seconds=1)
+    logger.log_same(T0, t1, "poll_ops")
+    logger.log_same(t1, t1 + timedelta(seconds=1), "poll_isas")
+
+    assert logger.list_logs() == [tracerlog.NOCHANGE_QUERIES_LOG]
+    entries = tracerlog.load_log(
+        os.path.join(str(tmp_path), tracerlog.NOCHANGE_QUERIES_LOG)
+    )["entries"]
+    assert [e["code"] for e in entries] == ["poll_ops", "poll_isas"]
+    assert datetime.fromisoformat(entries[0]["t0"]) == T0
+    assert datetime.fromisoformat(entries[0]["t1"]) == t1
+
+
+def test_export_log_yaml(tmp_path):
+    logger = Logger(str(tmp_path))
+    logname = logger.log_new(_entry(1))
+    logger.log_same(T0, T0, "poll_ops")
+    logger.log_same(T0, T0, "poll_constraints")
+
+    path = os.path.join(str(tmp_path), logname)
+    assert yaml.full_load(tracerlog.export_log_yaml(path)) == tracerlog.load_log(path)
+
+    nochange_path = os.path.join(str(tmp_path), tracerlog.NOCHANGE_QUERIES_LOG)
+    exported = tracerlog.export_log_yaml(nochange_path)
+    assert [e for e in yaml.full_load_all(exported)] == tracerlog.load_log(
+        nochange_path
+    )["entries"]
+
+    # Logs written as YAML by older tracer sessions are exported as they are
+    yaml_path = os.path.join(str(tmp_path), "000002_000000_000000_poll_ops.yaml")
+    with open(yaml_path, "w") as f:
+        f.write(exported)
+    assert tracerlog.export_log_yaml(yaml_path) == exported
+    assert tracerlog.load_log(yaml_path) == tracerlog.load_log(nochange_path)
+
+
+class _FakeResponse(object):
+    def __init__(self, content: str):
+        self.content = content.encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+
+class _FakeKMLSession(object):
+    def __init__(self):
+        self.kml_folder = "kml_folder"
+        self.release = threading.Event()
+        self.posted = []
+
+    def post(self, url, data, files):
+        self.release.wait(timeout=5)
+        logname, content = files[0][1]
+        self.posted.append(yaml.full_load(content))
+        if "fail" in yaml.full_load(content)["config"]:
+            raise ValueError("KML server error")
+        return _FakeResponse(f"<kml>{logname}</kml>")
+
+
+def test_kml_uploads(tmp_path):
+    session = _FakeKMLSession()
+    logger = Logger(str(tmp_path), kml_session=session)
+    lognames = [logger.log_new(_entry(1)), logger.log_new(_entry(2))]
+    logger.log_new(_entry(3, fail=True))
+
+    # Logging does not wait for the KML server
+    assert logger.pending_kml_uploads == 3
+    session.release.set()
+    t_end = time.monotonic() + 5
+    while logger.pending_kml_uploads > 0 and time.monotonic() < t_end:
+        time.sleep(0.01)
+
+    # All uploads are drained, even when the KML server fails
+    assert logger.pending_kml_uploads == 0
+    assert [p["config"] for p in session.posted] == [
+        {"n": 1},
+        {"n": 2},
+        {"n": 3, "fail": True},
+    ]
+    kml_path = os.path.join(str(tmp_path), "kml")
+    assert sorted(os.listdir(kml_path)) == [
+        tracerlog.log_basename(logname) + ".kml" for logname in lognames
+    ]
+    with open(
+        os.path.join(kml_path, tracerlog.log_basename(lognames[0]) + ".kml")
+    ) as f:
+        assert f.read() == f"<kml>{tracerlog.log_basename(lognames[0])}.yaml</kml>"
@@ -1,5 +1,9 @@
+import hashlib
 import json
-from typing import List, NamedTuple
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
 from functools import wraps
 
 import flask
@@ -30,14 +34,79 @@ class ConfigurationError(Exception):
         self.message = message
 
 
-def requires_scope_decorator(public_key: str, audience: str):
+DEFAULT_MAX_CACHED_TOKENS = 1024
+"""Default number of verified access tokens to remember per process."""
+
+
+class VerifiedTokenCache(object):
+    """Bounded cache of the claims of access tokens whose signature has been verified.
+
+    Entries are keyed by a hash of the token (so raw tokens are not retained)
+    and expire at the token's `exp` claim.  Tokens without an `exp` claim are
+    never cached.  When full, the least-recently-used entry is evicted.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_CACHED_TOKENS):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, Dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        """Retrieve the verified claims of the specified token, if cached and not expired."""
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            claims = self._entries.get(key, None)
+            if claims is not None and claims["exp"] <= now:
+                del self._entries[key]
+                claims = None
+            if claims is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict) -> None:
+        """Remember the verified claims of the specified token until it expires."""
+        if self._max_entries <= 0 or not isinstance(
+            claims.get("exp", None), (int, float)
+        ):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def requires_scope_decorator(
+    public_key: str,
+    audience: str,
+    max_cached_tokens: int = DEFAULT_MAX_CACHED_TOKENS,
+):
     """Function that produces a decorator to protect a Flask endpoint.
 
     If you decorate an endpoint with a decorator produced by this function, it
     will ensure that the requester has a valid access token with the required
     scope before allowing the endpoint to be called.
+
+    Signature verification results are cached (up to max_cached_tokens tokens,
+    until each token expires) so that reused tokens are not re-verified on every
+    request; audience and scope are still checked on every request.
     """
     audiences = audience.split(",") if audience else []
+    token_cache = VerifiedTokenCache(max_cached_tokens)
 
     def decorator(permitted_scopes):
         if isinstance(permitted_scopes, str):
@@ -72,12 +141,15 @@ def requires_scope_decorator(public_key: str, audience: str):
                             raise ConfigurationError(
                                 "Audience for access tokens is not configured on server"
                             )
-                        r = jwt.decode(
-                            token,
-                            public_key,
-                            algorithms="RS256",
-                            options={"verify_aud": False},
-                        )
+                        r = token_cache.get(token)
+                        if r is None:
+                            r = jwt.decode(
+                                token,
+                                public_key,
+                                algorithms="RS256",
+                                options={"verify_aud": False},
+                            )
+                            token_cache.put(token, r)
                         if "aud" not in r:
                             raise InvalidAccessTokenError(
                                 "Access token is missing aud claim."
@@ -124,6 +196,7 @@ def requires_scope_decorator(public_key: str, audience: str):
 
         return outer_wrapper
 
+    decorator.token_cache = token_cache
     return decorator
 
 
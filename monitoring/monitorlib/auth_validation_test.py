@@ -0,0 +1,102 @@
+import time
+
+import flask
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from monitoring.monitorlib.auth_validation import (
+    InvalidAccessTokenError,
+    InvalidScopeError,
+    VerifiedTokenCache,
+    requires_scope_decorator,
+)
+
+AUDIENCE = "localhost"
+SCOPE = "interuss.test.scope"
+
+_private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+_public_key = (
+    _private_key.public_key()
+    .public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    .decode("utf-8")
+)
+
+
+def _token(aud: str = AUDIENCE, scope: str = SCOPE, lifetime_s: int = 60) -> str:
+    return jwt.encode(
+        {
+            "aud": aud,
+            "scope": scope,
+            "sub": "test_client",
+            "iss": "test_issuer",
+            "exp": int(time.time()) + lifetime_s,
+        },
+        _private_key,
+        algorithm="RS256",
+    )
+
+
+def _call(requires_scope, token: str, scope: str = SCOPE) -> str:
+    app = flask.Flask(__name__)
+
+    @requires_scope(scope)
+    def endpoint():
+        return flask.request.jwt.client_id
+
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        return endpoint()
+
+
+def test_verified_token_is_cached():
+    requires_scope = requires_scope_decorator(_public_key, AUDIENCE)
+    token = _token()
+
+    assert _call(requires_scope, token) == "test_client"
+    assert _call(requires_scope, token) == "test_client"
+    assert requires_scope.token_cache.misses == 1
+    assert requires_scope.token_cache.hits == 1
+
+
+def test_cached_token_still_checks_audience_and_scope():
+    requires_scope = requires_scope_decorator(_public_key, AUDIENCE)
+    token = _token()
+    _call(requires_scope, token)
+
+    with pytest.raises(InvalidScopeError):
+        _call(requires_scope, token, scope="interuss.other.scope")
+
+    other_audience = requires_scope_decorator(_public_key, "elsewhere")
+    other_audience.token_cache.put(
+        token, jwt.decode(token, _public_key, algorithms="RS256", audience=AUDIENCE)
+    )
+    with pytest.raises(InvalidAccessTokenError):
+        _call(other_audience, token)
+    assert other_audience.token_cache.hits == 1
+
+
+def test_expired_entries_are_not_used():
+    cache = VerifiedTokenCache()
+    cache.put("expired", {"exp": time.time() - 1})
+    cache.put("no_exp", {"scope": SCOPE})
+
+    assert cache.get("expired") is None
+    assert cache.get("no_exp") is None
+    assert len(cache) == 0
+
+
+def test_cache_is_bounded():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    assert cache.get("a") is not None
+    cache.put("c", {"exp": exp})
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
@@ -1,22 +1,180 @@
+import atexit
+import os
+import queue
+import threading
+import time
 from abc import ABC
-from typing import List
+from dataclasses import dataclass
+from typing import List, Optional
+
+from loguru import logger
 
 from monitoring.monitorlib.fetch import Query
 
+FLUSH_POLL_INTERVAL_S = 0.01
+"""Number of seconds between checks for completion while flushing query hooks."""
+
 
 class QueryHook(ABC):
     def on_query(self, query: Query) -> None:
         """Called whenever a client performs a query and this hook is included in query_hooks.
 
+        Note that this method is called from a background worker thread rather than the thread that performed the
+        query.
+
         Args:
             query: Query that was performed.
         """
         raise NotImplementedError("QueryHook subclass did not implement on_query")
 
+    def on_query_submitted(self, query: Query) -> None:
+        """Called on the thread that performed the query, before the query is queued to be passed to on_query.
+
+        Hooks whose effects must be visible as soon as the query has completed may override this method, which
+        should return quickly.
+
+        Args:
+            query: Query that was performed.
+        """
+        pass
+
+
+@dataclass
+class QueryHookDispatcherStats:
+    submitted: int = 0
+    """Number of queries accepted for processing by hooks."""
+
+    processed: int = 0
+    """Number of queries for which all hooks have been called."""
+
+    dropped: int = 0
+    """Number of queries discarded without calling hooks because the queue remained full."""
+
+    delayed: int = 0
+    """Number of submissions that had to wait for space in a full queue (back-pressure)."""
+
+    hook_errors: int = 0
+    """Number of exceptions raised by hooks."""
+
+
+class QueryHookDispatcher(object):
+    """Calls query hooks from a background worker so that slow hooks do not delay the thread performing queries.
+
+    Queries are placed in a bounded queue.  When the queue is full, the submitting
+    thread waits up to max_enqueue_wait_s for space to become available and, if
+    none does, the query is dropped (and counted in stats.dropped).
+    """
+
+    stats: QueryHookDispatcherStats
+
+    def __init__(
+        self,
+        hooks: List[QueryHook],
+        max_queue_size: int = 1000,
+        max_enqueue_wait_s: float = 0.05,
+    ):
+        self._hooks = hooks
+        self._max_enqueue_wait_s = max_enqueue_wait_s
+        self._queue: queue.Queue[Query] = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.stats = QueryHookDispatcherStats()
+
+    def _ensure_worker(self) -> None:
+        # The worker must be (re)started in each process, as threads do not survive a fork
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(
+                    target=self._process_queue, name="QueryHookDispatcher", daemon=True
+                )
+                self._worker.start()
+
+    def _process_queue(self) -> None:
+        while True:
+            query = self._queue.get()
+            try:
+                for hook in list(self._hooks):
+                    try:
+                        hook.on_query(query=query)
+                    except Exception as e:
+                        self.stats.hook_errors += 1
+                        logger.error(
+                            f"{type(hook).__name__} raised {type(e).__name__} handling query to {query.request.url}: {e}"
+                        )
+                self.stats.processed += 1
+            finally:
+                self._queue.task_done()
+
+    def submit(self, query: Query) -> bool:
+        """Queue the query to be passed to all hooks.
+
+        Returns:
+            False if the query was dropped because the queue was full, True otherwise.
+        """
+        if not self._hooks:
+            return True
+        for hook in list(self._hooks):
+            try:
+                hook.on_query_submitted(query=query)
+            except Exception as e:
+                self.stats.hook_errors += 1
+                logger.error(
+                    f"{type(hook).__name__} raised {type(e).__name__} upon submission of query to {query.request.url}: {e}"
+                )
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(query)
+        except queue.Full:
+            self.stats.delayed += 1
+            try:
+                self._queue.put(query, timeout=self._max_enqueue_wait_s)
+            except queue.Full:
+                self.stats.dropped += 1
+                logger.warning(
+                    f"Query hook queue is full; dropped query to {query.request.url} ({self.stats.dropped} dropped so far)"
+                )
+                return False
+        self.stats.submitted += 1
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Number of queries waiting to be processed by hooks."""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout_s: Optional[float] = None) -> bool:
+        """Wait until all submitted queries have been processed by hooks.
+
+        Returns:
+            True if all queries were processed, False if timeout_s elapsed first.
+        """
+        # Poll rather than wait on the queue's internal condition, which is not available when gevent has patched
+        # the queue module (as in mock_uss)
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(FLUSH_POLL_INTERVAL_S)
+        return True
+
 
 query_hooks: List[QueryHook] = []
 
+query_hook_dispatcher = QueryHookDispatcher(query_hooks)
+
 
 def call_query_hooks(query: Query) -> None:
-    for hook in query_hooks:
-        hook.on_query(query=query)
+    """Pass the query to all registered query_hooks (asynchronously, via query_hook_dispatcher)."""
+    query_hook_dispatcher.submit(query)
+
+
+@atexit.register
+def _flush_query_hooks() -> None:
+    if query_hook_dispatcher.pending and not query_hook_dispatcher.flush(timeout_s=5):
+        logger.warning(
+            f"{query_hook_dispatcher.pending} queries were not processed by query hooks before exit"
+        )
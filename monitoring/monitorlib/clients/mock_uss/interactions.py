@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 import yaml
 from implicitdict import ImplicitDict
@@ -48,3 +48,9 @@ yaml.add_representer(Interaction, Representer.represent_dict)
 
 class ListLogsResponse(ImplicitDict):
     interactions: List[Interaction]
+
+    last_sequence: Optional[int] = None
+    """Sequence number of the most recently logged interaction at the time of the request (regardless of filters).
+
+    Provide this value as the `after_sequence` parameter of a subsequent request to retrieve only interactions logged
+    after this request."""
@@ -0,0 +1,105 @@
+import threading
+import time
+from datetime import datetime, UTC
+
+from implicitdict import StringBasedDateTime
+
+from monitoring.monitorlib.clients import QueryHook, QueryHookDispatcher
+from monitoring.monitorlib.fetch import Query, RequestDescription, ResponseDescription
+
+
+def _query(url: str) -> Query:
+    return Query(
+        request=RequestDescription(
+            method="GET",
+            url=url,
+            initiated_at=StringBasedDateTime(datetime.now(UTC)),
+        ),
+        response=ResponseDescription(
+            code=200, elapsed_s=0, reported=StringBasedDateTime(datetime.now(UTC))
+        ),
+    )
+
+
+class _RecordingHook(QueryHook):
+    def __init__(self, delay_s: float = 0, release: threading.Event = None):
+        self.urls = []
+        self.threads = set()
+        self._delay_s = delay_s
+        self._release = release
+
+    def on_query(self, query: Query) -> None:
+        if self._release:
+            self._release.wait()
+        time.sleep(self._delay_s)
+        self.threads.add(threading.current_thread().name)
+        self.urls.append(query.request.url)
+
+
+def test_hooks_run_off_the_calling_thread():
+    hook = _RecordingHook(delay_s=0.05)
+    dispatcher = QueryHookDispatcher([hook])
+
+    t0 = time.monotonic()
+    for i in range(5):
+        assert dispatcher.submit(_query(f"https://uss.example.com/{i}"))
+    assert time.monotonic() - t0 < 0.05
+
+    assert dispatcher.flush(timeout_s=5)
+    assert hook.urls == [f"https://uss.example.com/{i}" for i in range(5)]
+    assert threading.current_thread().name not in hook.threads
+    assert dispatcher.stats.submitted == dispatcher.stats.processed == 5
+
+
+def test_full_queue_drops_queries():
+    release = threading.Event()
+    hook = _RecordingHook(release=release)
+    dispatcher = QueryHookDispatcher([hook], max_queue_size=2, max_enqueue_wait_s=0)
+
+    results = [
+        dispatcher.submit(_query(f"https://uss.example.com/{i}")) for i in range(6)
+    ]
+    release.set()
+    assert dispatcher.flush(timeout_s=5)
+
+    # One query may be held by the worker while two more wait in the queue
+    assert results[:2] == [True, True]
+    assert dispatcher.stats.dropped == results.count(False) >= 3
+    assert len(hook.urls) == dispatcher.stats.processed == results.count(True)
+
+
+def test_hook_errors_are_contained():
+    class _FailingHook(QueryHook):
+        def on_query(self, query: Query) -> None:
+            raise RuntimeError("hook failure")
+
+    hook = _RecordingHook()
+    dispatcher = QueryHookDispatcher([_FailingHook(), hook])
+
+    dispatcher.submit(_query("https://uss.example.com/"))
+    assert dispatcher.flush(timeout_s=5)
+    assert dispatcher.stats.hook_errors == 1
+    assert hook.urls == ["https://uss.example.com/"]
+
+
+def test_submission_hooks_run_on_the_calling_thread():
+    class _SubmissionHook(_RecordingHook):
+        def __init__(self):
+            super().__init__()
+            self.submitted = []
+
+        def on_query_submitted(self, query: Query) -> None:
+            self.submitted.append(
+                (threading.current_thread().name, query.request.url, len(self.urls))
+            )
+
+    hook = _SubmissionHook()
+    dispatcher = QueryHookDispatcher([hook])
+    dispatcher.submit(_query("https://uss.example.com/"))
+
+    # Submission hooks complete before submit returns, before on_query is called
+    assert hook.submitted == [
+        (threading.current_thread().name, "https://uss.example.com/", 0)
+    ]
+    assert dispatcher.flush(timeout_s=5)
+    assert hook.urls == ["https://uss.example.com/"]
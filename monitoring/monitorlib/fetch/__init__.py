@@ -1,4 +1,5 @@
 import datetime
+import hashlib
 import json
 import os
 import traceback
@@ -17,7 +18,7 @@ from implicitdict import ImplicitDict, StringBasedDateTime
 from loguru import logger
 from yaml.representer import Representer
 
-from monitoring.monitorlib import infrastructure
+from monitoring.monitorlib import infrastructure, rate_limiting
 from monitoring.monitorlib.errors import stacktrace_string
 from monitoring.monitorlib.rid import RIDVersion
 
@@ -424,6 +425,16 @@ class QueryType(str, Enum):
 ResponseType = TypeVar("ResponseType", bound=ImplicitDict)
 
 
+def content_digest(content) -> str:
+    """Compute a digest of JSON-serializable content that does not depend on the order of dict keys.
+
+    Two pieces of content with the same digest may be considered to have the same content.
+    """
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
 class Query(ImplicitDict):
     request: RequestDescription
     response: ResponseDescription
@@ -567,6 +578,16 @@ def describe_query(
     return query
 
 
+def _send(client: requests.Session, verb: str, url: str, **kwargs) -> requests.Response:
+    if isinstance(client, infrastructure.UTMClientSession):
+        # UTMClientSession applies per-host rate limiting itself
+        return client.request(verb, url, **kwargs)
+    with rate_limiting.request_slot(url) as slot:
+        resp = client.request(verb, url, **kwargs)
+        slot.report(resp.status_code, resp.headers)
+    return resp
+
+
 def query_and_describe(
     client: Optional[infrastructure.UTMClientSession],
     verb: str,
@@ -624,7 +645,7 @@ def query_and_describe(
         t0 = datetime.datetime.now(datetime.UTC)
         try:
             return describe_query(
-                client.request(verb, url, **req_kwargs),
+                _send(client, verb, url, **req_kwargs),
                 t0,
                 query_type=query_type,
                 participant_id=participant_id,
@@ -873,22 +873,21 @@ class FetchedISAs(RIDQuery):
             return {}
         return {isa.flights_url: isa.owner for _, isa in self.isas.items()}
 
+    @property
+    def content_digest(self) -> str:
+        """Digest of the content of this result; results with the same content have the same digest."""
+        return fetch.content_digest(
+            {
+                "rid_version": self.rid_version,
+                "errors": self.errors,
+                "response": self.query.response.json if self.success else None,
+            }
+        )
+
     def has_different_content_than(self, other: Any) -> bool:
         if not isinstance(other, FetchedISAs):
             return True
-        if self.errors != other.errors:
-            return True
-        if self.rid_version != other.rid_version:
-            return True
-
-        if self.rid_version == RIDVersion.f3411_19:
-            return self._v19_response != other._v19_response
-        elif self.rid_version == RIDVersion.f3411_22a:
-            return self._v22a_response != other._v22a_response
-        else:
-            raise NotImplementedError(
-                f"Cannot compare ISAs using RID version {self.rid_version}"
-            )
+        return self.content_digest != other.content_digest
 
 
 def isas(
@@ -61,21 +61,20 @@ class FetchedEntityReferences(fetch.Query):
             return {}
         return {e["id"]: e for e in self.json_result.get(self.entity_type, [])}
 
+    @property
+    def content_digest(self) -> str:
+        """Digest of the content of this result; results with the same content have the same digest."""
+        return fetch.content_digest(
+            {
+                "error": self.error,
+                "references": self.references_by_id if self.success else None,
+            }
+        )
+
     def has_different_content_than(self, other):
         if not isinstance(other, FetchedEntityReferences):
             return True
-        if self.error != other.error:
-            return True
-        if self.success:
-            my_refs = self.references_by_id
-            other_refs = other.references_by_id
-            for id in other_refs:
-                if id not in my_refs:
-                    return True
-            for id, r in my_refs.items():
-                if id not in other_refs or r != other_refs[id]:
-                    return True
-        return False
+        return self.content_digest != other.content_digest
 
 
 yaml.add_representer(FetchedEntityReferences, Representer.represent_dict)
@@ -169,17 +168,19 @@ class FetchedEntity(fetch.Query):
             return prefix + "did not contain details field"
         return None
 
+    @property
+    def content_digest(self) -> str:
+        """Digest of the content of this result; results with the same content have the same digest."""
+        if self.success:
+            content = {"reference": self.reference, "details": self.details}
+        else:
+            content = {"error": self.error}
+        return fetch.content_digest(content)
+
     def has_different_content_than(self, other):
         if not isinstance(other, FetchedEntity):
             return True
-        if self.success != other.success:
-            return True
-        if self.success:
-            if self.reference != other.reference or self.details != other.details:
-                return True
-            return False
-        else:
-            return self.error != other.error
+        return self.content_digest != other.content_digest
 
 
 yaml.add_representer(FetchedEntity, Representer.represent_dict)
@@ -242,24 +243,26 @@ class FetchedEntities(ImplicitDict):
     def cached_entities_by_id(self) -> Dict[str, FetchedEntity]:
         return self.cached_uss_queries
 
+    @property
+    def entity_digests(self) -> Dict[str, str]:
+        """Content digest of each entity, by entity ID."""
+        return {id: e.content_digest for id, e in self.entities_by_id.items()}
+
+    @property
+    def content_digest(self) -> str:
+        """Digest of the content of this result; results with the same content have the same digest."""
+        return fetch.content_digest(
+            {
+                "success": self.success,
+                "dss_query": self.dss_query.content_digest,
+                "entities": self.entity_digests,
+            }
+        )
+
     def has_different_content_than(self, other):
         if not isinstance(other, FetchedEntities):
             return True
-        if self.success != other.success:
-            return True
-        if self.dss_query.has_different_content_than(other.dss_query):
-            return True
-
-        my_entities = self.entities_by_id
-        other_entities = other.entities_by_id
-        for id, entity in my_entities.items():
-            if id not in other_entities or entity.has_different_content_than(
-                other_entities[id]
-            ):
-                return True
-        for id in other_entities:
-            if id not in my_entities:
-                return True
+        return self.content_digest != other.content_digest
 
 
 yaml.add_representer(FetchedEntities, Representer.represent_dict)
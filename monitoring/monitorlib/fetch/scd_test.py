@@ -0,0 +1,62 @@
+from datetime import datetime, UTC
+
+from implicitdict import StringBasedDateTime
+
+from monitoring.monitorlib.fetch import Query, RequestDescription, ResponseDescription
+from monitoring.monitorlib.fetch.scd import (
+    FetchedEntities,
+    FetchedEntity,
+    FetchedEntityReferences,
+)
+
+
+def _query(json: dict) -> Query:
+    t = StringBasedDateTime(datetime(2024, 1, 1, tzinfo=UTC))
+    return Query(
+        request=RequestDescription(method="GET", url="https://dss", initiated_at=t),
+        response=ResponseDescription(code=200, json=json, elapsed_s=0, reported=t),
+    )
+
+
+def _entities(details: dict, cached: bool = False) -> FetchedEntities:
+    refs = FetchedEntityReferences(
+        _query(
+            {
+                "operational_intent_references": [
+                    {"id": "op1", "manager": "uss1", "uss_base_url": "https://uss1"}
+                ]
+            }
+        )
+    )
+    refs.entity_type = "operational_intent_references"
+    entity = FetchedEntity(
+        _query({"operational_intent": {"reference": {"id": "op1"}, "details": details}})
+    )
+    entity.id_requested = "op1"
+    entity.entity_type = "operational_intent"
+    queries = {"op1": entity}
+    return FetchedEntities(
+        dss_query=refs,
+        uss_queries={} if cached else queries,
+        cached_uss_queries=queries if cached else {},
+    )
+
+
+def test_content_digest():
+    a = _entities({"priority": 0, "volumes": []})
+    assert not a.has_different_content_than(
+        _entities({"volumes": [], "priority": 0}, cached=True)
+    )
+    assert a.has_different_content_than(_entities({"priority": 1, "volumes": []}))
+    assert a.has_different_content_than(None)
+    assert "_content_digest" not in str(a)
+
+
+def test_content_digest_reflects_later_changes():
+    entity = FetchedEntity(
+        _query({"operational_intent": {"reference": {"id": "op1"}, "details": {}}})
+    )
+    digest_before_type = entity.content_digest
+    entity.entity_type = "operational_intent"
+    assert entity.success
+    assert entity.content_digest != digest_before_type
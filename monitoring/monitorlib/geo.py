@@ -2,14 +2,11 @@ from __future__ import annotations
 import math
 from enum import Enum
 import os
-from typing import List, Tuple, Union, Optional
+from typing import List, Tuple, Union, Optional, TYPE_CHECKING
 
 from implicitdict import ImplicitDict
-import numpy as np
 import s2sphere
 from s2sphere import LatLng
-from scipy.interpolate import RectBivariateSpline as Spline
-import shapely.geometry
 
 from monitoring.monitorlib.transformations import (
     Transformation,
@@ -27,6 +24,10 @@ from uas_standards.interuss.automated_testing.geospatial_map.v1 import (
     api as geospatial_map_api,
 )
 
+if TYPE_CHECKING:
+    # numpy, scipy, and shapely are slow to import, so they are only imported when first needed
+    from scipy.interpolate import RectBivariateSpline as Spline
+
 EARTH_CIRCUMFERENCE_KM = 40075
 EARTH_CIRCUMFERENCE_M = EARTH_CIRCUMFERENCE_KM * 1000
 EARTH_RADIUS_M = 40075 * 1000 / (2 * math.pi)
@@ -253,6 +254,8 @@ class Volume3D(ImplicitDict):
         return self.altitude_upper.value
 
     def intersects_vol3(self, vol3_2: Volume3D) -> bool:
+        import shapely.geometry
+
         vol3_1 = self
         if vol3_1.altitude_upper.value < vol3_2.altitude_lower.value:
             return False
@@ -613,6 +616,9 @@ def egm96_geoid_offset(p: s2sphere.LatLng) -> float:
     """
     global _egm96
     if _egm96 is None:
+        import numpy as np
+        from scipy.interpolate import RectBivariateSpline as Spline
+
         grid_size = 0.25  # degrees
         # Latitude data is [90, -90] degrees
         lats = np.arange(-90, 90 + grid_size / 2, grid_size)
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from typing import List, Tuple
 
 from s2sphere import LatLng
@@ -66,3 +68,16 @@ def test_generate_area_in_vicinity():
         generate_area_in_vicinity(_points([(-1, -1), (0, -1), (0, 0), (-1, 0)]), 2),
         _points([(-2.0, -2.0), (-2.0, -2.5), (-2.5, -2.5), (-2.5, -2.0)]),
     )
+
+
+def test_heavy_dependencies_deferred():
+    # Use a fresh interpreter since other tests may have already imported these dependencies
+    script = (
+        "import sys\n"
+        "import monitoring.monitorlib.geo, monitoring.monitorlib.temporal, monitoring.monitorlib.kml.generation\n"
+        "print(','.join(m for m in ('numpy', 'scipy', 'shapely', 'pandas', 'pvlib') if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
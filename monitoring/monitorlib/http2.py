@@ -0,0 +1,139 @@
+"""HTTP/2 transport for `requests` sessions.
+
+HTTP2Adapter can be mounted on any requests.Session (UTMClientSession uses a
+process-wide instance when HTTP/2 is enabled) so that concurrent requests to the
+same host are multiplexed over a single connection rather than each occupying a
+connection of its own.  Responses are converted back into requests.Response
+objects, so everything downstream (including Query descriptions) is unaffected.
+"""
+
+import os
+import ssl
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MAX_CONNECTIONS_PER_CLIENT = 100
+"""Maximum number of connections (across all hosts) held by each underlying HTTP/2 client."""
+
+
+def _to_httpx_verify(verify: Union[bool, str]) -> Union[bool, ssl.SSLContext]:
+    if isinstance(verify, str):
+        if os.path.isdir(verify):
+            return ssl.create_default_context(capath=verify)
+        return ssl.create_default_context(cafile=verify)
+    return verify
+
+
+def _to_httpx_timeout(
+    timeout: Union[None, float, Tuple[Optional[float], Optional[float]]]
+) -> httpx.Timeout:
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(connect=connect, read=read, write=read, pool=read)
+    return httpx.Timeout(timeout)
+
+
+class HTTP2Adapter(BaseAdapter):
+    """requests transport adapter that sends requests using HTTP/2 (via httpx) when the server supports it.
+
+    Over TLS, HTTP/2 is negotiated with ALPN and HTTP/1.1 is used if the server
+    does not support HTTP/2.  Cleartext (http://) requests use HTTP/1.1 unless
+    http1 is False, in which case HTTP/2 is assumed with prior knowledge (h2c).
+    """
+
+    def __init__(self, http1: bool = True):
+        super().__init__()
+        self._http1 = http1
+        self._clients: Dict[Tuple, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, verify, cert) -> httpx.Client:
+        key = (
+            verify if isinstance(verify, (bool, str)) else True,
+            tuple(cert) if isinstance(cert, (list, tuple)) else cert,
+        )
+        client = self._clients.get(key, None)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key, None)
+                if client is None:
+                    client = httpx.Client(
+                        http1=self._http1,
+                        http2=True,
+                        verify=_to_httpx_verify(key[0]),
+                        cert=key[1],
+                        limits=httpx.Limits(max_connections=MAX_CONNECTIONS_PER_CLIENT),
+                    )
+                    self._clients[key] = client
+        return client
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> requests.Response:
+        client = self._client(verify, cert)
+        try:
+            resp = client.request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=request.body,
+                timeout=_to_httpx_timeout(timeout),
+            )
+        except httpx.ConnectTimeout as e:
+            raise requests.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.ReadTimeout(e, request=request)
+        except httpx.RemoteProtocolError as e:
+            # Surfaced the same way as urllib3's RemoteDisconnected so that callers treat it as retryable
+            raise requests.ConnectionError(
+                f"RemoteDisconnected: {str(e)}", request=request
+            )
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+        except httpx.HTTPError as e:
+            raise requests.RequestException(e, request=request)
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = CaseInsensitiveDict(resp.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = resp.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = resp.elapsed
+        response._content = resp.content
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+_shared_adapter: Optional[HTTP2Adapter] = None
+_shared_adapter_lock = threading.Lock()
+
+
+def shared_adapter() -> HTTP2Adapter:
+    """HTTP2Adapter shared by all sessions in this process, so each host is reached over as few connections as possible."""
+    global _shared_adapter
+    if _shared_adapter is None:
+        with _shared_adapter_lock:
+            if _shared_adapter is None:
+                _shared_adapter = HTTP2Adapter()
+    return _shared_adapter
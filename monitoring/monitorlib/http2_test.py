@@ -0,0 +1,118 @@
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import h2.config
+import h2.connection
+import h2.events
+import requests
+
+from monitoring.monitorlib.fetch import query_and_describe
+from monitoring.monitorlib.http2 import HTTP2Adapter
+
+
+class _H2Server(object):
+    """Minimal cleartext (prior knowledge) HTTP/2 server echoing each request as JSON."""
+
+    def __init__(self):
+        self.connections_accepted = 0
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen()
+        self.base_url = f"http://127.0.0.1:{self._socket.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            sock, _ = self._socket.accept()
+            self.connections_accepted += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock: socket.socket):
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        streams = {}
+        while True:
+            data = sock.recv(65535)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    streams[event.stream_id] = {
+                        "headers": {k.decode(): v.decode() for k, v in event.headers},
+                        "body": b"",
+                    }
+                elif isinstance(event, h2.events.DataReceived):
+                    streams[event.stream_id]["body"] += event.data
+                    conn.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, h2.events.StreamEnded):
+                    request = streams.pop(event.stream_id)
+                    body = json.dumps(
+                        {
+                            "method": request["headers"][":method"],
+                            "path": request["headers"][":path"],
+                            "received": request["body"].decode("utf-8"),
+                        }
+                    ).encode("utf-8")
+                    conn.send_headers(
+                        event.stream_id,
+                        [
+                            (":status", "200"),
+                            ("content-type", "application/json"),
+                            ("content-length", str(len(body))),
+                        ],
+                    )
+                    conn.send_data(event.stream_id, body, end_stream=True)
+            sock.sendall(conn.data_to_send())
+
+
+def _session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTP2Adapter(http1=False)
+    session.mount("http://", adapter)
+    return session
+
+
+def test_query_over_http2():
+    server = _H2Server()
+    session = _session()
+
+    query = query_and_describe(
+        session, "PUT", f"{server.base_url}/foo?bar=baz", json={"request_id": "abc"}
+    )
+
+    assert query.status_code == 200
+    assert query.response.json == {
+        "method": "PUT",
+        "path": "/foo?bar=baz",
+        "received": '{"request_id": "abc"}',
+    }
+    assert query.request.json == {"request_id": "abc"}
+    assert query.response.headers["content-type"] == "application/json"
+    assert query.response.elapsed_s >= 0
+
+
+def test_concurrent_requests_share_connection():
+    server = _H2Server()
+    session = _session()
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        queries = list(
+            executor.map(
+                lambda i: query_and_describe(
+                    session, "GET", f"{server.base_url}/item/{i}"
+                ),
+                range(30),
+            )
+        )
+
+    assert [q.response.json["path"] for q in queries] == [
+        f"/item/{i}" for i in range(30)
+    ]
+    assert server.connections_accepted == 1
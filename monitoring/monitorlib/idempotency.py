@@ -1,5 +1,8 @@
 import base64
 import hashlib
+import time
+from dataclasses import dataclass
+from datetime import timedelta
 from functools import wraps
 import json
 from typing import Callable, Optional, Dict
@@ -15,6 +18,9 @@ from monitoring.monitorlib.multiprocessing import SynchronizedValue
 _max_request_buffer_size = int(10e6)
 """Number of bytes to dedicate to caching responses"""
 
+DEFAULT_TTL = timedelta(hours=1)
+"""Default amount of time a cached response may be used to fulfill a repeated request"""
+
 
 class Response(ImplicitDict):
     """Information about a previously-returned response.
@@ -28,35 +34,102 @@ class Response(ImplicitDict):
     timestamp: StringBasedDateTime
 
 
-def _get_responses(raw: bytes) -> Dict[str, Response]:
-    return json.loads(raw.decode("utf-8"))
+@dataclass
+class IdempotencyCacheStats:
+    hits: int = 0
+    """Number of requests fulfilled with a cached response."""
+
+    misses: int = 0
+    """Number of requests for which no cached response was available."""
+
+    evictions: int = 0
+    """Number of cached responses removed to make room for newer responses."""
+
+    expirations: int = 0
+    """Number of cached responses removed because they were older than the TTL."""
+
+
+class IdempotencyCache(object):
+    """Responses to recent requests, shared across processes.
+
+    Entries are kept in insertion order, each with its response already
+    serialized, so finding the oldest entry to evict is O(1) and a lookup only
+    parses the response being looked up.  The encoded size of each entry is
+    tracked so entries can be evicted without re-serializing the cache.
+
+    Statistics are per-process.
+    """
+
+    ENCODING_OVERHEAD_BYTES = 64
+    """Bytes reserved for the JSON structure around the entries."""
+
+    stats: IdempotencyCacheStats
+
+    def __init__(
+        self,
+        capacity_bytes: int = _max_request_buffer_size,
+        ttl: timedelta = DEFAULT_TTL,
+    ):
+        self._capacity_bytes = capacity_bytes
+        self._ttl_s = ttl.total_seconds()
+        # entries: request ID -> [expiration (seconds since epoch), serialized Response]
+        self._cache = SynchronizedValue(
+            {"entries": {}, "size_bytes": 0}, capacity_bytes=capacity_bytes
+        )
+        self.stats = IdempotencyCacheStats()
+
+    def get(self, request_id: str) -> Optional[dict]:
+        """Retrieve the cached Response (as a plain dict) for the specified request, if available."""
+        entry = self._cache.value["entries"].get(request_id, None)
+        if entry is None or entry[0] < time.time():
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(entry[1])
+
+    def put(self, request_id: str, response: dict) -> None:
+        """Cache the Response (as a plain dict) to the specified request."""
+        entry = [time.time() + self._ttl_s, json.dumps(response)]
+        entry_size = _entry_size(request_id, entry)
+        max_size = self._capacity_bytes - self.ENCODING_OVERHEAD_BYTES
+        if entry_size > max_size:
+            logger.warning(
+                f"Not caching response to request {request_id} as its size ({entry_size} bytes) exceeds the cache capacity"
+            )
+            return
+
+        with self._cache as cache:
+            entries: Dict[str, list] = cache["entries"]
+            if request_id in entries:
+                cache["size_bytes"] -= _entry_size(request_id, entries.pop(request_id))
+
+            # Entries are in insertion order, so expired entries and eviction candidates are at the front
+            now = time.time()
+            while entries:
+                oldest_id, oldest_entry = next(iter(entries.items()))
+                if oldest_entry[0] < now:
+                    self.stats.expirations += 1
+                elif cache["size_bytes"] + entry_size > max_size:
+                    self.stats.evictions += 1
+                else:
+                    break
+                del entries[oldest_id]
+                cache["size_bytes"] -= _entry_size(oldest_id, oldest_entry)
 
+            entries[request_id] = entry
+            cache["size_bytes"] += entry_size
 
-def _set_responses(responses: Dict[str, Response]) -> bytes:
-    while True:
-        s = json.dumps(responses)
-        if len(s) <= _max_request_buffer_size:
-            break
+    def __len__(self) -> int:
+        return len(self._cache.value["entries"])
 
-        # Remove oldest cached response
-        oldest_id = None
-        oldest_timestamp = None
-        for request_id, response in responses.items():
-            t = arrow.get(response["timestamp"])
-            if oldest_timestamp is None or t < oldest_timestamp:
-                oldest_id = request_id
-                oldest_timestamp = t
 
-        del responses[oldest_id]
-    return s.encode("utf-8")
+def _entry_size(request_id: str, entry: list) -> int:
+    # Size of '"<request_id>": [<expiration>, "<serialized response>"], ' when encoded
+    return len(json.dumps(request_id)) + len(json.dumps(entry)) + 4
 
 
-_fulfilled_requests = SynchronizedValue(
-    {},
-    decoder=_get_responses,
-    encoder=_set_responses,
-    capacity_bytes=_max_request_buffer_size,
-)
+response_cache = IdempotencyCache()
+"""Cache of responses shared by all idempotent_request handlers."""
 
 
 def get_hashed_request_id() -> Optional[str]:
@@ -90,8 +163,8 @@ def idempotent_request(get_request_id: Optional[Callable[[], Optional[str]]] = N
         def wrapper(*args, **kwargs):
             request_id = get_request_id()
 
-            cached_requests = _fulfilled_requests.value
-            if request_id in cached_requests:
+            response = response_cache.get(request_id)
+            if response is not None:
                 endpoint = (
                     flask.request.url_rule.rule
                     if flask.request.url_rule is not None
@@ -103,7 +176,6 @@ def idempotent_request(get_request_id: Optional[Callable[[], Optional[str]]] = N
                     endpoint,
                     request_id,
                 )
-                response = cached_requests[request_id]
                 if response["body"] is not None:
                     return response["body"], response["code"]
                 else:
@@ -148,8 +220,7 @@ def idempotent_request(get_request_id: Optional[Callable[[], Optional[str]]] = N
                     f"Unable to cache Flask view handler result of type '{type(result).__name__}'"
                 )
 
-            with _fulfilled_requests as cached_requests:
-                cached_requests[request_id] = response
+            response_cache.put(request_id, response)
 
             return to_return
 
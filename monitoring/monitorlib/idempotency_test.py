@@ -0,0 +1,68 @@
+import time
+from datetime import timedelta
+
+import flask
+
+from monitoring.monitorlib import idempotency
+from monitoring.monitorlib.idempotency import IdempotencyCache, idempotent_request
+
+
+def _response(i: int) -> dict:
+    return {
+        "timestamp": "2024-01-01T00:00:00Z",
+        "code": 200,
+        "body": None,
+        "json": {"i": i},
+    }
+
+
+def test_oldest_entries_evicted():
+    cache = IdempotencyCache(capacity_bytes=2000)
+
+    for i in range(100):
+        cache.put(f"request{i}", _response(i))
+
+    assert 0 < len(cache) < 100
+    assert cache.stats.evictions == 100 - len(cache)
+    assert cache.get("request0") is None
+    assert cache.get("request99") == _response(99)
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
+
+    # Replacing an entry moves it to the back of the eviction order
+    oldest = f"request{100 - len(cache)}"
+    cache.put(oldest, _response(-1))
+    cache.put("request100", _response(100))
+    assert cache.get(oldest) == _response(-1)
+
+
+def test_expired_entries_not_used():
+    cache = IdempotencyCache(ttl=timedelta(seconds=0.1))
+
+    cache.put("request", _response(0))
+    assert cache.get("request") == _response(0)
+    time.sleep(0.15)
+    assert cache.get("request") is None
+
+    cache.put("other_request", _response(1))
+    assert cache.stats.expirations == 1
+    assert len(cache) == 1
+
+
+def test_idempotent_request(monkeypatch):
+    monkeypatch.setattr(idempotency, "response_cache", IdempotencyCache())
+    app = flask.Flask(__name__)
+    calls = []
+
+    @app.route("/resource", methods=["PUT"])
+    @idempotent_request()
+    def put_resource():
+        calls.append(flask.request.json)
+        return flask.jsonify({"n": len(calls)}), 201
+
+    client = app.test_client()
+    for _ in range(3):
+        resp = client.put("/resource", json={"value": 1})
+        assert resp.status_code == 201 and resp.json == {"n": 1}
+    assert client.put("/resource", json={"value": 2}).json == {"n": 2}
+    assert len(calls) == 2
+    assert idempotency.response_cache.stats.hits == 2
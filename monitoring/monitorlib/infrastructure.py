@@ -1,14 +1,16 @@
 import asyncio
 import datetime
 import functools
+from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional
 import urllib.parse
-from aiohttp import ClientSession, ClientResponse
 
 import jwt
 import requests
 
+from monitoring.monitorlib import rate_limiting
+
 ALL_SCOPES = [
     "dss.write.identification_service_areas",
     "dss.read.identification_service_areas",
@@ -27,6 +29,16 @@ AuthSpec = str
 """Specification for means by which to obtain access tokens."""
 
 
+@dataclass
+class TransportSettings:
+    http2: bool = False
+    """Whether UTMClientSessions should, by default, multiplex requests to each host over a shared HTTP/2 connection (when the host supports it)."""
+
+
+transport_settings = TransportSettings()
+"""Singleton transport settings for UTMClientSessions"""
+
+
 class AuthAdapter(object):
     """Base class for an adapter that add JWTs to requests."""
 
@@ -80,6 +92,13 @@ class UTMClientSession(requests.Session):
     If the URL starts with '/', then automatically prefix the URL with the
     `prefix_url` specified on construction (this is usually the base URL of the
     DSS).
+
+    Requests wait for a slot from the per-host limiter (see rate_limiting) before
+    being sent.
+
+    If `http2` is True (or `transport_settings.http2` is True when `http2` is not
+    specified), requests are sent with the process-wide HTTP/2 transport so that
+    concurrent requests to the same host share one connection.
     """
 
     def __init__(
@@ -87,6 +106,7 @@ class UTMClientSession(requests.Session):
         prefix_url: str,
         auth_adapter: Optional[AuthAdapter] = None,
         timeout_seconds: Optional[float] = None,
+        http2: Optional[bool] = None,
     ):
         super().__init__()
 
@@ -94,6 +114,15 @@ class UTMClientSession(requests.Session):
         self.auth_adapter = auth_adapter
         self.default_scopes = None
         self.timeout_seconds = timeout_seconds or CLIENT_TIMEOUT
+        self.http2 = http2
+
+    # Overrides method on requests.Session
+    def get_adapter(self, url):
+        if self.http2 if self.http2 is not None else transport_settings.http2:
+            from monitoring.monitorlib.http2 import shared_adapter
+
+            return shared_adapter()
+        return super().get_adapter(url)
 
     # Overrides method on requests.Session
     def prepare_request(self, request, **kwargs):
@@ -131,7 +160,11 @@ class UTMClientSession(requests.Session):
         if "auth" not in kwargs:
             kwargs = self.adjust_request_kwargs(kwargs)
 
-        return super().request(method, url, **kwargs)
+        full_url = self._prefix_url + url if url.startswith("/") else url
+        with rate_limiting.request_slot(full_url) as slot:
+            resp = super().request(method, url, **kwargs)
+            slot.report(resp.status_code, resp.headers)
+        return resp
 
     def get_prefix_url(self):
         return self._prefix_url
@@ -160,6 +193,9 @@ class AsyncUTMTestSession:
         self.timeout_seconds = timeout_seconds or CLIENT_TIMEOUT
 
     async def build_session(self):
+        # aiohttp is slow to import and only needed by this session type
+        from aiohttp import ClientSession
+
         self._client = ClientSession()
 
     def close(self):
@@ -197,48 +233,56 @@ class AsyncUTMTestSession:
         url = self._prefix_url + url
         if "auth" not in kwargs:
             kwargs = self.adjust_request_kwargs(url, "PUT", kwargs)
-        async with self._client.put(url, **kwargs) as response:
-            return (
-                response.status,
-                {k: v for k, v in response.headers.items()},
-                await response.json(),
-            )
+        async with rate_limiting.async_request_slot(url) as slot:
+            async with self._client.put(url, **kwargs) as response:
+                slot.report(response.status, response.headers)
+                return (
+                    response.status,
+                    {k: v for k, v in response.headers.items()},
+                    await response.json(),
+                )
 
     async def get(self, url, **kwargs):
         """Returns (status, headers, json)"""
         url = self._prefix_url + url
         if "auth" not in kwargs:
             kwargs = self.adjust_request_kwargs(url, "GET", kwargs)
-        async with self._client.get(url, **kwargs) as response:
-            return (
-                response.status,
-                {k: v for k, v in response.headers.items()},
-                await response.json(),
-            )
+        async with rate_limiting.async_request_slot(url) as slot:
+            async with self._client.get(url, **kwargs) as response:
+                slot.report(response.status, response.headers)
+                return (
+                    response.status,
+                    {k: v for k, v in response.headers.items()},
+                    await response.json(),
+                )
 
     async def post(self, url, **kwargs):
         """Returns (status, headers, json)"""
         url = self._prefix_url + url
         if "auth" not in kwargs:
             kwargs = self.adjust_request_kwargs(url, "POST", kwargs)
-        async with self._client.post(url, **kwargs) as response:
-            return (
-                response.status,
-                {k: v for k, v in response.headers.items()},
-                await response.json(),
-            )
+        async with rate_limiting.async_request_slot(url) as slot:
+            async with self._client.post(url, **kwargs) as response:
+                slot.report(response.status, response.headers)
+                return (
+                    response.status,
+                    {k: v for k, v in response.headers.items()},
+                    await response.json(),
+                )
 
     async def delete(self, url, **kwargs):
         """Returns (status, headers, json)"""
         url = self._prefix_url + url
         if "auth" not in kwargs:
             kwargs = self.adjust_request_kwargs(url, "DELETE", kwargs)
-        async with self._client.delete(url, **kwargs) as response:
-            return (
-                response.status,
-                {k: v for k, v in response.headers.items()},
-                await response.json(),
-            )
+        async with rate_limiting.async_request_slot(url) as slot:
+            async with self._client.delete(url, **kwargs) as response:
+                slot.report(response.status, response.headers)
+                return (
+                    response.status,
+                    {k: v for k, v in response.headers.items()},
+                    await response.json(),
+                )
 
 
 def default_scopes(scopes: List[str]):
@@ -17,9 +17,29 @@ def import_submodules(module) -> None:
         importlib.import_module(module_name)
 
 
+def _import_submodule(module, name: str) -> None:
+    """Import the submodule with the specified name of module, if module is a package containing such a submodule."""
+    if not inspect.ismodule(module) or not hasattr(module, "__path__"):
+        return
+    submodule_name = module.__name__ + "." + name
+    try:
+        importlib.import_module(submodule_name)
+    except ModuleNotFoundError as e:
+        if e.name != submodule_name:
+            # The submodule exists but failed to import one of its own dependencies
+            raise
+
+
 def get_module_object_by_name(parent_module, object_name: str):
+    """Locate the object with the specified dotted name relative to parent_module.
+
+    Only the modules along the object's name are imported (as needed), so it is not necessary to import all
+    descendant modules of parent_module beforehand.
+    """
     module_object = parent_module
     for component in object_name.split("."):
+        if not hasattr(module_object, component):
+            _import_submodule(module_object, component)
         if not hasattr(module_object, component):
             raise ValueError(
                 "Could not find component {} defined in {} while trying to locate {}".format(
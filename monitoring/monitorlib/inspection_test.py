@@ -0,0 +1,17 @@
+import sys
+
+import pytest
+
+from monitoring import uss_qualifier as uss_qualifier_module
+from monitoring.monitorlib.inspection import get_module_object_by_name
+
+
+def test_get_module_object_by_name_imports_only_needed_modules():
+    noop = get_module_object_by_name(uss_qualifier_module, "scenarios.dev.NoOp")
+    assert noop.__name__ == "NoOp"
+    assert "monitoring.uss_qualifier.scenarios.dev.noop" in sys.modules
+
+    with pytest.raises(ValueError):
+        get_module_object_by_name(uss_qualifier_module, "scenarios.dev.Nonexistent")
+    with pytest.raises(ValueError):
+        get_module_object_by_name(uss_qualifier_module, "scenarios.nonexistent.NoOp")
@@ -0,0 +1,301 @@
+"""Per-host concurrency and rate limits shared by all outgoing queries in this process.
+
+By default, no limits are applied.  Limits are enabled by calling `configure`,
+after which every UTMClientSession, AsyncUTMTestSession, and
+`fetch.query_and_describe` call will wait for a slot from the limiter of the host
+it is querying before sending its request.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+ASYNC_POLL_INTERVAL_S = 0.01
+"""Maximum number of seconds an asyncio waiter sleeps before checking a host limiter again."""
+
+MAX_RETRY_AFTER_S = 60
+"""Maximum number of seconds a Retry-After header may pause requests to a host."""
+
+BACKOFF_STATUS_CODES = {429, 503}
+"""Response status codes indicating that the server would like clients to slow down."""
+
+
+@dataclass
+class HostLimitSettings:
+    max_concurrent_requests: Optional[int] = None
+    """Maximum number of requests to a single host that may be in flight at once, or None for no limit."""
+
+    max_requests_per_second: Optional[float] = None
+    """Maximum rate at which requests to a single host may be initiated, or None for no limit."""
+
+    adaptive: bool = False
+    """Whether to adapt the concurrency limit of each host using additive-increase/multiplicative-decrease (AIMD):
+    the limit is multiplied by `decrease_factor` when the host responds 429 or 503, and grows back by roughly one
+    request per round of successful responses.  When enabled without `max_concurrent_requests`, the limit starts
+    from `adaptive_initial_concurrent_requests`."""
+
+    adaptive_initial_concurrent_requests: int = 32
+    """Concurrency limit from which adaptive control starts when `max_concurrent_requests` is not specified."""
+
+    decrease_factor: float = 0.5
+    """Factor by which the adaptive concurrency limit is multiplied upon a backoff response."""
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.max_concurrent_requests is not None
+            or self.max_requests_per_second is not None
+            or self.adaptive
+        )
+
+
+@dataclass
+class HostLimiterStats:
+    requests: int = 0
+    """Number of requests that have been granted a slot."""
+
+    delayed_requests: int = 0
+    """Number of requests that had to wait for a slot."""
+
+    total_delay_s: float = 0
+    """Total number of seconds requests spent waiting for a slot."""
+
+    backoffs: int = 0
+    """Number of backoff responses (429/503) received."""
+
+
+class RequestSlot(object):
+    """Permission to have one request in flight to a host; report the response to enable adaptive control."""
+
+    status_code: Optional[int] = None
+    retry_after: Optional[str] = None
+
+    def report(
+        self, status_code: Optional[int], headers: Optional[Mapping] = None
+    ) -> None:
+        """Record the outcome of the request made using this slot.
+
+        Args:
+            status_code: HTTP status code of the response.
+            headers: Headers of the response, if available.
+        """
+        self.status_code = status_code
+        if headers is not None:
+            self.retry_after = headers.get("Retry-After", None)
+
+
+class HostLimiter(object):
+    """Limits concurrency and rate of requests to a single host.
+
+    Usable from both threads and asyncio coroutines (the latter poll rather than block).
+    """
+
+    host: str
+    settings: HostLimitSettings
+    stats: HostLimiterStats
+
+    def __init__(self, host: str, settings: HostLimitSettings):
+        self.host = host
+        self.settings = settings
+        self.stats = HostLimiterStats()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._next_start = 0.0
+        self._paused_until = 0.0
+        if settings.max_concurrent_requests is not None:
+            self._limit = float(settings.max_concurrent_requests)
+        elif settings.adaptive:
+            self._limit = float(settings.adaptive_initial_concurrent_requests)
+        else:
+            self._limit = None
+
+    @property
+    def concurrency_limit(self) -> Optional[int]:
+        """Current effective limit on requests in flight to this host, or None if unlimited."""
+        return None if self._limit is None else max(1, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _try_acquire(self, now: float) -> Optional[float]:
+        """Attempt to take a slot; must be called while holding _condition.
+
+        Returns:
+            0 if a slot was taken, number of seconds to wait before trying again if
+            the wait is time-bound, or None if a slot must be released first.
+        """
+        if now < self._paused_until:
+            return self._paused_until - now
+        limit = self.concurrency_limit
+        if limit is not None and self._in_flight >= limit:
+            return None
+        if now < self._next_start:
+            return self._next_start - now
+        if self.settings.max_requests_per_second:
+            self._next_start = (
+                max(now, self._next_start) + 1 / self.settings.max_requests_per_second
+            )
+        self._in_flight += 1
+        self.stats.requests += 1
+        return 0
+
+    def _record_delay(self, t0: float) -> None:
+        self.stats.delayed_requests += 1
+        self.stats.total_delay_s += time.monotonic() - t0
+
+    def acquire(self) -> RequestSlot:
+        """Block the current thread until a slot is available, then take it."""
+        t0 = time.monotonic()
+        with self._condition:
+            wait = self._try_acquire(t0)
+            if wait != 0:
+                while wait != 0:
+                    self._condition.wait(wait)
+                    wait = self._try_acquire(time.monotonic())
+                self._record_delay(t0)
+        return RequestSlot()
+
+    async def acquire_async(self) -> RequestSlot:
+        """Wait (without blocking the event loop) until a slot is available, then take it."""
+        t0 = time.monotonic()
+        delayed = False
+        while True:
+            with self._condition:
+                wait = self._try_acquire(time.monotonic())
+            if wait == 0:
+                break
+            delayed = True
+            await asyncio.sleep(
+                ASYNC_POLL_INTERVAL_S
+                if wait is None
+                else min(wait, ASYNC_POLL_INTERVAL_S * 10)
+            )
+        if delayed:
+            with self._condition:
+                self._record_delay(t0)
+        return RequestSlot()
+
+    def release(self, slot: RequestSlot) -> None:
+        """Return a slot taken with acquire or acquire_async, adapting limits according to its reported outcome."""
+        with self._condition:
+            self._in_flight -= 1
+            if slot.status_code in BACKOFF_STATUS_CODES:
+                self._back_off(slot)
+            elif (
+                slot.status_code is not None
+                and self.settings.adaptive
+                and self._limit is not None
+            ):
+                ceiling = (
+                    self.settings.max_concurrent_requests
+                    or self.settings.adaptive_initial_concurrent_requests
+                )
+                self._limit = min(float(ceiling), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def _back_off(self, slot: RequestSlot) -> None:
+        self.stats.backoffs += 1
+        if self.settings.adaptive and self._limit is not None:
+            self._limit = max(1.0, self._limit * self.settings.decrease_factor)
+        if slot.retry_after:
+            try:
+                pause = min(float(slot.retry_after), MAX_RETRY_AFTER_S)
+            except ValueError:
+                # Retry-After may also be an HTTP date; we only honor delay-seconds
+                pause = 0
+            if pause > 0:
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.debug(
+            f"Host {self.host} responded {slot.status_code}; concurrency limit now {self.concurrency_limit}"
+        )
+
+
+@dataclass
+class _Configuration:
+    default: HostLimitSettings = field(default_factory=HostLimitSettings)
+    hosts: Dict[str, HostLimitSettings] = field(default_factory=dict)
+
+
+_configuration = _Configuration()
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure(
+    default: HostLimitSettings, hosts: Optional[Dict[str, HostLimitSettings]] = None
+) -> None:
+    """Set the limits applied to outgoing requests from this process.
+
+    Limiters created under a previous configuration are discarded.
+
+    Args:
+        default: Limits applied to each host not otherwise specified.
+        hosts: Limits for specific hosts, keyed by network location (hostname or hostname:port).
+    """
+    global _configuration
+    with _limiters_lock:
+        _configuration = _Configuration(default=default, hosts=dict(hosts or {}))
+        _limiters.clear()
+
+
+def limiter_for(url: str) -> Optional[HostLimiter]:
+    """Retrieve the limiter shared by all requests to the host of the specified URL, or None if it is unlimited."""
+    host = urlparse(url).netloc
+    config = _configuration
+    settings = config.hosts.get(host, config.default)
+    if not settings.enabled:
+        return None
+    limiter = _limiters.get(host, None)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host, None)
+            if limiter is None:
+                limiter = HostLimiter(host, settings)
+                _limiters[host] = limiter
+    return limiter
+
+
+def limiters() -> Dict[str, HostLimiter]:
+    """All limiters currently in use, keyed by host."""
+    return dict(_limiters)
+
+
+@contextlib.contextmanager
+def request_slot(url: str):
+    """Context manager that holds a slot for a request to the specified URL for the duration of the context.
+
+    Example:
+        with request_slot(url) as slot:
+            resp = session.get(url)
+            slot.report(resp.status_code, resp.headers)
+    """
+    limiter = limiter_for(url)
+    if limiter is None:
+        yield RequestSlot()
+        return
+    slot = limiter.acquire()
+    try:
+        yield slot
+    finally:
+        limiter.release(slot)
+
+
+@contextlib.asynccontextmanager
+async def async_request_slot(url: str):
+    """asyncio equivalent of `request_slot`."""
+    limiter = limiter_for(url)
+    if limiter is None:
+        yield RequestSlot()
+        return
+    slot = await limiter.acquire_async()
+    try:
+        yield slot
+    finally:
+        limiter.release(slot)
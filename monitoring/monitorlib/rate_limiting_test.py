@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+from monitoring.monitorlib import rate_limiting
+from monitoring.monitorlib.rate_limiting import HostLimiter, HostLimitSettings
+
+
+def test_unconfigured_hosts_are_unlimited():
+    rate_limiting.configure(HostLimitSettings())
+    assert rate_limiting.limiter_for("https://dss.example.com/foo") is None
+
+
+def test_limiters_are_shared_per_host():
+    rate_limiting.configure(
+        HostLimitSettings(max_concurrent_requests=2),
+        hosts={"uss.example.com": HostLimitSettings(max_concurrent_requests=5)},
+    )
+    dss = rate_limiting.limiter_for("https://dss.example.com/foo")
+    assert dss is rate_limiting.limiter_for("https://dss.example.com/bar")
+    assert dss.concurrency_limit == 2
+    assert rate_limiting.limiter_for("https://uss.example.com/").concurrency_limit == 5
+    rate_limiting.configure(HostLimitSettings())
+
+
+def test_concurrency_limit():
+    limiter = HostLimiter("host", HostLimitSettings(max_concurrent_requests=2))
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def request():
+        nonlocal max_in_flight
+        slot = limiter.acquire()
+        with lock:
+            max_in_flight = max(max_in_flight, limiter.in_flight)
+        time.sleep(0.02)
+        limiter.release(slot)
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert max_in_flight == 2
+    assert limiter.in_flight == 0
+    assert limiter.stats.requests == 6
+    assert limiter.stats.delayed_requests >= 4
+
+
+def test_rate_limit():
+    limiter = HostLimiter("host", HostLimitSettings(max_requests_per_second=50))
+    t0 = time.monotonic()
+    for _ in range(5):
+        limiter.release(limiter.acquire())
+    assert time.monotonic() - t0 >= 4 / 50
+
+
+def test_adaptive_backoff_and_recovery():
+    limiter = HostLimiter(
+        "host", HostLimitSettings(max_concurrent_requests=8, adaptive=True)
+    )
+
+    slot = limiter.acquire()
+    slot.report(429)
+    limiter.release(slot)
+    assert limiter.concurrency_limit == 4
+    assert limiter.stats.backoffs == 1
+
+    for _ in range(50):
+        slot = limiter.acquire()
+        slot.report(200)
+        limiter.release(slot)
+    assert limiter.concurrency_limit == 8
+
+
+def test_async_slots():
+    limiter = HostLimiter("host", HostLimitSettings(max_concurrent_requests=1))
+    max_in_flight = 0
+
+    async def request():
+        nonlocal max_in_flight
+        slot = await limiter.acquire_async()
+        max_in_flight = max(max_in_flight, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        limiter.release(slot)
+
+    async def requests():
+        await asyncio.gather(*[request() for _ in range(3)])
+
+    asyncio.run(requests())
+    assert max_in_flight == 1
+    assert limiter.stats.requests == 3
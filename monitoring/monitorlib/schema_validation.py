@@ -1,9 +1,10 @@
 import os.path
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import List, Dict, Type
+from typing import List, Dict, Tuple, Type
 
 import bc_jsonpath_ng
 import jsonschema.validators
@@ -110,18 +111,31 @@ def _collect_errors(e: jsonschema.ValidationError) -> List[ValidationError]:
         return [ValidationError(message=e.message, json_path=e.json_path)]
 
 
-def validate(
-    openapi_path: str, object_path: str, instance: dict
-) -> List[ValidationError]:
-    """Validate an object instance against the OpenAPI schema definition for that object type.
-
-    Args:
-        openapi_path: Path to OpenAPI file, relative to repository root.
-        object_path: JSONPath to object schema within OpenAPI file content.
-        instance: Instance to validate against schema.
+class _CachedValidator(object):
+    """Schema validator prepared once and reused for every validation against that schema.
 
-    Returns: List of ValidationErrors (or empty list when validation passes).
+    jsonschema's RefResolver tracks its resolution scope while validating, so concurrent validations with the same
+    validator are serialized.
     """
+
+    def __init__(self, validator: jsonschema.protocols.Validator):
+        self._validator = validator
+        self._lock = threading.Lock()
+
+    def validate(self, instance: dict) -> List[ValidationError]:
+        result = []
+        with self._lock:
+            for e in self._validator.iter_errors(instance):
+                result.extend(_collect_errors(e))
+        return result
+
+
+_openapi_validators: Dict[Tuple[str, str], _CachedValidator] = {}
+_implicitdict_validators: Dict[Type[ImplicitDict], _CachedValidator] = {}
+_validators_lock = threading.Lock()
+
+
+def _make_openapi_validator(openapi_path: str, object_path: str) -> _CachedValidator:
     base_path = os.path.split(openapi_path)[0]
     if not os.path.isabs(base_path):
         repo_root = os.path.realpath(os.path.join(os.path.split(__file__)[0], "../.."))
@@ -151,11 +165,30 @@ def validate(
         )
 
     validator_class.check_schema(schema)
-    validator = validator_class(schema, resolver=resolver)
-    result = []
-    for e in validator.iter_errors(instance):
-        result.extend(_collect_errors(e))
-    return result
+    return _CachedValidator(validator_class(schema, resolver=resolver))
+
+
+def validate(
+    openapi_path: str, object_path: str, instance: dict
+) -> List[ValidationError]:
+    """Validate an object instance against the OpenAPI schema definition for that object type.
+
+    Args:
+        openapi_path: Path to OpenAPI file, relative to repository root.
+        object_path: JSONPath to object schema within OpenAPI file content.
+        instance: Instance to validate against schema.
+
+    Returns: List of ValidationErrors (or empty list when validation passes).
+    """
+    key = (openapi_path, object_path)
+    validator = _openapi_validators.get(key, None)
+    if validator is None:
+        with _validators_lock:
+            validator = _openapi_validators.get(key, None)
+            if validator is None:
+                validator = _make_openapi_validator(openapi_path, object_path)
+                _openapi_validators[key] = validator
+    return validator.validate(instance)
 
 
 def _definitions_resolver(t: Type) -> SchemaVars:
@@ -181,10 +214,13 @@ def _make_implicitdict_schema(t: Type[ImplicitDict]) -> dict:
 def validate_implicitdict_object(
     obj: dict, t: Type[ImplicitDict]
 ) -> List[ValidationError]:
-    schema = _make_implicitdict_schema(t)
-    jsonschema.Draft202012Validator.check_schema(schema)
-    validator = jsonschema.Draft202012Validator(schema)
-    result = []
-    for e in validator.iter_errors(obj):
-        result.extend(_collect_errors(e))
-    return result
+    validator = _implicitdict_validators.get(t, None)
+    if validator is None:
+        with _validators_lock:
+            validator = _implicitdict_validators.get(t, None)
+            if validator is None:
+                schema = _make_implicitdict_schema(t)
+                jsonschema.Draft202012Validator.check_schema(schema)
+                validator = _CachedValidator(jsonschema.Draft202012Validator(schema))
+                _implicitdict_validators[t] = validator
+    return validator.validate(obj)
@@ -0,0 +1,67 @@
+from typing import List, Optional
+
+from implicitdict import ImplicitDict
+
+from monitoring.monitorlib import schema_validation
+
+OPENAPI = """
+openapi: 3.0.2
+components:
+  schemas:
+    Reference:
+      type: object
+      required: [id]
+      properties:
+        id:
+          type: string
+    QueryResponse:
+      type: object
+      properties:
+        references:
+          type: array
+          items:
+            $ref: '#/components/schemas/Reference'
+"""
+
+
+def test_openapi_validator_reuse(tmp_path):
+    openapi_path = str(tmp_path / "api.yaml")
+    with open(openapi_path, "w") as f:
+        f.write(OPENAPI)
+    object_path = "components.schemas.QueryResponse"
+
+    assert not schema_validation.validate(
+        openapi_path, object_path, {"references": [{"id": "a"}]}
+    )
+    validator = schema_validation._openapi_validators[(openapi_path, object_path)]
+
+    # The cached validator is reused and still resolves references
+    errors = schema_validation.validate(
+        openapi_path, object_path, {"references": [{"id": "a"}, {}]}
+    )
+    assert [e.json_path for e in errors] == ["$.references[1]"]
+    assert schema_validation._openapi_validators[(openapi_path, object_path)] is (
+        validator
+    )
+
+
+class _Item(ImplicitDict):
+    name: str
+
+
+class _Collection(ImplicitDict):
+    items: List[_Item]
+    note: Optional[str]
+
+
+def test_implicitdict_validator_reuse():
+    assert not schema_validation.validate_implicitdict_object(
+        {"items": [{"name": "a"}]}, _Collection
+    )
+    validator = schema_validation._implicitdict_validators[_Collection]
+
+    errors = schema_validation.validate_implicitdict_object(
+        {"items": [{"name": 1}]}, _Collection
+    )
+    assert [e.json_path for e in errors] == ["$.items[0].name"]
+    assert schema_validation._implicitdict_validators[_Collection] is validator
@@ -1,11 +1,11 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, UTC
 from enum import Enum
-from typing import Optional, List, Dict
+from functools import lru_cache
+from typing import Optional, List, Dict, Sequence, Tuple
 
 import arrow
 from implicitdict import ImplicitDict, StringBasedTimeDelta, StringBasedDateTime
-from pvlib.solarposition import get_solarposition
 from uas_standards.astm.f3548.v21 import api as f3548v21
 
 from monitoring.monitorlib.geo import LatLngPoint
@@ -134,47 +134,12 @@ class TestTime(ImplicitDict):
                 + self.offset_from.offset.timedelta
             )
         elif self.next_sun_position is not None:
-            t0 = self.next_sun_position.starting_from.resolve(times).datetime
-
-            dt = timedelta(minutes=5)
-            lat = self.next_sun_position.observed_from.lat
-            lng = self.next_sun_position.observed_from.lng
-            el_target = self.next_sun_position.elevation_deg
-
-            # Step linearly through the day looking for two adjacent times that surround the target sun elevation.
-            # Note that this will fail to capture the very peak sun elevation if it is targeted.
-            t2 = t0
-            el2 = _sun_elevation(t2, lat, lng)
-            found = False
-            while t2 <= t0 + timedelta(days=1):
-                t1 = t2
-                el1 = el2
-                t2 += dt
-                el2 = _sun_elevation(t2, lat, lng)
-                if (el_target > el1) != (el_target > el2):
-                    found = True
-                    break
-            if not found:
-                raise ValueError(
-                    f"Sun did not reach an elevation of {el_target} degrees between {t0} and {t2}"
-                )
-
-            # Refine time that sun elevation matches the target
-            while (t2 - t1).total_seconds() > 5:
-                t_m = t1 + 0.5 * (t2 - t1)
-                el_m = _sun_elevation(t_m, lat, lng)
-                if (el_target > el1) != (el_target > el_m):
-                    t2 = t_m
-                    el2 = el_m
-                elif (el_target > el_m) != (el_target > el2):
-                    t1 = t_m
-                    el1 = el_m
-                else:
-                    raise ValueError(
-                        f"When refining sun elevation timing, the elevation target {el_target} did not appear in between t1 {t1} ({el1} degrees) and midpoint {t_m} ({el_m} degrees) nor between midpoint and t2 {t2} ({el2} degrees)"
-                    )
-
-            result = t1 + 0.5 * (t2 - t1)
+            result = _next_sun_elevation_time(
+                self.next_sun_position.starting_from.resolve(times).datetime,
+                self.next_sun_position.observed_from.lat,
+                self.next_sun_position.observed_from.lng,
+                self.next_sun_position.elevation_deg,
+            )
 
         if result is None:
             raise NotImplementedError(
@@ -199,6 +164,35 @@ _weekdays = [
 """Days of the week with indices corresponding with datetime.weekdays()"""
 
 
+SUN_ELEVATION_SEARCH_STEP = timedelta(minutes=5)
+"""Spacing of the times at which sun elevation is evaluated when searching for a target sun elevation."""
+
+SUN_ELEVATION_REFINEMENT_STEPS = 64
+"""Number of intervals into which the search step containing the target sun elevation is divided to refine the time
+the sun reaches that elevation."""
+
+
+def _sun_elevations(
+    t: Sequence[datetime], lat_deg: float, lng_deg: float
+) -> List[float]:
+    """Compute sun elevations at the specified times and place in a single computation.
+
+    Args:
+        t: Times at which to compute sun position.
+        lat_deg: Latitude at which to compute sun position (degrees).
+        lng_deg: Longitude at which to compute sun position (degrees).
+
+    Returns: Degrees above the horizon of the center of the sun at each time.
+    """
+    # pvlib (and pandas) are slow to import and only needed to resolve sun-relative times
+    import pandas as pd
+    from pvlib.solarposition import get_solarposition
+
+    # pvlib expects nanosecond timestamps
+    index = pd.DatetimeIndex(list(t)).as_unit("ns")
+    return get_solarposition(index, lat_deg, lng_deg).elevation.tolist()
+
+
 def _sun_elevation(t: datetime, lat_deg: float, lng_deg: float) -> float:
     """Compute sun elevation at the specified time and place.
 
@@ -209,7 +203,66 @@ def _sun_elevation(t: datetime, lat_deg: float, lng_deg: float) -> float:
 
     Returns: Degrees above the horizon of the center of the sun.
     """
-    return get_solarposition(t, lat_deg, lng_deg).elevation.values[0]
+    return _sun_elevations([t], lat_deg, lng_deg)[0]
+
+
+@lru_cache(maxsize=64)
+def _daily_sun_elevations(
+    day: date, lat_deg: float, lng_deg: float
+) -> Tuple[Tuple[datetime, ...], Tuple[float, ...]]:
+    """Sun elevations at each search step during the specified UTC day at the specified place."""
+    t_start = datetime(day.year, day.month, day.day, tzinfo=UTC)
+    n = int(timedelta(days=1) / SUN_ELEVATION_SEARCH_STEP)
+    t = tuple(t_start + i * SUN_ELEVATION_SEARCH_STEP for i in range(n))
+    return t, tuple(_sun_elevations(t, lat_deg, lng_deg))
+
+
+def _first_crossing(
+    t: Sequence[datetime], el: Sequence[float], el_target: float
+) -> Optional[int]:
+    """Index i of the first pair of adjacent elevations el[i], el[i + 1] surrounding el_target, if any."""
+    for i in range(len(el) - 1):
+        if (el_target > el[i]) != (el_target > el[i + 1]):
+            return i
+    return None
+
+
+@lru_cache(maxsize=256)
+def _next_sun_elevation_time(
+    t0: datetime, lat_deg: float, lng_deg: float, el_target: float
+) -> datetime:
+    """Find the first time within a day after t0 at which the sun reaches the target elevation at the specified place.
+
+    Note that this will fail to capture the very peak sun elevation if it is targeted.
+    """
+    t_end = t0 + timedelta(days=1) + SUN_ELEVATION_SEARCH_STEP
+
+    # Look for two adjacent times that surround the target sun elevation, using elevations precomputed per day
+    t = [t0]
+    el = [_sun_elevation(t0, lat_deg, lng_deg)]
+    day = t0.astimezone(UTC).date()
+    while True:
+        daily_t, daily_el = _daily_sun_elevations(day, lat_deg, lng_deg)
+        for t_i, el_i in zip(daily_t, daily_el):
+            if t0 < t_i <= t_end:
+                t.append(t_i)
+                el.append(el_i)
+        if daily_t[-1] >= t_end:
+            break
+        day += timedelta(days=1)
+    i = _first_crossing(t, el, el_target)
+    if i is None:
+        raise ValueError(
+            f"Sun did not reach an elevation of {el_target} degrees between {t0} and {t[-1]}"
+        )
+
+    # Refine time that sun elevation matches the target by evaluating finely-spaced times in that interval at once
+    t1, t2 = t[i], t[i + 1]
+    dt = (t2 - t1) / SUN_ELEVATION_REFINEMENT_STEPS
+    fine_t = [t1 + j * dt for j in range(SUN_ELEVATION_REFINEMENT_STEPS)] + [t2]
+    fine_el = [el[i]] + _sun_elevations(fine_t[1:-1], lat_deg, lng_deg) + [el[i + 1]]
+    j = _first_crossing(fine_t, fine_el, el_target)
+    return fine_t[j] + 0.5 * dt
 
 
 class Time(StringBasedDateTime):
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from implicitdict import ImplicitDict, StringBasedDateTime
+
+from monitoring.monitorlib import temporal
+from monitoring.monitorlib.temporal import _sun_elevation
+
+
+def _next_sun_position(t0: datetime, elevation_deg: float) -> temporal.TestTime:
+    return ImplicitDict.parse(
+        {
+            "next_sun_position": {
+                "starting_from": {"absolute_time": StringBasedDateTime(t0)},
+                "observed_from": {"lat": 46.2, "lng": 6.1},
+                "elevation_deg": elevation_deg,
+            }
+        },
+        temporal.TestTime,
+    )
+
+
+def test_next_sun_position():
+    t0 = datetime(2024, 6, 1, 3, 17, tzinfo=UTC)
+    for elevation_deg in (-6, 0, 10, 45):
+        t = _next_sun_position(t0, elevation_deg).resolve({}).datetime
+        assert t0 < t < t0 + timedelta(days=1)
+        # Sun elevation changes by less than 0.1 degree in the resolution of the search
+        assert _sun_elevation(t, 46.2, 6.1) == pytest.approx(elevation_deg, abs=0.1)
+
+    with pytest.raises(ValueError):
+        _next_sun_position(t0, 80).resolve({})
@@ -5,10 +5,7 @@ from typing import Generic, Dict, Optional, TypeVar, List, Type, Iterator, Any
 
 from implicitdict import ImplicitDict
 from monitoring import uss_qualifier as uss_qualifier_module
-from monitoring.monitorlib.inspection import (
-    import_submodules,
-    get_module_object_by_name,
-)
+from monitoring.monitorlib.inspection import get_module_object_by_name
 from monitoring.uss_qualifier.action_generators.definitions import (
     ActionGeneratorSpecificationType,
     ActionGeneratorDefinition,
@@ -108,11 +105,6 @@ ActionGeneratorType = TypeVar("ActionGeneratorType", bound=ActionGenerator)
 def action_generator_type_from_name(
     action_generator_type_name: GeneratorTypeName,
 ) -> Type[ActionGenerator]:
-    from monitoring.uss_qualifier import (
-        action_generators as action_generators_module,
-    )
-
-    import_submodules(action_generators_module)
     action_generator_type = get_module_object_by_name(
         parent_module=uss_qualifier_module,
         object_name=action_generator_type_name,
@@ -1,4 +1,6 @@
+from dataclasses import dataclass
 from typing import Optional
+from urllib.parse import urlencode
 
 from loguru import logger
 from implicitdict import ImplicitDict
@@ -31,6 +33,14 @@ from implicitdict import StringBasedDateTime
 MOCK_USS_CONFIG_SCOPE = "interuss.mock_uss.configure"
 
 
+@dataclass
+class InteractionLogCursor(object):
+    """Position in a mock_uss interaction log, used to retrieve only interactions logged since a previous request."""
+
+    after_sequence: Optional[int] = None
+    """Sequence number of the most recent interaction logged as of the previous request, if any."""
+
+
 class MockUSSClient(object):
     """Means to communicate with an InterUSS mock_uss instance"""
 
@@ -90,17 +100,42 @@ class MockUSSClient(object):
     # TODO: Add other methods to interact with the mock USS in other ways (like starting/stopping message signing data collection)
 
     def get_interactions(
-        self, from_time: StringBasedDateTime
+        self,
+        from_time: StringBasedDateTime,
+        cursor: Optional[InteractionLogCursor] = None,
+        query_types: Optional[List[QueryType]] = None,
+        url_contains: Optional[str] = None,
+        wait_s: Optional[float] = None,
     ) -> Tuple[List[Interaction], fetch.Query]:
         """
         Requesting interuss interactions from mock_uss from a given time till now
         Args:
             from_time: the time from which the interactions are requested
+            cursor: if specified, only interactions logged since the previous request made with this cursor are
+                requested, and the cursor is advanced past the interactions logged as of this request
+            query_types: if specified, only interactions with one of these query types are requested
+            url_contains: if specified, only interactions with a request URL containing this string are requested
+            wait_s: if specified and no interactions match, mock_uss waits up to this many seconds for a matching
+                interaction to be logged before responding
         Returns:
             List of Interactions
         """
-        url = "{}/mock_uss/interuss_logging/logs?from_time={}".format(
-            self.base_url, from_time
+        params = [("from_time", str(from_time))]
+        if cursor is not None and cursor.after_sequence is not None:
+            params.append(("after_sequence", str(cursor.after_sequence)))
+        if query_types:
+            params.extend(("query_type", query_type) for query_type in query_types)
+        if url_contains:
+            params.append(("url_contains", url_contains))
+        kwargs = {}
+        if wait_s:
+            params.append(("wait_s", f"{wait_s:.3f}"))
+            kwargs["timeout"] = (
+                fetch.settings.connect_timeout_seconds,
+                fetch.settings.read_timeout_seconds + wait_s,
+            )
+        url = "{}/mock_uss/interuss_logging/logs?{}".format(
+            self.base_url, urlencode(params)
         )
         query = fetch.query_and_describe(
             self.session,
@@ -109,6 +144,7 @@ class MockUSSClient(object):
             scope=SCOPE_SCD_QUALIFIER_INJECT,
             participant_id=self.participant_id,
             query_type=QueryType.InterUSSMockUSSGetLogs,
+            **kwargs,
         )
         if query.status_code != 200:
             raise QueryError(
@@ -127,6 +163,8 @@ class MockUSSClient(object):
                 queries=[query],
             )
 
+        if cursor is not None and "last_sequence" in response:
+            cursor.after_sequence = response.last_sequence
         return response.interactions, query
 
 
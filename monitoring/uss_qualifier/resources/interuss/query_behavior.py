@@ -3,6 +3,7 @@ from typing import Optional
 from loguru import logger
 
 from implicitdict import ImplicitDict
+from monitoring.monitorlib import infrastructure, rate_limiting
 from monitoring.monitorlib.fetch import settings
 from monitoring.uss_qualifier.resources.resource import Resource
 
@@ -20,6 +21,18 @@ class QueryBehaviorSpecification(ImplicitDict):
     add_request_id: Optional[bool]
     """Whether to automatically add a `request_id` field to any request with a JSON body and no pre-existing `request_id` field"""
 
+    max_concurrent_requests_per_host: Optional[int]
+    """Maximum number of requests to a single host (DSS or USS) that may be in flight at once.  Unlimited if not specified."""
+
+    max_requests_per_second_per_host: Optional[float]
+    """Maximum rate at which requests to a single host (DSS or USS) may be initiated.  Unlimited if not specified."""
+
+    adaptive_rate_control: Optional[bool]
+    """When true, reduce the number of concurrent requests to a host when it responds 429 or 503 and gradually restore it as requests succeed (AIMD)."""
+
+    http2: Optional[bool]
+    """When true, multiplex concurrent requests to each host over a shared HTTP/2 connection when the host supports HTTP/2 (falling back to HTTP/1.1 otherwise)."""
+
 
 class QueryBehaviorResource(Resource[QueryBehaviorSpecification]):
     """When declared, this resource adjusts the settings for all queries made by uss_qualifier.
@@ -81,3 +94,41 @@ class QueryBehaviorResource(Resource[QueryBehaviorSpecification]):
             logger.info(
                 f"QueryBehaviorResource: Fetch query set to {'' if settings.add_request_id else 'not '} add `request_id`"
             )
+
+        if "http2" in specification and specification.http2 is not None:
+            infrastructure.transport_settings.http2 = specification.http2
+            logger.info(
+                f"QueryBehaviorResource: HTTP/2 transport {'enabled' if specification.http2 else 'disabled'} for UTM client sessions"
+            )
+
+        host_limits = rate_limiting.HostLimitSettings()
+        if (
+            "max_concurrent_requests_per_host" in specification
+            and specification.max_concurrent_requests_per_host is not None
+        ):
+            if specification.max_concurrent_requests_per_host < 1:
+                raise ValueError(
+                    "It only makes sense to allow at least one concurrent request per host"
+                )
+            host_limits.max_concurrent_requests = (
+                specification.max_concurrent_requests_per_host
+            )
+        if (
+            "max_requests_per_second_per_host" in specification
+            and specification.max_requests_per_second_per_host is not None
+        ):
+            if specification.max_requests_per_second_per_host <= 0:
+                raise ValueError("Request rate limit per host must be positive")
+            host_limits.max_requests_per_second = (
+                specification.max_requests_per_second_per_host
+            )
+        if (
+            "adaptive_rate_control" in specification
+            and specification.adaptive_rate_control is not None
+        ):
+            host_limits.adaptive = specification.adaptive_rate_control
+        if host_limits.enabled:
+            rate_limiting.configure(host_limits)
+            logger.info(
+                f"QueryBehaviorResource: Per-host query limits set to {host_limits.max_concurrent_requests} concurrent requests, {host_limits.max_requests_per_second} requests per second, adaptive control {'enabled' if host_limits.adaptive else 'disabled'}"
+            )
@@ -6,7 +6,6 @@ from loguru import logger
 
 from monitoring import uss_qualifier as uss_qualifier_module
 from monitoring.monitorlib import inspection
-from monitoring.uss_qualifier import resources as resources_module
 from monitoring.uss_qualifier.resources.definitions import (
     ResourceDeclaration,
     ResourceID,
@@ -127,9 +126,6 @@ def create_resources(
     return resource_pool
 
 
-_resources_module_imported = False
-
-
 def get_resource_types(
     declaration: ResourceDeclaration,
 ) -> Tuple[Type[Resource], Type[ImplicitDict]]:
@@ -142,11 +138,6 @@ def get_resource_types(
         * Concrete Resource subclass type of the declared resource
         * Specification type for the declared resource, or None if the resource type doesn't have a specification
     """
-    global _resources_module_imported
-    if not _resources_module_imported:
-        inspection.import_submodules(resources_module)
-        _resources_module_imported = True
-
     resource_type = inspection.get_module_object_by_name(
         uss_qualifier_module, declaration.resource_type
     )
@@ -18,7 +18,10 @@ from monitoring.monitorlib.clients.mock_uss.interactions import Interaction
 from monitoring.monitorlib.clients.mock_uss.interactions import QueryDirection
 from monitoring.monitorlib.delay import sleep
 from monitoring.monitorlib.fetch import QueryError, Query
-from monitoring.uss_qualifier.resources.interuss.mock_uss.client import MockUSSClient
+from monitoring.uss_qualifier.resources.interuss.mock_uss.client import (
+    InteractionLogCursor,
+    MockUSSClient,
+)
 from monitoring.uss_qualifier.scenarios.astm.utm.data_exchange_validation.test_steps.wait import (
     wait_in_intervals,
     MaxTimeToWaitForSubscriptionNotificationSeconds as max_wait_time,
@@ -48,6 +51,7 @@ def expect_mock_uss_receives_op_intent_notification(
         op_id=OperationID.NotifyOperationalIntentDetailsChanged,
         direction=QueryDirection.Incoming,
         since=st,
+        cursor=InteractionLogCursor(),
     )
 
     with scenario.check("Expect Notification sent", [participant_id]) as check:
@@ -122,14 +126,27 @@ def mock_uss_interactions(
     since: StringBasedDateTime,
     query_params: Optional[Dict[str, str]] = None,
     is_applicable: Optional[Callable[[Interaction], bool]] = None,
+    cursor: Optional[InteractionLogCursor] = None,
+    wait_s: Optional[float] = None,
 ) -> Tuple[List[Interaction], Query]:
-    """Determine if mock_uss recorded an interaction for the specified operation in the specified direction."""
+    """Determine if mock_uss recorded an interaction for the specified operation in the specified direction.
+
+    When a cursor is provided, only interactions logged since the previous call with the same cursor are considered.
+    When wait_s is provided, mock_uss is asked to wait up to that long for a potentially-relevant interaction to be
+    logged if there are none yet.
+    """
+    op = api.OPERATIONS[op_id]
 
     with scenario.check(
         "Mock USS interactions logs retrievable", [mock_uss.participant_id]
     ) as check:
         try:
-            interactions, query = mock_uss.get_interactions(since)
+            interactions, query = mock_uss.get_interactions(
+                since,
+                cursor=cursor,
+                url_contains=op.path.split("{")[0],
+                wait_s=wait_s,
+            )
             scenario.record_query(query)
         except QueryError as e:
             for q in e.queries:
@@ -140,8 +157,6 @@ def mock_uss_interactions(
                 query_timestamps=[q.request.timestamp for q in e.queries],
             )
 
-    op = api.OPERATIONS[op_id]
-
     op_path = op.path
     if query_params is None:
         query_params = {}
@@ -1,3 +1,5 @@
+import inspect
+
 import arrow
 from monitoring.monitorlib.delay import sleep
 from datetime import timedelta
@@ -18,28 +20,39 @@ and ./validate_no_notification_operational_intent.md
 WaitIntervalSeconds = 1
 """Time interval to wait between two calls to get interactions from Mock USS"""
 
+MinLongPollIntervalSeconds = 0.1
+"""Minimum time between two calls to get interactions from Mock USS when the server is asked to wait for interactions"""
+
 
 def wait_in_intervals(func) -> Callable[..., Tuple[List[Interaction], Query]]:
     """
     This wrapper calls the given function in intervals till desired interactions (of notifications) are returned,
     or till the max wait time is reached.
+    If the given function accepts a `wait_s` argument, it is called with the time remaining so that it may wait for
+    interactions itself (e.g., by long polling mock_uss) rather than being called once per interval.
     Args:
         func: Given function func must also return Tuple[List[Interaction], Query].
 
     """
+    long_poll = "wait_s" in inspect.signature(func).parameters
 
     def wrapper(*args, **kwargs) -> Tuple[List[Interaction], Query]:
         wait_until = arrow.utcnow().datetime + timedelta(
             seconds=MaxTimeToWaitForSubscriptionNotificationSeconds
         )
         while arrow.utcnow().datetime < wait_until:
+            t0 = arrow.utcnow().datetime
+            if long_poll:
+                kwargs["wait_s"] = (wait_until - t0).total_seconds()
             interactions, query = func(*args, **kwargs)
             if interactions:
                 break
             dt = (wait_until - arrow.utcnow().datetime).total_seconds()
-            if dt > 0:
+            interval = MinLongPollIntervalSeconds if long_poll else WaitIntervalSeconds
+            interval -= (arrow.utcnow().datetime - t0).total_seconds()
+            if dt > 0 and interval > 0:
                 sleep(
-                    min(dt, WaitIntervalSeconds),
+                    min(dt, interval),
                     "the expected notification was not found yet",
                 )
         return interactions, query
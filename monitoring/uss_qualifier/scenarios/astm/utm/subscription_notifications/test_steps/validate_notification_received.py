@@ -1,7 +1,10 @@
 from implicitdict import StringBasedDateTime, ImplicitDict
 from typing import Callable, List, Tuple
 from monitoring.uss_qualifier.scenarios.scenario import TestScenarioType
-from monitoring.uss_qualifier.resources.interuss.mock_uss.client import MockUSSClient
+from monitoring.uss_qualifier.resources.interuss.mock_uss.client import (
+    InteractionLogCursor,
+    MockUSSClient,
+)
 from datetime import datetime
 from monitoring.uss_qualifier.scenarios.astm.utm.data_exchange_validation.test_steps.expected_interactions_test_steps import (
     mock_uss_interactions,
@@ -60,6 +63,7 @@ def expect_tested_uss_receives_notification_from_mock_uss(
                 is_applicable=_is_notification_sent_to_url_with_op_intent_id(
                     op_intent_ref_id, tested_uss_base_url
                 ),
+                cursor=InteractionLogCursor(),
             )
         except ValueError as e:
             check.record_failed(
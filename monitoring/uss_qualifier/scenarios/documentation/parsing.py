@@ -1,7 +1,12 @@
+import hashlib
 import inspect
+import json
 import os
+import tempfile
 from typing import List, Dict, Type, Any, Optional
 
+from implicitdict import ImplicitDict
+from loguru import logger
 import marko
 import marko.element
 import marko.inline
@@ -28,9 +33,19 @@ TEST_STEP_SUFFIX = " test step"
 TEST_STEP_FRAGMENT_SUFFIX = " test step fragment"
 TEST_CHECK_SUFFIX = " check"
 
+DOCUMENTATION_CACHE_FOLDER = os.path.join(
+    tempfile.gettempdir(), "uss_qualifier_scenario_documentation"
+)
+"""Folder in which parsed scenario documentation is cached between runs, keyed by the content it was parsed from."""
+
 
 _test_step_cache: Dict[str, TestStepDocumentation] = {}
 
+_test_step_dependencies: Dict[str, Dict[str, str]] = {}
+"""Digests of the content of each document (by absolute path) a cached test step fragment was parsed from."""
+
+_parser_digest: Optional[str] = None
+
 
 def _length_of_section(values, start_of_section: int) -> int:
     if start_of_section + 1 >= len(values):
@@ -83,8 +98,12 @@ def _parse_test_check(
     )
 
 
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
 def _get_linked_test_step_fragment(
-    doc_filename: str, origin_filename: str
+    doc_filename: str, origin_filename: str, dependencies: Dict[str, str]
 ) -> TestStepDocumentation:
     absolute_path = os.path.abspath(
         os.path.join(os.path.dirname(origin_filename), doc_filename)
@@ -94,8 +113,10 @@ def _get_linked_test_step_fragment(
             raise ValueError(
                 f'Test step fragment document "{doc_filename}" linked from "{origin_filename}" does not exist at "{absolute_path}"'
             )
-        with open(absolute_path, "r") as f:
-            doc = marko.parse(f.read())
+        with open(absolute_path, "rb") as f:
+            content = f.read()
+        doc = marko.parse(content.decode("utf-8"))
+        fragment_dependencies = {absolute_path: _digest(content)}
 
         if (
             not isinstance(doc.children[0], marko.block.Heading)
@@ -110,13 +131,15 @@ def _get_linked_test_step_fragment(
         values = doc.children
         dc = _length_of_section(values, 0)
         _test_step_cache[absolute_path] = _parse_test_step(
-            values[0 : dc + 1], absolute_path, anchors
+            values[0 : dc + 1], absolute_path, anchors, fragment_dependencies
         )
+        _test_step_dependencies[absolute_path] = fragment_dependencies
+    dependencies.update(_test_step_dependencies[absolute_path])
     return _test_step_cache[absolute_path]
 
 
 def _parse_test_step(
-    values, doc_filename: str, anchors: Dict[Any, str]
+    values, doc_filename: str, anchors: Dict[Any, str], dependencies: Dict[str, str]
 ) -> TestStepDocumentation:
     name = text_of(values[0])
     if name.lower().endswith(TEST_STEP_SUFFIX):
@@ -130,7 +153,7 @@ def _parse_test_step(
         # We include the content of the linked test step fragment document before
         # extracting content from this section.
         linked_step_fragment = _get_linked_test_step_fragment(
-            values[0].children[0].dest, doc_filename
+            values[0].children[0].dest, doc_filename, dependencies
         )
         checks = linked_step_fragment.checks.copy()
 
@@ -147,7 +170,7 @@ def _parse_test_step(
                 # Heading is a link, so we infer this is a linked test step fragment
                 dc = _length_of_section(values, c)
                 linked_step_fragment = _get_linked_test_step_fragment(
-                    values[c].children[0].dest, doc_filename
+                    values[c].children[0].dest, doc_filename, dependencies
                 )
                 checks.extend(linked_step_fragment.checks.copy())
                 c += dc
@@ -159,7 +182,7 @@ def _parse_test_step(
 
 
 def _parse_test_case(
-    values, doc_filename: str, anchors: Dict[Any, str]
+    values, doc_filename: str, anchors: Dict[Any, str], dependencies: Dict[str, str]
 ) -> TestCaseDocumentation:
     name = text_of(values[0])[0 : -len(TEST_CASE_SUFFIX)]
 
@@ -172,7 +195,9 @@ def _parse_test_case(
             if text_of(values[c]).lower().endswith(TEST_STEP_SUFFIX):
                 # Start of a test step section
                 dc = _length_of_section(values, c)
-                step = _parse_test_step(values[c : c + dc + 1], doc_filename, anchors)
+                step = _parse_test_step(
+                    values[c : c + dc + 1], doc_filename, anchors, dependencies
+                )
                 steps.append(step)
                 c += dc
             else:
@@ -231,17 +256,10 @@ def _get_anchors(
     return anchors
 
 
-def _parse_documentation(scenario: Type) -> TestScenarioDocumentation:
-    # Load the .md file matching the Python file where this scenario type is defined
-    doc_filename = get_documentation_filename(scenario)
-    if not os.path.exists(doc_filename):
-        raise ValueError(
-            "Test scenario `{}` does not have the required documentation file `{}`".format(
-                fullname(scenario), doc_filename
-            )
-        )
-    with open(doc_filename, "r") as f:
-        doc = marko.parse(f.read())
+def _parse_documentation(
+    doc_filename: str, content: str, dependencies: Dict[str, str]
+) -> TestScenarioDocumentation:
+    doc = marko.parse(content)
     url = repo_url_of(doc_filename)
     anchors = _get_anchors(doc)
 
@@ -287,14 +305,14 @@ def _parse_documentation(scenario: Type) -> TestScenarioDocumentation:
                 )
             dc = _length_of_section(doc.children, c)
             cleanup = _parse_test_step(
-                doc.children[c : c + dc + 1], doc_filename, anchors
+                doc.children[c : c + dc + 1], doc_filename, anchors, dependencies
             )
             c += dc
         elif header_text.lower().endswith(TEST_CASE_SUFFIX):
             # Start of a test case section
             dc = _length_of_section(doc.children, c)
             test_case = _parse_test_case(
-                doc.children[c : c + dc + 1], doc_filename, anchors
+                doc.children[c : c + dc + 1], doc_filename, anchors, dependencies
             )
             test_cases.append(test_case)
             c += dc
@@ -313,10 +331,90 @@ def _parse_documentation(scenario: Type) -> TestScenarioDocumentation:
     return TestScenarioDocumentation(**kwargs)
 
 
+def _get_parser_digest() -> str:
+    global _parser_digest
+    if _parser_digest is None:
+        # Documentation cached by a different version of this parser (including the definitions it produces and the
+        # Markdown parsing it relies on) must not be used
+        parser = hashlib.sha256()
+        for source_file in (
+            __file__,
+            inspect.getfile(TestScenarioDocumentation),
+            inspect.getfile(text_of),
+        ):
+            with open(source_file, "rb") as f:
+                parser.update(_digest(f.read()).encode("utf-8") + b"\0")
+        parser.update(marko.__version__.encode("utf-8"))
+        _parser_digest = parser.hexdigest()
+    return _parser_digest
+
+
+def _documentation_cache_path(doc_filename: str, content: bytes) -> str:
+    key = hashlib.sha256()
+    for context in (_get_parser_digest(), repo_url_of(doc_filename), doc_filename):
+        key.update(context.encode("utf-8") + b"\0")
+    key.update(content)
+    return os.path.join(DOCUMENTATION_CACHE_FOLDER, key.hexdigest() + ".json")
+
+
+def _read_cached_documentation(
+    cache_path: str,
+) -> Optional[TestScenarioDocumentation]:
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+        for path, digest in cached["dependencies"].items():
+            with open(path, "rb") as f:
+                if _digest(f.read()) != digest:
+                    return None
+        return ImplicitDict.parse(cached["documentation"], TestScenarioDocumentation)
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _write_cached_documentation(
+    cache_path: str,
+    documentation: TestScenarioDocumentation,
+    dependencies: Dict[str, str],
+) -> None:
+    try:
+        os.makedirs(DOCUMENTATION_CACHE_FOLDER, exist_ok=True)
+        # Write to a temporary file first so that concurrent runs never read a partial cache entry
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dependencies": dependencies, "documentation": documentation}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache documentation at {cache_path}: {str(e)}")
+
+
+def _load_documentation(scenario: Type) -> TestScenarioDocumentation:
+    # Load the .md file matching the Python file where this scenario type is defined
+    doc_filename = os.path.abspath(get_documentation_filename(scenario))
+    if not os.path.exists(doc_filename):
+        raise ValueError(
+            "Test scenario `{}` does not have the required documentation file `{}`".format(
+                fullname(scenario), doc_filename
+            )
+        )
+    with open(doc_filename, "rb") as f:
+        content = f.read()
+
+    cache_path = _documentation_cache_path(doc_filename, content)
+    documentation = _read_cached_documentation(cache_path)
+    if documentation is None:
+        dependencies: Dict[str, str] = {}
+        documentation = _parse_documentation(
+            doc_filename, content.decode("utf-8"), dependencies
+        )
+        _write_cached_documentation(cache_path, documentation, dependencies)
+    return documentation
+
+
 def get_documentation(scenario: Type) -> TestScenarioDocumentation:
     DOC_CACHE_ATTRIBUTE = f"_md_documentation_{scenario.__name__}"
     if not hasattr(scenario, DOC_CACHE_ATTRIBUTE):
-        setattr(scenario, DOC_CACHE_ATTRIBUTE, _parse_documentation(scenario))
+        setattr(scenario, DOC_CACHE_ATTRIBUTE, _load_documentation(scenario))
     return getattr(scenario, DOC_CACHE_ATTRIBUTE)
 
 
@@ -0,0 +1,48 @@
+import os
+
+import marko
+import pytest
+
+from monitoring.uss_qualifier.scenarios.documentation import parsing
+from monitoring.uss_qualifier.scenarios.interuss.unit_test import UnitTestScenario
+
+
+@pytest.fixture()
+def cache_folder(tmp_path, monkeypatch) -> str:
+    folder = str(tmp_path / "cache")
+    monkeypatch.setattr(parsing, "DOCUMENTATION_CACHE_FOLDER", folder)
+    monkeypatch.setattr(parsing, "_parser_digest", None)
+    return folder
+
+
+def _fail_to_parse(*args, **kwargs):
+    raise AssertionError("Documentation was parsed rather than loaded from cache")
+
+
+def test_cached_documentation_reused(cache_folder, monkeypatch):
+    documentation = parsing._load_documentation(UnitTestScenario)
+    assert len(os.listdir(cache_folder)) == 1
+
+    monkeypatch.setattr(parsing, "_parse_documentation", _fail_to_parse)
+    assert parsing._load_documentation(UnitTestScenario) == documentation
+
+
+def test_cached_documentation_invalidated(cache_folder, monkeypatch):
+    doc_filename = os.path.abspath(parsing.get_documentation_filename(UnitTestScenario))
+    with open(doc_filename, "rb") as f:
+        content = f.read()
+    cache_path = parsing._documentation_cache_path(doc_filename, content)
+    parsing._load_documentation(UnitTestScenario)
+    assert os.path.exists(cache_path)
+
+    # Different content is cached separately
+    assert (
+        parsing._documentation_cache_path(doc_filename, content + b"\n") != cache_path
+    )
+
+    # Documentation cached using a different version of marko is not used
+    monkeypatch.setattr(parsing, "_parser_digest", None)
+    monkeypatch.setattr(marko, "__version__", marko.__version__ + ".other")
+    assert parsing._documentation_cache_path(doc_filename, content) != cache_path
+    parsing._load_documentation(UnitTestScenario)
+    assert len(os.listdir(cache_folder)) == 2
@@ -13,7 +13,6 @@ from monitoring.monitorlib import fetch, inspection
 from monitoring.monitorlib.errors import current_stack_string
 from monitoring.monitorlib.fetch import QueryType
 from monitoring.monitorlib.inspection import fullname
-from monitoring.uss_qualifier import scenarios as scenarios_module
 from monitoring.uss_qualifier.common_data_definitions import Severity
 from monitoring.uss_qualifier.reports.report import (
     TestScenarioReport,
@@ -178,7 +177,6 @@ class PendingCheck(object):
 
 
 def get_scenario_type_by_name(scenario_type_name: TestScenarioTypeName) -> Type:
-    inspection.import_submodules(scenarios_module)
     scenario_type = inspection.get_module_object_by_name(
         parent_module=uss_qualifier_module, object_name=scenario_type_name
     )